@@ -0,0 +1,132 @@
+# api_agregados.py
+"""API JSON dos agregados pré-calculados, em '/api/dados'.
+
+Serve o mesmo conteúdo de 'analises/<rede>/dados_publicos.json' direto de
+'dados_publicos.json' (ou do snapshot binário), sem repassar o export bruto:
+
+- '?rede=EBSERH' escolhe a rede formadora (padrão: 'Todas');
+- '?fields=idade,sexo_ds,vaga_uf' devolve só esses agregados das partes
+  'dashboard' e 'mapas' (padrão: todos).
+
+Cada resposta é serializada uma vez por versão dos dados e guardada num LRU,
+já com as variantes comprimidas (gzip ou brotli). A ETag é forte e muda com o
+conteúdo e a codificação; com 'Cache-Control: no-cache' o navegador revalida a
+cada visita e recebe 304 sem corpo enquanto os dados não mudarem.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+from flask import Response, jsonify, request
+
+import recarga_dados
+from compactacao import TAMANHO_MINIMO, comprimir, escolher_codificacao
+from recarga_dados import assinatura_arquivos
+from snapshot_dados import ARQUIVO_SNAPSHOT, caminho_dados_publicos, carregar_arquivo_publico
+
+ROTA = '/api/dados'
+ARQUIVO_DADOS = 'dados_publicos.json'
+ARQUIVOS_OBSERVADOS = [ARQUIVO_DADOS, ARQUIVO_SNAPSHOT]
+REDE_TODAS = 'Todas'
+PARTES = ('dashboard', 'mapas')
+TAMANHO_CACHE_RESPOSTAS = 256
+
+# ============================================================================
+# VERSÃO DOS DADOS
+# ============================================================================
+
+def carregar_agregados():
+    """Versão com o agregado de cada rede ({rede: {'total_registros', 'dashboard', 'mapas'}})."""
+    assinatura = assinatura_arquivos(ARQUIVOS_OBSERVADOS)
+    arquivo_publico = carregar_arquivo_publico(caminho_dados_publicos(ARQUIVO_DADOS))
+    bundles = {REDE_TODAS: arquivo_publico}
+    bundles.update(arquivo_publico.get('redes', {}))
+    return {
+        'assinatura': assinatura,
+        'bundles': {rede: {'total_registros': bundle.get('total_registros'),
+                           **{parte: bundle.get(parte, {}) for parte in PARTES}}
+                    for rede, bundle in bundles.items()},
+        'respostas': OrderedDict(),
+        'trava': threading.Lock(),
+    }
+
+def publicar_versao(versao):
+    global _VERSAO
+    _VERSAO = versao
+
+_VERSAO = carregar_agregados()
+
+# ============================================================================
+# RESPOSTAS
+# ============================================================================
+
+def _para_json(valor):
+    # Arrays e listas de textos do snapshot binário
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, Sequence):
+        return list(valor)
+    raise TypeError(f'{type(valor).__name__} não serializável')
+
+
+def resposta_em_cache(versao, rede, campos):
+    """(corpo JSON, ETag) da rede com os campos pedidos (None = todos), serializado uma vez por versão."""
+    chave = (rede, campos)
+    with versao['trava']:
+        if chave in versao['respostas']:
+            versao['respostas'].move_to_end(chave)
+            return versao['respostas'][chave]
+    bundle = versao['bundles'][rede]
+    dados = {'rede_formadora': rede, 'total_registros': bundle['total_registros']}
+    for parte in PARTES:
+        dados[parte] = {nome: valor for nome, valor in bundle[parte].items() if campos is None or nome in campos}
+    corpo = json.dumps(dados, ensure_ascii=False, separators=(',', ':'), default=_para_json).encode('utf-8')
+    resposta = (corpo, hashlib.blake2b(corpo, digest_size=16).hexdigest())
+    with versao['trava']:
+        versao['respostas'][chave] = resposta
+        while len(versao['respostas']) > TAMANHO_CACHE_RESPOSTAS:
+            versao['respostas'].popitem(last=False)
+    return resposta
+
+
+def registrar_rota(server):
+    """Adiciona '/api/dados' ao servidor Flask e passa a recarregar os agregados quando o arquivo mudar."""
+
+    @server.route(ROTA)
+    def api_dados():
+        versao = _VERSAO
+        rede = request.args.get('rede', REDE_TODAS)
+        if rede not in versao['bundles']:
+            return jsonify(erro=f"Rede '{rede}' não encontrada", redes=list(versao['bundles'])), 404
+        campos = None
+        if request.args.get('fields'):
+            campos = tuple(sorted({c.strip() for c in request.args['fields'].split(',') if c.strip()}))
+            disponiveis = {nome for parte in PARTES for nome in versao['bundles'][rede][parte]}
+            desconhecidos = [c for c in campos if c not in disponiveis]
+            if desconhecidos:
+                return jsonify(erro=f"Campos desconhecidos: {', '.join(desconhecidos)}",
+                               campos=sorted(disponiveis)), 400
+
+        corpo, etag = resposta_em_cache(versao, rede, campos)
+        codificacao = escolher_codificacao(request.headers.get('Accept-Encoding')) if len(corpo) >= TAMANHO_MINIMO else None
+        # Cada codificação é uma representação diferente e precisa de ETag própria
+        if codificacao:
+            etag = f'{etag}-{codificacao}'
+        if request.if_none_match.contains(etag):
+            resposta = Response(status=304)
+        else:
+            resposta = Response(comprimir(corpo, codificacao) if codificacao else corpo, mimetype='application/json')
+            if codificacao:
+                resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(etag)
+        resposta.vary.add('Accept-Encoding')
+        resposta.headers['Cache-Control'] = 'public, no-cache'
+        return resposta
+
+    recarga_dados.observar('api', lambda: ARQUIVOS_OBSERVADOS, carregar_agregados, publicar_versao, _VERSAO['assinatura'])
+    recarga_dados.iniciar()
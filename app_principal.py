@@ -4,6 +4,9 @@ from dash import Dash, dcc, html, Input, Output
 # Importe os módulos das suas páginas
 import dashboard_app
 import mapas_app
+import metricas
+import compactacao
+import api_agregados
 
 # Use um tema externo para um visual mais moderno
 import dash_bootstrap_components as dbc
@@ -78,6 +81,13 @@ def display_page(pathname):
 # É crucial fazer isso aqui, no arquivo principal
 dashboard_app.register_callbacks(app)
 mapas_app.register_callbacks(app)
+# Agregados pré-calculados em JSON para o front end estático (/api/dados)
+api_agregados.registrar_rota(app.server)
+# Latência e tamanho de cada callback, expostos em /metrics
+metricas.instrumentar(app)
+# Comprime as respostas; registrado depois das métricas para rodar antes delas
+# (o Flask executa os after_request em ordem inversa) e medir os bytes enviados
+compactacao.instalar(app.server)
 
 if __name__ == '__main__':
     app.run(debug=True, port=8051)
\ No newline at end of file
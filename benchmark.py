@@ -0,0 +1,533 @@
+# benchmark.py
+"""Benchmarks com exports sintéticos: geração dos dados públicos, layout e callbacks.
+
+Para cada tamanho pedido, um export no formato de 'dados_anonimizados.json' (com
+os campos JSON aninhados guardados como texto) é gerado de forma determinística.
+São cronometradas:
+
+- cada etapa de gerar_dados_publicos.py (carregar, achatar, transformar,
+  value_counts, groupby, cubo, montar, dump, snapshot e o cubo do servidor);
+- num processo separado, que importa os apps já com os dados gerados, o layout
+  de cada página, cada callback registrado (via requisições ao servidor Flask,
+  como faz o navegador) e as funções que montam os mapas.
+
+Sem a pasta 'geojson/', os mapas são medidos sobre os GeoJSON substitutos de
+teste_carga.py e o tamanho fica marcado com 'geojson_substituto': a comparação
+só confronta as medidas dos mapas de execuções com o mesmo tipo de GeoJSON.
+
+O resultado vai para um JSON ('benchmarks/<commit>.json' por padrão) que pode ser
+comparado com o de outro commit:
+
+    python benchmark.py --tamanhos 1000 10000
+    python benchmark.py --tamanhos 1000 10000 --comparar benchmarks/<commit_anterior>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from gerar_analises import CAMPOS_TEXTO
+from cubo_contagens import ARQUIVO_CUBO, salvar_cubo
+from gerar_dados_publicos import (COLUNA_REDE, COLUNAS_ACHATADAS, COLUNAS_CUBO, SIGLAS_ESTADOS, achatar_registro,
+                                  aplicar_transformacoes, celulas_cubo, contagens_por_rede, montar_arquivo_publico,
+                                  montar_bundles, pico_memoria_mb, redes_formadoras, series_por_rede, vagas_por_rede)
+from geojson_local import ARQUIVO_MUNICIPIOS, PASTA_GEOJSON, SIGLAS_IBGE
+from snapshot_dados import ARQUIVO_SNAPSHOT, escrever_snapshot
+
+PASTA_REPO = os.path.dirname(os.path.abspath(__file__))
+PASTA_RESULTADOS = 'benchmarks'
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+REPETICOES_PADRAO = 5
+# Idades e tempos de graduação calculados sempre em relação à mesma data
+DATA_REFERENCIA = date(2025, 1, 1)
+# Comparação: só conta como regressão o que piorar acima do limite relativo e do ruído absoluto
+LIMITE_REGRESSAO = 0.20
+RUIDO_MINIMO_MS = 1.0
+# Arquivos e pastas usados pelos apps, ligados da pasta atual para a pasta de cada tamanho
+RECURSOS_APPS = [PASTA_GEOJSON, 'resultados_analises.json', 'nuvens_palavras', 'analises']
+
+# ============================================================================
+# EXPORT SINTÉTICO
+# ============================================================================
+REDES = ['EBSERH', 'PROADI-SUS']
+ESPECIALIDADES = ['Cardiologia', 'Pediatria', 'Ginecologia e Obstetrícia', 'Psiquiatria', 'Dermatologia',
+                  'Endocrinologia', 'Oncologia Clínica', 'Neurologia', 'Ortopedia', 'Oftalmologia',
+                  'Otorrinolaringologia', 'Reumatologia', 'Nefrologia', 'Pneumologia', 'Gastroenterologia',
+                  'Geriatria', 'Infectologia', 'Urologia', 'Radiologia', 'Medicina de Família e Comunidade']
+FRASES = ['Espero aprender muito e melhorar a assistência à população.',
+          'Tenho receio da sobrecarga de trabalho e da falta de estrutura.',
+          'Será uma ótima oportunidade de crescimento profissional.',
+          'A burocracia é difícil e a organização ainda é confusa.',
+          'Quero fortalecer o SUS com qualificação e atendimento humanizado.',
+          'A distância do município dificulta a rotina, mas o apoio da equipe é bom.']
+
+
+def _talvez(rng, valor, chance_vazio=0.05):
+    return None if rng.random() < chance_vazio else valor
+
+
+def _data(rng, ano_inicial, ano_final):
+    return f'{rng.randint(ano_inicial, ano_final)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+
+
+def _municipios_por_uf():
+    """Nomes reais dos municípios (do repositório local de GeoJSON) ou nomes sintéticos."""
+    municipios = {}
+    for sigla, codigo in SIGLAS_IBGE.items():
+        caminho = next((c for c in (os.path.join(PASTA_GEOJSON, 'baixa', ARQUIVO_MUNICIPIOS.format(codigo=codigo)),
+                                    os.path.join(PASTA_GEOJSON, ARQUIVO_MUNICIPIOS.format(codigo=codigo)))
+                        if os.path.exists(c)), None)
+        if caminho:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                municipios[sigla] = [feature['properties']['name'] for feature in json.load(f)['features']]
+        else:
+            municipios[sigla] = [f'Município {i} {sigla}' for i in range(1, 51)]
+    return municipios
+
+
+def gerar_export_sintetico(n_registros, caminho, semente=0):
+    """Grava um export com `n_registros` registros, escrito em streaming (memória constante)."""
+    rng = random.Random(semente)
+    siglas = list(SIGLAS_ESTADOS)
+    municipios = _municipios_por_uf()
+    cursos = [f'{i}. Aprimoramento em {esp}' for i, esp in enumerate(ESPECIALIDADES, start=1)]
+
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write('{"RECORDS": [')
+        for i in range(n_registros):
+            sigla = rng.choice(siglas)
+            uf_vaga = rng.choice(siglas)
+            info = {
+                'raca_ds': _talvez(rng, rng.choice(['Branca', 'Parda', 'Preta', 'Amarela', 'Indígena'])),
+                'data_nascimento': _talvez(rng, _data(rng, 1955, 2000)),
+                'sexo_ds': rng.choice(['Feminino', 'Masculino', 'Macho']),
+                'estado_civil_ds': rng.choice(['Solteiro(a)', 'Casado(a)', 'Divorciado(a)', 'União estável']),
+                'ident_genero_ds': rng.choice(['Cisgênero', 'Transgênero', 'Não-binário', 'Prefiro não informar']),
+                'orientacao_sexual_ds': rng.choice(['Heterossexual', 'Homossexual', 'Bissexual', 'Prefiro não informar']),
+                'nome_social': rng.choice([None, '', 'Nome Social']),
+                'rg_uf_ds': _talvez(rng, SIGLAS_ESTADOS[sigla]),
+                'municipio': f'{rng.choice(municipios[sigla])} - {sigla}',
+            }
+            formacao = {
+                'data_formacao': _talvez(rng, _data(rng, 1980, 2024)),
+                'pais_formacao_ds': rng.choice(['Brasil'] * 8 + ['Cuba', 'Bolívia']),
+                'municipio_formacao': _talvez(rng, f'{rng.choice(municipios[sigla])} - {sigla}'),
+                'uf_crm_ds': _talvez(rng, SIGLAS_ESTADOS[rng.choice([sigla, uf_vaga])]),
+            }
+            listas = {
+                'aa_tipo_ds': _talvez(rng, rng.choice(['Ampla concorrência', 'Cotas raciais', 'Pessoa com deficiência'])),
+                'rm_rec_cnrm_ds': _talvez(rng, rng.choice(['Tenho residência médica reconhecida pela CNRM', 'Não'])),
+                'rm_1_esp_medica_ds': _talvez(rng, rng.choice(ESPECIALIDADES), 0.3),
+                'rm_2_esp_medica_ds': _talvez(rng, rng.choice(ESPECIALIDADES), 0.9),
+                'tit_esp_amb_ds': rng.choice(['Sim', 'Não']),
+                'amb_1_esp_medica_ds': _talvez(rng, rng.choice(ESPECIALIDADES), 0.6),
+                'amb_2_esp_medica_ds': _talvez(rng, rng.choice(ESPECIALIDADES), 0.95),
+                'vaga_principal_jdata': _talvez(rng, {
+                    'curso.nome': rng.choice(cursos),
+                    'ibge.no_uf': SIGLAS_ESTADOS[uf_vaga],
+                    'ibge.no_municipio': rng.choice(municipios[uf_vaga]),
+                }),
+            }
+            registro = {
+                'id': i + 1,
+                'info_pessoais': json.dumps(info, ensure_ascii=False),
+                'formacao_academica': json.dumps(formacao, ensure_ascii=False),
+                'listas_selecao': json.dumps(listas, ensure_ascii=False),
+                'apropriacao_redes': rng.choice(['A', 'B', 'C', 'D', 'E', None]),
+                'apropriacao_coordenacao': rng.choice(['A', 'B', 'C', 'D', 'E']),
+                'apropriacao_gestao': rng.choice(['A', 'B', 'C', 'D', 'E']),
+                'apropriacao_evidencias': rng.choice(['A', 'B', 'C', 'D', 'E']),
+                'apropriacao_economia': rng.choice(['A', 'B', 'C', 'D', 'E']),
+                COLUNA_REDE: _talvez(rng, rng.choice(REDES), 0.02),
+            }
+            for campo in CAMPOS_TEXTO:
+                registro[campo] = ' '.join(rng.sample(FRASES, rng.randint(0, 3)))
+            if i:
+                f.write(',')
+            json.dump(registro, f, ensure_ascii=False)
+        f.write(']}')
+    os.replace(temporario, caminho)
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def estatisticas(tempos_ms):
+    return {
+        'primeira_ms': round(tempos_ms[0], 3),
+        'mediana_ms': round(statistics.median(tempos_ms), 3),
+        'min_ms': round(min(tempos_ms), 3),
+        'repeticoes': len(tempos_ms),
+    }
+
+
+def cronometrar(funcao, repeticoes=1):
+    """Executa `funcao` `repeticoes` vezes; retorna (último resultado, estatísticas em ms)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return resultado, estatisticas(tempos)
+
+
+def medir_geracao(caminho_export, pasta_saida):
+    """Cronometra cada etapa de gerar_dados_publicos.py (modo tradicional) e grava os arquivos públicos."""
+    etapas = {}
+
+    def etapa(nome, funcao):
+        resultado, etapas[nome] = cronometrar(funcao)
+        return resultado
+
+    def carregar():
+        with open(caminho_export, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    dados = etapa('carregar', carregar)
+    df = etapa('achatar', lambda: pd.DataFrame([achatar_registro(r) for r in dados['RECORDS']], columns=COLUNAS_ACHATADAS))
+    del dados
+    df = etapa('transformar', lambda: aplicar_transformacoes(df, DATA_REFERENCIA))
+    df = df.assign(**{COLUNA_REDE: redes_formadoras(df)})
+    parcial = {'contagens': etapa('value_counts', lambda: contagens_por_rede(df))}
+    parcial['series'], parcial['vagas'] = etapa('groupby', lambda: (series_por_rede(df), vagas_por_rede(df)))
+    parcial['cubo'] = etapa('cubo', lambda: celulas_cubo(df))
+    arquivo_publico = etapa('montar', lambda: montar_arquivo_publico(montar_bundles(parcial)))
+
+    def dump():
+        with open(os.path.join(pasta_saida, 'dados_publicos.json'), 'w', encoding='utf-8') as f:
+            json.dump(arquivo_publico, f, ensure_ascii=False, indent=2)
+
+    etapa('dump', dump)
+    etapa('snapshot', lambda: escrever_snapshot(arquivo_publico, os.path.join(pasta_saida, ARQUIVO_SNAPSHOT)))
+    etapa('salvar_cubo', lambda: salvar_cubo(parcial['cubo'], COLUNAS_CUBO, os.path.join(pasta_saida, ARQUIVO_CUBO)))
+    return etapas
+
+# ============================================================================
+# MEDIÇÃO DOS APPS (executada num processo separado, na pasta de cada tamanho)
+# ============================================================================
+
+def _id_json(id_componente):
+    return json.dumps(id_componente, separators=(',', ':'), sort_keys=True)
+
+
+def _chave(id_componente):
+    return _id_json(id_componente) if isinstance(id_componente, dict) else id_componente
+
+
+def _propriedade(item):
+    id_componente, propriedade, *valor = item
+    return {'id': id_componente, 'property': propriedade, **({'value': valor[0]} if valor else {})}
+
+
+def _especificacao(itens):
+    return [[_propriedade(i) for i in item] if isinstance(item, list) else _propriedade(item) for item in itens]
+
+
+def corpo_callback(saidas, entradas, estados=(), alterado=None):
+    """Corpo de uma requisição '/_dash-update-component', como o navegador envia.
+
+    Cada item é (id, propriedade[, valor]); uma lista de itens representa um id com ALL.
+    """
+    chaves = []
+    for saida in saidas:
+        if isinstance(saida, list):
+            # Saída com ALL: na chave, os campos que variam entre os ids viram o curinga
+            ids = [item[0] for item in saida]
+            padrao = {campo: valor if all(i[campo] == valor for i in ids) else ['ALL'] for campo, valor in ids[0].items()}
+            chaves.append(f'{_id_json(padrao)}.{saida[0][1]}')
+        else:
+            chaves.append(f'{_chave(saida[0])}.{saida[1]}')
+    primeira = entradas[0][0] if isinstance(entradas[0], list) else entradas[0]
+    especificacao_saidas = _especificacao(saidas)
+    return {
+        'output': chaves[0] if len(chaves) == 1 else '..' + '...'.join(chaves) + '..',
+        'outputs': especificacao_saidas[0] if len(saidas) == 1 else especificacao_saidas,
+        'inputs': _especificacao(entradas),
+        'state': _especificacao(estados),
+        'changedPropIds': [alterado or f'{_chave(primeira[0])}.{primeira[1]}'],
+    }
+
+
+def cenarios_callbacks(dashboard_app):
+    """{nome: (chave do callback em app.callback_map, corpo da requisição)} cobrindo todos os callbacks."""
+    colunas = list(dashboard_app.GRAFICOS_QUANTITATIVOS)
+    grafico = lambda coluna: {'type': 'grafico-cubo', 'coluna': coluna}
+    filtros = {'sexo_ds': ['Feminino']}
+    rede = dashboard_app.REDE_TODAS
+    cenarios = {}
+
+    for pagina in ('/dashboard', '/mapas'):
+        cenarios[f'pagina{pagina}'] = corpo_callback([('page-content', 'children')], [('url', 'pathname', pagina)])
+
+    for secao_id, _, _ in dashboard_app.SECOES_DASHBOARD:
+        for nome, filtros_secao in ((secao_id, {}), (f'{secao_id}+filtro', filtros)):
+            cenarios[f'secao[{nome}]'] = corpo_callback(
+                [({'type': 'secao-dashboard', 'secao': secao_id}, 'children'),
+                 ({'type': 'secao-carregada', 'secao': secao_id}, 'data')],
+                [('acordeao-secoes', 'active_item', [secao_id])],
+                [({'type': 'secao-carregada', 'secao': secao_id}, 'data', False),
+                 ('dropdown-rede', 'value', rede), ('filtros-cubo', 'data', filtros_secao)])
+
+    cenarios['filtro[clique]'] = corpo_callback(
+        [('filtros-cubo', 'data')],
+        [[(grafico(c), 'clickData', {'points': [{'x': 'Feminino'}]} if c == 'sexo_ds' else None) for c in colunas],
+         ('botao-limpar-filtros', 'n_clicks', 0)],
+        [('filtros-cubo', 'data', {})],
+        alterado=f"{_id_json(grafico('sexo_ds'))}.clickData")
+    for nome, filtros_graficos in (('sem_filtro', {}), ('com_filtro', filtros)):
+        cenarios[f'graficos[{nome}]'] = corpo_callback(
+            [[(grafico(c), 'figure') for c in colunas], ('resumo-filtros', 'children')],
+            [('filtros-cubo', 'data', filtros_graficos), ('dropdown-rede', 'value', rede)])
+    cenarios['apropriacao'] = corpo_callback(
+        [('grafico-apropriacao', 'figure')],
+        [('dropdown-apropriacao', 'value', 'apropriacao_gestao'), ('dropdown-rede', 'value', rede),
+         ('filtros-cubo', 'data', filtros)])
+    cenarios['qualitativo'] = corpo_callback(
+        [('nuvem-palavras', 'src'), ('nuvem-palavras', 'srcSet'), ('nuvem-palavras-webp', 'srcSet'),
+         ('grafico-sentimentos', 'figure'), ('resumo-textos', 'children')],
+        [('dropdown-qualitativo', 'value', next(iter(CAMPOS_TEXTO))), ('dropdown-rede', 'value', rede)])
+    cenarios['termos'] = corpo_callback(
+        [('grafico-termos', 'figure'), ('bloco-termos', 'style'), ('bloco-nuvem', 'style')],
+        [('dropdown-qualitativo', 'value', next(iter(CAMPOS_TEXTO))), ('dropdown-rede', 'value', rede),
+         ('filtro-sentimento-termos', 'value', 'Negativo')])
+
+    for largura, nome in ((None, 'desktop'), (400, 'celular')):
+        cenarios[f'mapa_brasil[{nome}]'] = corpo_callback(
+            [('mapa-principal', 'figure')],
+            [('dropdown-tipo-mapa', 'value', 'vaga_uf'), ('dropdown-rede-mapas', 'value', rede),
+             ('largura-tela-mapas', 'data', largura)])
+        cenarios[f'mapa_municipios[{nome}]'] = corpo_callback(
+            [('container-municipios', 'children')],
+            [('mapa-principal', 'clickData', {'points': [{'location': 'São Paulo'}]}),
+             ('dropdown-tipo-mapa', 'value', 'vaga_uf'), ('dropdown-rede-mapas', 'value', rede)],
+            [('largura-tela-mapas', 'data', largura)])
+    return cenarios
+
+
+def medir_apps(repeticoes=REPETICOES_PADRAO):
+    """Cronometra layout, callbacks e mapas dos apps carregados a partir da pasta atual."""
+    resultados = {}
+    app_principal, resultados['importar_apps'] = cronometrar(lambda: __import__('app_principal'))
+    import dashboard_app
+    import mapas_app
+    # O pré-aquecimento dos mapas roda em segundo plano: espera terminar para não competir com as medições
+    for thread in threading.enumerate():
+        if thread.name == 'pre-aquecer-mapas':
+            thread.join()
+
+    _, resultados['layout.dashboard[nova_versao]'] = cronometrar(dashboard_app.carregar_dados_publicos, repeticoes)
+    _, resultados['layout.dashboard'] = cronometrar(dashboard_app.create_layout, repeticoes)
+    _, resultados['layout.mapas'] = cronometrar(mapas_app.create_layout, repeticoes)
+
+    cliente = app_principal.server.test_client()
+    cobertos = set()
+    for nome, corpo in cenarios_callbacks(dashboard_app).items():
+        cobertos.add(corpo['output'])
+        resposta, resultados[f'callback.{nome}'] = cronometrar(
+            lambda: cliente.post('/_dash-update-component', json=corpo), repeticoes)
+        if resposta.status_code not in (200, 204):
+            resultados[f'callback.{nome}']['erro'] = resposta.status_code
+    # Callbacks de servidor sem cenário aparecem no resultado, para o benchmark não ficar desatualizado
+    sem_cenario = [chave for chave, callback in app_principal.app.callback_map.items()
+                   if 'callback' in callback and chave not in cobertos]
+    if sem_cenario:
+        resultados['callbacks_sem_cenario'] = sem_cenario
+
+    versao = mapas_app._VERSAO
+    mapas_todas = versao['mapas_por_rede'][mapas_app.REDE_TODAS]
+    vagas_todas = versao['vagas_por_rede'][mapas_app.REDE_TODAS]
+    sigla = max(vagas_todas, key=lambda s: len(vagas_todas[s]), default='SP')
+    for resolucao in mapas_app.RESOLUCOES:
+        _, resultados[f'mapas.criar_mapa_calor_estados[{resolucao}]'] = cronometrar(
+            lambda: mapas_app.criar_mapa_calor_estados(mapas_todas['vaga_uf'], 'Vagas', resolucao), repeticoes)
+        _, resultados[f'mapas.criar_mapa_municipios_estado[{sigla},{resolucao}]'] = cronometrar(
+            lambda: mapas_app.criar_mapa_municipios_estado(sigla, vagas_todas, resolucao), repeticoes)
+    resultados['pico_memoria_mb'] = pico_memoria_mb()
+    return resultados
+
+
+def _preparar_pasta_apps(pasta, pasta_origem):
+    """Liga na pasta de trabalho os GeoJSON e as análises da pasta de origem (se existirem).
+
+    Sem GeoJSON na origem, grava os substitutos de teste_carga.py (os mapas não mediriam
+    só o caminho de erro); retorna True nesse caso.
+    """
+    substituto = not os.path.isdir(os.path.join(pasta_origem, PASTA_GEOJSON))
+    if substituto and not os.path.lexists(os.path.join(pasta, PASTA_GEOJSON)):
+        from teste_carga import gerar_geojson_substituto  # teste_carga importa deste módulo
+        with open(os.path.join(pasta, 'dados_publicos.json'), 'r', encoding='utf-8') as f:
+            gerar_geojson_substituto(os.path.join(pasta, PASTA_GEOJSON), json.load(f))
+    for nome in RECURSOS_APPS:
+        origem, destino = os.path.join(pasta_origem, nome), os.path.join(pasta, nome)
+        if os.path.exists(origem) and not os.path.lexists(destino):
+            try:
+                os.symlink(origem, destino, target_is_directory=os.path.isdir(origem))
+            except OSError:  # sem permissão para links simbólicos (Windows): copia
+                (shutil.copytree if os.path.isdir(origem) else shutil.copy2)(origem, destino)
+    return substituto
+
+# ============================================================================
+# EXECUÇÃO E COMPARAÇÃO
+# ============================================================================
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PASTA_REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos, pasta_trabalho, repeticoes=REPETICOES_PADRAO, semente=0):
+    """Roda o benchmark para cada tamanho e retorna o dicionário de resultados."""
+    resultados = {
+        'versao': 1,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'semente': semente,
+        'repeticoes': repeticoes,
+        'tamanhos': {},
+    }
+    # Os apps leem GeoJSON e análises da pasta atual, como quando rodam de verdade
+    pasta_origem = os.getcwd()
+    for n in tamanhos:
+        pasta = os.path.join(pasta_trabalho, str(n))
+        os.makedirs(pasta, exist_ok=True)
+        export = os.path.join(pasta, f'export_{n}_{semente}.json')
+        if not os.path.exists(export):
+            print(f"🔄 Gerando export sintético com {n} registros...")
+            gerar_export_sintetico(n, export, semente)
+
+        print(f"⏱️  {n} registros: etapas da geração...")
+        # Cada tamanho em processo próprio: pico de memória e caches não se misturam entre tamanhos
+        geracao = _executar_filho(['--medir-geracao', export, pasta])
+        print(f"⏱️  {n} registros: layout, callbacks e mapas...")
+        substituto = _preparar_pasta_apps(pasta, pasta_origem)
+        apps = _executar_filho(['--medir-apps', pasta, '--repeticoes', str(repeticoes)], cwd=pasta)
+        resultados['tamanhos'][str(n)] = {
+            'tamanho_export_mb': round(os.path.getsize(export) / 1e6, 2),
+            'geojson_substituto': substituto,
+            'geracao': geracao,
+            'apps': apps,
+        }
+    return resultados
+
+
+def _executar_filho(argumentos, cwd=None):
+    """Roda este script em outro processo e lê o JSON impresso na última linha da saída."""
+    processo = subprocess.run([sys.executable, os.path.join(PASTA_REPO, 'benchmark.py')] + argumentos,
+                              cwd=cwd, capture_output=True, text=True, encoding='utf-8')
+    if processo.returncode != 0:
+        print(processo.stdout[-2000:], processo.stderr[-4000:])
+        raise RuntimeError(f"Falha no benchmark ({' '.join(argumentos)})")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def _medianas(resultados):
+    """{(tamanho, grupo, etapa): mediana em ms} de um arquivo de resultados."""
+    return {(n, grupo, etapa): medida['mediana_ms']
+            for n, por_tamanho in resultados['tamanhos'].items()
+            for grupo in ('geracao', 'apps')
+            for etapa, medida in por_tamanho.get(grupo, {}).items() if isinstance(medida, dict)}
+
+
+def _mede_mapa(etapa):
+    return etapa.startswith(('mapas.', 'callback.mapa_'))
+
+
+def comparar(atual, base, limite=LIMITE_REGRESSAO):
+    """Imprime as diferenças entre dois resultados; retorna as regressões [(chave, base_ms, atual_ms)].
+
+    As medidas dos mapas de um tamanho só entram se as duas execuções usaram o mesmo
+    tipo de GeoJSON (real ou substituto).
+    """
+    medianas_atual, medianas_base = _medianas(atual), _medianas(base)
+    regressoes = []
+    substituto = lambda resultados, n: resultados['tamanhos'].get(n, {}).get('geojson_substituto', False)
+    ignorados = {n for n in atual['tamanhos'] if substituto(atual, n) != substituto(base, n)}
+    print(f"\n📊 Comparação com o commit {base.get('commit')} (mediana, ms):")
+    if ignorados:
+        print(f"   Mapas ignorados em {', '.join(sorted(ignorados, key=int))} registros: "
+              "um dos resultados usou GeoJSON substitutos.")
+    chaves = {c for c in medianas_atual.keys() & medianas_base.keys() if not (c[0] in ignorados and _mede_mapa(c[2]))}
+    for chave in sorted(chaves, key=lambda c: (int(c[0]), c[1], c[2])):
+        antes, depois = medianas_base[chave], medianas_atual[chave]
+        variacao = (depois - antes) / antes if antes else 0.0
+        regressao = variacao > limite and depois - antes > RUIDO_MINIMO_MS
+        if regressao:
+            regressoes.append((chave, antes, depois))
+        marca = '🔴' if regressao else '🟢' if variacao < -limite and antes - depois > RUIDO_MINIMO_MS else '  '
+        print(f"{marca} {chave[0]:>8} {chave[1]:<8} {chave[2]:<55} {antes:>10.1f} {depois:>10.1f} {variacao:>+7.0%}")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks da geração de dados e dos apps com exports sintéticos.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help=f"Número de registros de cada export (padrão: {' '.join(map(str, TAMANHOS_PADRAO))}).")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO,
+                        help=f"Repetições de cada medição dos apps (padrão: {REPETICOES_PADRAO}).")
+    parser.add_argument('--semente', type=int, default=0, help="Semente do gerador sintético.")
+    parser.add_argument('--pasta-trabalho', default=None,
+                        help="Pasta para os exports e arquivos gerados; reaproveitada entre execuções (padrão: temporária).")
+    parser.add_argument('--saida', default=None,
+                        help=f"Arquivo de resultados (padrão: {PASTA_RESULTADOS}/<commit>.json).")
+    parser.add_argument('--comparar', default=None, help="Resultado anterior para comparação; sai com código 1 se houver regressão.")
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO,
+                        help=f"Piora relativa considerada regressão (padrão: {LIMITE_REGRESSAO}).")
+    # Modos internos, usados pelos processos filhos
+    parser.add_argument('--medir-geracao', nargs=2, metavar=('EXPORT', 'PASTA'), help=argparse.SUPPRESS)
+    parser.add_argument('--medir-apps', metavar='PASTA', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir_geracao:
+        etapas = medir_geracao(*args.medir_geracao)
+        etapas['pico_memoria_mb'] = pico_memoria_mb()
+        print(json.dumps(etapas))
+        return
+    if args.medir_apps:
+        sys.path.insert(0, PASTA_REPO)
+        os.chdir(args.medir_apps)
+        print(json.dumps(medir_apps(args.repeticoes)))
+        return
+
+    temporaria = args.pasta_trabalho is None
+    pasta_trabalho = args.pasta_trabalho or tempfile.mkdtemp(prefix='benchmark_pmme_')
+    try:
+        resultados = executar(args.tamanhos, pasta_trabalho, args.repeticoes, args.semente)
+    finally:
+        if temporaria:
+            shutil.rmtree(pasta_trabalho, ignore_errors=True)
+
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"{resultados['commit'] or 'sem_commit'}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados gravados em '{saida}'")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.limite)
+        if regressoes:
+            print(f"⚠️  {len(regressoes)} regressões acima de {args.limite:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# compactacao.py
+"""Respostas menores: figuras enxutas e compressão HTTP (gzip ou brotli).
+
+`enxugar` percorre o JSON de figuras (soltas ou dentro de layouts) e remove o
+que o navegador não usa:
+
+- do template, só ficam os padrões dos tipos de trace presentes na figura;
+- no GeoJSON dos mapas, só fica a propriedade usada em `featureidkey`;
+- números reais inteiros viram inteiros e os demais são arredondados para
+  ALGARISMOS_SIGNIFICATIVOS (as coordenadas do GeoJSON já vêm quantizadas).
+
+`instalar` comprime as respostas do servidor Flask acima de TAMANHO_MINIMO.
+Respostas repetidas (figuras em cache, bundles JavaScript do Dash) são
+comprimidas uma única vez: o resultado fica num LRU indexado pelo hash do
+corpo, limitado a LIMITE_CACHE_BYTES. O brotli é usado se o pacote 'brotli'
+estiver instalado e o navegador aceitar; senão, gzip. Uma ETag forte da
+resposta ganha o sufixo da codificação.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # 'brotli' é opcional: sem ele as respostas saem em gzip
+    brotli = None
+
+ALGARISMOS_SIGNIFICATIVOS = 6
+TAMANHO_MINIMO = 1024
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5
+LIMITE_CACHE_BYTES = 64 * 1024 * 1024
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/javascript', 'text/', 'image/svg+xml')
+
+# ============================================================================
+# FIGURAS ENXUTAS
+# ============================================================================
+
+def _arredondar(valor):
+    if valor.is_integer() and abs(valor) < 2 ** 53:
+        return int(valor)
+    return float(f'{valor:.{ALGARISMOS_SIGNIFICATIVOS}g}')
+
+
+def _enxugar_valores(objeto):
+    if isinstance(objeto, float):
+        return _arredondar(objeto)
+    if isinstance(objeto, list):
+        return [_enxugar_valores(v) for v in objeto]
+    if isinstance(objeto, dict):
+        return {chave: v if chave == 'geojson' else _enxugar_valores(v) for chave, v in objeto.items()}
+    return objeto
+
+
+def _enxugar_geojson(trace):
+    """Mantém nas features só a propriedade usada para ligar as regiões aos valores."""
+    geojson = trace.get('geojson')
+    chave = trace.get('featureidkey', 'id')
+    if not isinstance(geojson, dict) or not chave.startswith('properties.'):
+        return trace
+    propriedade = chave.split('.', 1)[1]
+    features = [{**feature, 'properties': {propriedade: feature.get('properties', {}).get(propriedade)}}
+                for feature in geojson.get('features', [])]
+    return {**trace, 'geojson': {**geojson, 'features': features}}
+
+
+def enxugar_figura(figura):
+    """Figura (dicionário JSON do Plotly) sem atributos que não alteram o desenho."""
+    dados = [_enxugar_geojson(trace) for trace in figura.get('data', [])]
+    layout = dict(figura.get('layout', {}))
+    template = layout.get('template')
+    if isinstance(template, dict) and 'data' in template:
+        tipos = {trace.get('type', 'scatter') for trace in dados}
+        layout['template'] = {**template, 'data': {t: v for t, v in template['data'].items() if t in tipos}}
+    return _enxugar_valores({**figura, 'data': dados, 'layout': layout})
+
+
+def enxugar(objeto):
+    """Aplica `enxugar_figura` a toda figura encontrada no JSON (figuras soltas ou dentro de layouts)."""
+    if isinstance(objeto, dict):
+        if isinstance(objeto.get('data'), list) and isinstance(objeto.get('layout'), dict):
+            return enxugar_figura(objeto)
+        return {chave: enxugar(v) for chave, v in objeto.items()}
+    if isinstance(objeto, list):
+        return [enxugar(v) for v in objeto]
+    return objeto
+
+# ============================================================================
+# COMPRESSÃO HTTP
+# ============================================================================
+# (hash do corpo, codificação) -> corpo comprimido
+_COMPRIMIDOS = OrderedDict()
+_BYTES_EM_CACHE = 0
+_TRAVA = threading.Lock()
+
+
+def escolher_codificacao(accept_encoding):
+    """'br', 'gzip' ou None, conforme o cabeçalho Accept-Encoding do navegador."""
+    aceitas = set()
+    for item in (accept_encoding or '').split(','):
+        nome, _, parametros = item.strip().partition(';')
+        if parametros.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            aceitas.add(nome.strip().lower())
+    if brotli is not None and 'br' in aceitas:
+        return 'br'
+    if 'gzip' in aceitas or '*' in aceitas:
+        return 'gzip'
+    return None
+
+
+def comprimir(corpo, codificacao):
+    """Corpo comprimido, reaproveitado do cache quando o mesmo corpo já foi comprimido."""
+    global _BYTES_EM_CACHE
+    chave = (hashlib.blake2b(corpo, digest_size=16).digest(), codificacao)
+    with _TRAVA:
+        if chave in _COMPRIMIDOS:
+            _COMPRIMIDOS.move_to_end(chave)
+            return _COMPRIMIDOS[chave]
+    if codificacao == 'br':
+        comprimido = brotli.compress(corpo, quality=QUALIDADE_BROTLI)
+    else:
+        comprimido = gzip.compress(corpo, compresslevel=NIVEL_GZIP, mtime=0)
+    with _TRAVA:
+        if chave not in _COMPRIMIDOS:
+            _COMPRIMIDOS[chave] = comprimido
+            _BYTES_EM_CACHE += len(comprimido)
+            while _BYTES_EM_CACHE > LIMITE_CACHE_BYTES and _COMPRIMIDOS:
+                _BYTES_EM_CACHE -= len(_COMPRIMIDOS.popitem(last=False)[1])
+    return comprimido
+
+
+def instalar(server):
+    """Comprime as respostas do servidor Flask que valem a pena."""
+    from flask import request
+
+    @server.after_request
+    def _comprimir_resposta(resposta):
+        if (resposta.direct_passthrough or resposta.status_code < 200 or resposta.status_code in (204, 304)
+                or 'Content-Encoding' in resposta.headers
+                or not (resposta.mimetype or '').startswith(TIPOS_COMPRIMIVEIS)):
+            return resposta
+        resposta.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao(request.headers.get('Accept-Encoding'))
+        corpo = resposta.get_data()
+        if codificacao is None or len(corpo) < TAMANHO_MINIMO:
+            return resposta
+        etag, fraca = resposta.get_etag()
+        if etag and not fraca:
+            # Cada codificação é uma representação diferente e precisa de ETag própria (como em api_agregados)
+            etag = f'{etag}-{codificacao}'
+            resposta.set_etag(etag)
+            if request.if_none_match.contains(etag):
+                # A rota comparou If-None-Match com a ETag sem codificação: o 304 é decidido aqui
+                resposta.status_code = 304
+                resposta.set_data(b'')
+                return resposta
+        resposta.set_data(comprimir(corpo, codificacao))
+        resposta.headers['Content-Encoding'] = codificacao
+        return resposta
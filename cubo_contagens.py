@@ -0,0 +1,128 @@
+# cubo_contagens.py
+"""Cubo de contagens esparso e codificado por dicionário.
+
+Cada célula do cubo é uma combinação de valores das dimensões categóricas
+(rede, colunas dos gráficos, idades) com o número de profissionais que a
+possuem. No arquivo o cubo fica em formato colunar: para cada dimensão, a
+lista de categorias e um array de códigos (uint8/uint16, em base64), além de
+um array com a contagem de cada célula.
+
+Com tantas dimensões quase toda célula é uma pessoa: o cubo fica num arquivo
+só do servidor ('cubo_privado.json'), que não é versionado nem publicado.
+O que sai dele são as respostas às consultas, e cada uma passa por `suprimir`:
+valores com menos de K_MINIMO profissionais não aparecem, mas a soma deles é
+informada à parte, para que os totais filtrados continuem fechando.
+
+O dashboard responde a qualquer combinação de filtros somando as contagens
+das células selecionadas com NumPy, sem tocar em registros individuais.
+"""
+import base64
+import json
+import os
+
+import numpy as np
+
+ARQUIVO_CUBO = 'cubo_privado.json'  # contagens quase por registro: NÃO versionar nem publicar
+K_MINIMO = 5
+
+
+def _ordenar_categorias(valores):
+    try:
+        return sorted(valores)
+    except TypeError:
+        return sorted(valores, key=str)
+
+
+def codificar_cubo(celulas, dimensoes):
+    """Converte {(valor_dim1, valor_dim2, ...): qtd} no dicionário serializável do cubo.
+
+    Valores ausentes (None) recebem o código igual ao número de categorias da dimensão.
+    """
+    chaves = [chave for chave, qtd in celulas.items() if qtd > 0]
+    cubo = {'dimensoes': list(dimensoes), 'categorias': {}, 'tipos': {}, 'codigos': {}, 'n_celulas': len(chaves)}
+    codigos_por_dim = []
+    for i, dim in enumerate(dimensoes):
+        valores = [chave[i] for chave in chaves]
+        categorias = _ordenar_categorias({v for v in valores if v is not None})
+        indice = {v: codigo for codigo, v in enumerate(categorias)}
+        tipo = np.uint8 if len(categorias) < np.iinfo(np.uint8).max else np.uint16
+        codigos_por_dim.append(np.array([indice.get(v, len(categorias)) for v in valores], dtype=tipo))
+        cubo['categorias'][dim] = categorias
+        cubo['tipos'][dim] = np.dtype(tipo).name
+
+    # Células em ordem lexicográfica dos códigos: o arquivo não depende da ordem de leitura
+    ordem = np.lexsort(codigos_por_dim[::-1]) if chaves else np.array([], dtype=np.intp)
+    for dim, codigos in zip(dimensoes, codigos_por_dim):
+        cubo['codigos'][dim] = base64.b64encode(codigos[ordem].tobytes()).decode('ascii')
+    contagens = np.array([celulas[chave] for chave in chaves], dtype=np.uint32)[ordem]
+    cubo['contagens'] = base64.b64encode(contagens.tobytes()).decode('ascii')
+    return cubo
+
+
+def decodificar_cubo(cubo):
+    """Reconstrói os arrays NumPy a partir do dicionário gravado por `codificar_cubo`."""
+    return {
+        'dimensoes': cubo['dimensoes'],
+        'categorias': cubo['categorias'],
+        'codigos': {dim: np.frombuffer(base64.b64decode(cubo['codigos'][dim]), dtype=cubo['tipos'][dim])
+                    for dim in cubo['dimensoes']},
+        'contagens': np.frombuffer(base64.b64decode(cubo['contagens']), dtype=np.uint32).astype(np.int64),
+    }
+
+
+def salvar_cubo(celulas, dimensoes, caminho=ARQUIVO_CUBO):
+    """Grava o cubo em `caminho`, de forma atômica (o dashboard pode estar lendo o anterior)."""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(codificar_cubo(celulas, dimensoes), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporario, caminho)
+
+
+def carregar_cubo(caminho=ARQUIVO_CUBO):
+    """Cubo decodificado de `caminho`; None se o arquivo não existir (sem filtragem cruzada)."""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return decodificar_cubo(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def mascara_filtros(cubo, filtros, ignorar=None):
+    """Células que atendem a todos os filtros {dim: [valores]}, exceto o da dimensão `ignorar`."""
+    mascara = np.ones(len(cubo['contagens']), dtype=bool)
+    for dim, valores in filtros.items():
+        if dim == ignorar or not valores or dim not in cubo['codigos']:
+            continue
+        categorias = cubo['categorias'][dim]
+        codigos_aceitos = [categorias.index(v) for v in valores if v in categorias]
+        mascara &= np.isin(cubo['codigos'][dim], codigos_aceitos)
+    return mascara
+
+
+def contar(cubo, dim, mascara):
+    """Contagem {valor: qtd} da dimensão nas células da máscara, em ordem decrescente."""
+    categorias = cubo['categorias'][dim]
+    totais = np.bincount(cubo['codigos'][dim][mascara], weights=cubo['contagens'][mascara],
+                         minlength=len(categorias) + 1)[:len(categorias)]
+    ordem = np.argsort(-totais, kind='stable')
+    return {categorias[i]: int(totais[i]) for i in ordem if totais[i] > 0}
+
+
+def total(cubo, mascara):
+    return int(cubo['contagens'][mascara].sum())
+
+
+def suprimir(contagem, k_minimo=K_MINIMO):
+    """Separa de {valor: qtd} os valores com menos de `k_minimo` profissionais: (publicáveis, total suprimido).
+
+    Se o total suprimido ficar entre 1 e `k_minimo` - 1, os menores valores publicáveis
+    também são suprimidos (supressão secundária), para que o total não revele um grupo
+    pequeno; ele só fica abaixo de `k_minimo` quando a consulta inteira é menor que isso.
+    """
+    suprimidos, total_suprimido = set(), 0
+    for valor, qtd in sorted(contagem.items(), key=lambda item: item[1]):
+        if qtd >= k_minimo and not 0 < total_suprimido < k_minimo:
+            break
+        suprimidos.add(valor)
+        total_suprimido += qtd
+    return {valor: qtd for valor, qtd in contagem.items() if valor not in suprimidos}, total_suprimido
@@ -1,71 +1,306 @@
 # dashboard_app.py
+import copy
 import json
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from dash import dcc, html, Input, Output
-import base64
+from dash import dcc, html, Input, Output, State, ALL, Patch, ctx, no_update
+from dash.exceptions import PreventUpdate
 import os
+from plotly.io.json import to_json_plotly
+import dash_bootstrap_components as dbc
+
+from cubo_contagens import ARQUIVO_CUBO, K_MINIMO, carregar_cubo, mascara_filtros, contar, suprimir
+from nuvens_estaticas import publicar_nuvem, registrar_rota
+from compactacao import enxugar
+from histogramas import classes, resumir_contagens, resumir_valores
+from indice_termos import SENTIMENTOS, TERMOS_GRAFICO, carregar_indice, termos_mais_frequentes
+import metricas
+import recarga_dados
+from recarga_dados import assinatura_arquivos
+from snapshot_dados import ARQUIVO_SNAPSHOT, caminho_dados_publicos, carregar_arquivo_publico
 
 # ============================================================================
 # CARREGAR DADOS PÚBLICOS E RESULTADOS
 # ============================================================================
 PASTA_NUVENS = 'nuvens_palavras'
+PASTA_ANALISES = 'analises'
+REDE_TODAS = 'Todas'
+
+ARQUIVO_DADOS = 'dados_publicos.json'
+COLUNA_REDE = 'rede_formadora'
+
+ARQUIVO_ANALISES = 'resultados_analises.json'
+
+def carregar_resultados_analises():
+    """Lê 'resultados_analises.json' (todas as redes); None se o arquivo não existir."""
+    try:
+        with open(ARQUIVO_ANALISES, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"AVISO: '{ARQUIVO_ANALISES}' não encontrado. Parte qualitativa do dashboard estará vazia.")
+        return None
+
+def carregar_analises_rede(rede):
+    """Lê 'analises/<rede>/resultados_analises.json', ajustando o caminho das nuvens para a pasta da rede."""
+    try:
+        with open(os.path.join(PASTA_ANALISES, rede, ARQUIVO_ANALISES), 'r', encoding='utf-8') as f:
+            analises = json.load(f)
+    except FileNotFoundError:
+        return None
+    for campo in analises.get('campos', {}).values():
+        if campo.get('nuvem_palavras'):
+            # Os arquivos por rede foram gerados no Windows ('nuvens_palavras\campo.png')
+            partes = campo['nuvem_palavras'].replace('\\', '/').split('/')
+            campo['nuvem_palavras'] = os.path.join(PASTA_ANALISES, rede, *partes)
+    return analises
+
+def arquivos_observados():
+    """Arquivos cuja mudança gera uma nova versão dos dados do dashboard."""
+    arquivos = [ARQUIVO_DADOS, ARQUIVO_SNAPSHOT, ARQUIVO_CUBO, ARQUIVO_ANALISES]
+    if os.path.isdir(PASTA_ANALISES):
+        arquivos += [os.path.join(PASTA_ANALISES, rede, ARQUIVO_ANALISES) for rede in sorted(os.listdir(PASTA_ANALISES))]
+    return arquivos
+
+def carregar_dados_publicos():
+    """Lê os arquivos de dados e monta uma versão completa, sem tocar na versão em uso.
+
+    Se houver snapshot binário atualizado, os arrays são mapeados do arquivo em vez de copiados.
+    A versão é um dicionário com os agregados por rede, o cubo, as análises e os caches
+    de layout e figuras; os callbacks pegam a versão atual uma vez e usam só ela.
+    """
+    # Assinatura lida antes dos arquivos: uma mudança durante a carga gera outra recarga
+    assinatura = assinatura_arquivos(arquivos_observados())
+    arquivo_publico = carregar_arquivo_publico(caminho_dados_publicos(ARQUIVO_DADOS))
+    dados_publicos = arquivo_publico['dashboard']
+    faltando = [coluna for coluna in GRAFICOS_QUANTITATIVOS if coluna not in dados_publicos]
+    if faltando:
+        raise ValueError(f"Dados públicos sem as colunas: {', '.join(faltando)}")
 
-with open('dados_publicos.json', 'r', encoding='utf-8') as f:
-    dados_publicos = json.load(f)['dashboard']
+    # Agregados pré-calculados por rede formadora ('Todas' + redes presentes no arquivo)
+    por_rede = {REDE_TODAS: dados_publicos}
+    por_rede.update({rede: bundle['dashboard'] for rede, bundle in arquivo_publico.get('redes', {}).items()})
+    # Arquivos de versões antigas trazem a lista de valores dos histogramas em vez do resumo
+    for dados in por_rede.values():
+        for coluna, (_, tipo) in GRAFICOS_QUANTITATIVOS.items():
+            if tipo == 'histograma' and not isinstance(dados.get(coluna), dict):
+                dados[coluna] = resumir_valores(dados.get(coluna, []))
 
-try:
-    with open('resultados_analises.json', 'r', encoding='utf-8') as f:
-        RESULTADOS_ANALISES = json.load(f)
-except FileNotFoundError:
-    print("AVISO: 'resultados_analises.json' não encontrado. Parte qualitativa do dashboard estará vazia.")
-    RESULTADOS_ANALISES = None
+    resultados_por_rede = {rede: carregar_analises_rede(rede) for rede in por_rede if rede != REDE_TODAS}
+    resultados_por_rede[REDE_TODAS] = carregar_resultados_analises()
+    # Contagens de termos de cada campo: só em 'Todas', já que elas vêm separadas por rede
+    indices_termos = {campo: carregar_indice(dados['indice_termos'])
+                      for campo, dados in (resultados_por_rede[REDE_TODAS] or {}).get('campos', {}).items()
+                      if dados.get('indice_termos')}
+    # Publica as nuvens de palavras já na carga (hash do conteúdo e variantes reduzidas)
+    for resultados in resultados_por_rede.values():
+        for campo in (resultados or {}).get('campos', {}).values():
+            if campo.get('nuvem_palavras'):
+                publicar_nuvem(campo['nuvem_palavras'])
+
+    versao = {
+        'assinatura': assinatura,
+        'dados_publicos': dados_publicos,
+        'por_rede': por_rede,
+        'redes': list(por_rede),
+        # Cubo de contagens para filtragem cruzada, só do servidor (sem ele, os gráficos não filtram)
+        'cubo': carregar_cubo(ARQUIVO_CUBO),
+        'resultados_por_rede': resultados_por_rede,
+        'indices_termos': {campo: indice for campo, indice in indices_termos.items() if indice is not None},
+        'total_registros': arquivo_publico.get('total_registros', dados_publicos['idade']['total']),
+        'figuras': {},
+        'secoes': {},
+        'termos': {},
+    }
+    # O layout já sai pronto em JSON puro, montado fora do caminho das requisições
+    versao['layout'] = _para_json(montar_layout(versao))
+    return versao
 
 # ============================================================================
 # FUNÇÕES DE CRIAÇÃO DE GRÁFICOS
 # ============================================================================
 
-TOTAL_REGISTROS = len(dados_publicos.get('idade', []))
-
-def criar_grafico_barras(dados_dict, titulo, height=450):
-    if not dados_dict: return go.Figure().update_layout(title=f"{titulo} (Sem dados)")
+def _barras(dados_dict):
+    """(categorias, quantidades, textos com o percentual, maior quantidade) das até 25 maiores barras."""
     df_contagem = pd.DataFrame(list(dados_dict.items()), columns=['Categoria', 'Quantidade']).sort_values('Quantidade', ascending=False)
     if len(df_contagem) > 25:
         df_contagem = df_contagem.head(25)
-    
+
     # Recalcula o total apenas para as categorias mostradas para a porcentagem fazer sentido no gráfico
     total_parcial = df_contagem['Quantidade'].sum()
     percentual = (df_contagem['Quantidade'] / total_parcial * 100).round(1)
+    return (df_contagem['Categoria'].tolist(), df_contagem['Quantidade'].tolist(),
+            [f'{p}%' for p in percentual], int(df_contagem['Quantidade'].max()))
 
+def criar_grafico_barras(dados_dict, titulo, height=450):
+    if not dados_dict: return go.Figure().update_layout(title=f"{titulo} (Sem dados)")
+    categorias, quantidades, textos, max_valor = _barras(dados_dict)
     fig = go.Figure(data=[go.Bar(
-        x=df_contagem['Categoria'], y=df_contagem['Quantidade'],
-        text=[f'{p}%' for p in percentual], textposition='outside',
+        x=categorias, y=quantidades,
+        text=textos, textposition='outside',
         marker_color='#1f77b4'
     )])
-    max_valor = df_contagem['Quantidade'].max()
     fig.update_layout(title=titulo, template='plotly_white', height=height,
                       margin=dict(t=80, b=60, l=60, r=40),
                       yaxis=dict(range=[0, max_valor * 1.25]))
     return fig
 
-def criar_histograma(dados_list, titulo):
-    if not dados_list: return go.Figure().update_layout(title=f"{titulo} (Sem dados)")
-    s_dados = pd.Series(dados_list)
-    fig = go.Figure(data=[go.Histogram(x=s_dados, marker_color='#2ca02c', nbinsx=20)])
-    media, mediana = s_dados.mean(), s_dados.median()
+def trocar_barras(figura, dados_dict, titulo):
+    """Troca em `figura` (figura JSON de criar_grafico_barras ou dash.Patch) as barras pelas de `dados_dict`.
+
+    Só os valores mudam: a figura não é montada de novo pelo Plotly.
+    """
+    categorias, quantidades, textos, max_valor = _barras(dados_dict) if dados_dict else ([], [], [], None)
+    figura['data'][0]['x'] = categorias
+    figura['data'][0]['y'] = quantidades
+    figura['data'][0]['text'] = textos
+    figura['layout']['title']['text'] = titulo if dados_dict else f"{titulo} (Sem dados)"
+    figura['layout']['yaxis']['range'] = [0, max_valor * 1.25] if dados_dict else None
+    return figura
+
+def _titulo_histograma(histograma, titulo):
+    # Consultas ao cubo: valores com menos de K_MINIMO profissionais ficam fora das barras
+    if histograma.get('suprimidos'):
+        return f"{titulo} ({histograma['suprimidos']} em valores com menos de {K_MINIMO} profissionais omitidos)"
+    return titulo
+
+def criar_histograma(histograma, titulo):
+    titulo = _titulo_histograma(histograma, titulo)
+    if not histograma.get('total'): return go.Figure().update_layout(title=f"{titulo} (Sem dados)")
+    # Uma barra de entrada por classe pré-agregada: o Plotly reagrupa em até 20 barras somando as contagens
+    inicios, contagens = classes(histograma)
+    fig = go.Figure(data=[go.Histogram(x=inicios, y=contagens, histfunc='sum', marker_color='#2ca02c', nbinsx=20)])
+    media, mediana = histograma['media'], histograma['quantis']['p50']
     fig.add_vline(x=media, line_dash="dash", line_color="red", annotation_text=f"Média: {media:.1f}", annotation_position="top right")
     fig.add_vline(x=mediana, line_dash="dash", line_color="blue", annotation_text=f"Mediana: {mediana:.1f}", annotation_position="top left")
     fig.update_layout(title=titulo, template='plotly_white', height=450, margin=dict(t=80, b=60, l=60, r=40))
     return fig
 
-def criar_grafico_regioes(dados_list):
+def trocar_histograma(figura, histograma, titulo):
+    """Troca em `figura` (figura JSON de criar_histograma com dados, ou dash.Patch) as classes, a média e a mediana."""
+    inicios, contagens = classes(histograma)
+    figura['data'][0]['x'] = inicios.tolist()
+    figura['data'][0]['y'] = contagens.tolist()
+    for i, (nome, valor) in enumerate((('Média', histograma['media']), ('Mediana', histograma['quantis']['p50']))):
+        figura['layout']['shapes'][i]['x0'] = valor
+        figura['layout']['shapes'][i]['x1'] = valor
+        figura['layout']['annotations'][i]['x'] = valor
+        figura['layout']['annotations'][i]['text'] = f"{nome}: {valor:.1f}"
+    figura['layout']['title']['text'] = _titulo_histograma(histograma, titulo)
+    return figura
+
+def criar_grafico_regioes(dados_list, titulo='Distribuição Regional por Momento'):
     if not dados_list: return go.Figure().update_layout(title="Distribuição Regional (Sem dados)")
     df_regioes = pd.DataFrame(dados_list)
-    fig = px.line(df_regioes, x='Momento', y='Quantidade', color='Região', markers=True, title='Distribuição Regional por Momento')
+    fig = px.line(df_regioes, x='Momento', y='Quantidade', color='Região', markers=True, title=titulo)
     fig.update_layout(template='plotly_white', height=550, margin=dict(t=80, b=60, l=60, r=40))
     return fig
 
+def trocar_regioes(figura, figura_base, dados_list):
+    """Troca em `figura` (cópia de `figura_base` ou dash.Patch) os pontos de cada linha do gráfico de regiões.
+
+    Retorna None se as regiões não forem as mesmas das linhas de `figura_base`.
+    """
+    pontos = {}
+    for linha in dados_list:
+        momentos, quantidades = pontos.setdefault(linha['Região'], ([], []))
+        momentos.append(linha['Momento'])
+        quantidades.append(linha['Quantidade'])
+    linhas = [traco.get('name') for traco in figura_base['data']]
+    if sorted(linhas) != sorted(pontos):
+        return None
+    for i, regiao in enumerate(linhas):
+        figura['data'][i]['x'], figura['data'][i]['y'] = pontos[regiao]
+    return figura
+
+# Título e tipo de cada gráfico da parte quantitativa (chave = coluna agregada)
+GRAFICOS_QUANTITATIVOS = {
+    'raca_ds': ('Distribuição por Raça', 'barras'),
+    'sexo_ds': ('Distribuição por Sexo', 'barras'),
+    'idade': ('Distribuição de Idade', 'histograma'),
+    'estado_civil_ds': ('Estado Civil', 'barras'),
+    'ident_genero_ds': ('Identidade de Gênero', 'barras'),
+    'orientacao_sexual_ds': ('Orientação Sexual', 'barras'),
+    'tem_nome_social': ('Profissionais com Nome Social', 'barras'),
+    'aa_tipo_ds': ('Ações Afirmativas', 'barras'),
+    'tempo_graduado': ('Tempo de Graduado (anos)', 'histograma'),
+    'pais_formacao_ds': ('País de Formação', 'barras'),
+    'rm_rec_cnrm_ds': ('Residências Médicas', 'barras'),
+    'tit_esp_amb_ds': ('Título de Especialista', 'barras'),
+    'rm_1_esp_medica_ds': ('Área - RM Primária', 'barras'),
+    'rm_2_esp_medica_ds': ('Área - RM Secundária', 'barras'),
+    'amb_1_esp_medica_ds': ('Área - Título Especialista Primário', 'barras'),
+    'amb_2_esp_medica_ds': ('Área - Título Especialista Secundário', 'barras'),
+    'curso_nome_limpo': ('Cursos de Aprimoramento (Top 25)', 'barras'),
+    'fluxo_regional': ('Distribuição Regional por Momento', 'regioes'),
+    'regiao_nascimento': ('Região de Nascimento', 'barras'),
+    'regiao_vaga': ('Região da Vaga Principal', 'barras'),
+}
+MOMENTOS = {'Nascimento': 'regiao_nascimento', 'Graduação': 'regiao_graduacao', 'CRM': 'regiao_crm', 'Vaga': 'regiao_vaga'}
+
+def criar_figura(coluna, dados):
+    titulo, tipo = GRAFICOS_QUANTITATIVOS[coluna]
+    if tipo == 'histograma':
+        return criar_histograma(dados[coluna], titulo)
+    if tipo == 'regioes':
+        return criar_grafico_regioes(dados[coluna], titulo)
+    if coluna == 'curso_nome_limpo':
+        return criar_grafico_barras(dados[coluna], titulo, height=550)
+    return criar_grafico_barras(dados[coluna], titulo)
+
+def _filtros_com_rede(filtros, rede):
+    filtros = dict(filtros or {})
+    if rede and rede != REDE_TODAS:
+        filtros[COLUNA_REDE] = [rede]
+    return filtros
+
+def colunas_filtraveis(cubo, colunas):
+    """Colunas que podem ser recalculadas no cubo; as demais ficam sem a filtragem cruzada."""
+    if cubo is None:
+        return []
+    dimensoes = lambda coluna: MOMENTOS.values() if coluna == 'fluxo_regional' else [coluna]
+    return [coluna for coluna in colunas if all(dim in cubo['codigos'] for dim in dimensoes(coluna))]
+
+def dados_filtrados(versao, colunas, filtros, rede):
+    """Dados da rede com as colunas filtráveis recalculadas no cubo para os filtros ativos."""
+    dados = versao['por_rede'][rede]
+    filtraveis = colunas_filtraveis(versao['cubo'], colunas)
+    if not filtros or not filtraveis:
+        return dados
+    return {**dados, **consultar_cubo(versao['cubo'], filtraveis, filtros, rede)}
+
+# Barra que soma os valores suprimidos de uma consulta ao cubo
+ROTULO_SUPRIMIDOS = f'Outros (menos de {K_MINIMO} cada)'
+
+def _contar_publicavel(cubo, coluna, mascara):
+    """Contagem da coluna com os valores raros somados em ROTULO_SUPRIMIDOS (omitidos se a consulta toda for rara)."""
+    contagem, suprimidos = suprimir(contar(cubo, coluna, mascara))
+    if suprimidos >= K_MINIMO:
+        contagem[ROTULO_SUPRIMIDOS] = suprimidos
+    return contagem
+
+def consultar_cubo(cubo, colunas, filtros, rede):
+    """Monta os dados de cada coluna a partir do cubo, aplicando todos os filtros menos o da própria coluna.
+
+    O cubo tem quase uma célula por profissional: cada contagem passa por `suprimir`
+    antes de sair daqui, e o total suprimido aparece como ROTULO_SUPRIMIDOS.
+    """
+    filtros = _filtros_com_rede(filtros, rede)
+    dados = {}
+    for coluna in colunas:
+        mascara = mascara_filtros(cubo, filtros, ignorar=coluna)
+        if coluna == 'fluxo_regional':
+            dados[coluna] = [{'Momento': momento, 'Região': regiao, 'Quantidade': qtd}
+                             for momento, col in MOMENTOS.items()
+                             for regiao, qtd in _contar_publicavel(cubo, col, mascara).items()]
+        elif GRAFICOS_QUANTITATIVOS.get(coluna, (None, 'barras'))[1] == 'histograma':
+            # Histograma e resumo calculados a partir das contagens de cada valor publicável
+            contagem, suprimidos = suprimir(contar(cubo, coluna, mascara))
+            dados[coluna] = {**resumir_contagens(contagem), 'suprimidos': suprimidos}
+        else:
+            dados[coluna] = _contar_publicavel(cubo, coluna, mascara)
+    return dados
+
 # ============================================================================
 # LAYOUT E CALLBACKS
 # ============================================================================
@@ -79,162 +314,486 @@ dropdown_apropriacao_options = [
     {'label': 'Plataformas Digitais', 'value': 'experiencia_digital'},
 ]
 
-def create_layout():
-    """Cria e retorna o layout do dashboard."""
-    layout = html.Div([
-        html.H1('Dashboard PMM-e - Visão Geral', style={'textAlign': 'center', 'marginBottom': '30px'}),
+def grafico_cubo(coluna, dados):
+    """Gráfico da parte quantitativa; o id padronizado permite a filtragem cruzada pelo clique."""
+    return dcc.Graph(id={'type': 'grafico-cubo', 'coluna': coluna}, figure=criar_figura(coluna, dados))
 
-        html.H2('Dados Pessoais', className="mt-5"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['raca_ds'], 'Distribuição por Raça')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['sexo_ds'], 'Distribuição por Sexo')), className="col-md-6"),
-        ], className="row"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_histograma(dados_publicos['idade'], 'Distribuição de Idade')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['estado_civil_ds'], 'Estado Civil')), className="col-md-6"),
-        ], className="row mt-4"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['ident_genero_ds'], 'Identidade de Gênero')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['orientacao_sexual_ds'], 'Orientação Sexual')), className="col-md-6"),
-        ], className="row mt-4"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['tem_nome_social'], 'Profissionais com Nome Social')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['aa_tipo_ds'], 'Ações Afirmativas')), className="col-md-6"),
-        ], className="row mt-4"),
+def _par(col_esq, col_dir, dados, className="row mt-4"):
+    return html.Div([
+        html.Div(grafico_cubo(col_esq, dados), className="col-md-6"),
+        html.Div(grafico_cubo(col_dir, dados), className="col-md-6"),
+    ], className=className)
 
-        html.H2('Formação Acadêmica', className="mt-5"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_histograma(dados_publicos['tempo_graduado'], 'Tempo de Graduado (anos)')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['pais_formacao_ds'], 'País de Formação')), className="col-md-6"),
-        ], className="row"),
+def secao_dados_pessoais(dados):
+    return [
+        _par('raca_ds', 'sexo_ds', dados, className="row"),
+        _par('idade', 'estado_civil_ds', dados),
+        _par('ident_genero_ds', 'orientacao_sexual_ds', dados),
+        _par('tem_nome_social', 'aa_tipo_ds', dados),
+    ]
 
-        html.H2('Especialidades e Títulos', className="mt-5"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['rm_rec_cnrm_ds'], 'Residências Médicas')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['tit_esp_amb_ds'], 'Título de Especialista')), className="col-md-6"),
-        ], className="row mt-4"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['rm_1_esp_medica_ds'], 'Área - RM Primária')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['rm_2_esp_medica_ds'], 'Área - RM Secundária')), className="col-md-6"),
-        ], className="row mt-4"),
-        html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['amb_1_esp_medica_ds'], 'Área - Título Especialista Primário')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['amb_2_esp_medica_ds'], 'Área - Título Especialista Secundário')), className="col-md-6"),
-        ], className="row mt-4"),
-        html.Div([
-             dcc.Graph(figure=criar_grafico_barras(dados_publicos['curso_nome_limpo'], 'Cursos de Aprimoramento (Top 25)', height=550))
-        ], className="row mt-4"),
-        
-        html.H2('Distribuição Geográfica', className="mt-5"),
-        dcc.Graph(figure=criar_grafico_regioes(dados_publicos['fluxo_regional'])),
+def secao_formacao(dados):
+    return [_par('tempo_graduado', 'pais_formacao_ds', dados, className="row")]
+
+def secao_especialidades(dados):
+    return [
+        _par('rm_rec_cnrm_ds', 'tit_esp_amb_ds', dados, className="row"),
+        _par('rm_1_esp_medica_ds', 'rm_2_esp_medica_ds', dados),
+        _par('amb_1_esp_medica_ds', 'amb_2_esp_medica_ds', dados),
         html.Div([
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['regiao_nascimento'], 'Região de Nascimento')), className="col-md-6"),
-            html.Div(dcc.Graph(figure=criar_grafico_barras(dados_publicos['regiao_vaga'], 'Região da Vaga Principal')), className="col-md-6"),
+             grafico_cubo('curso_nome_limpo', dados)
         ], className="row mt-4"),
-        
-        # ===== SEÇÃO ADICIONADA AQUI =====
-        html.Div([
-            html.H2('Apropriação sobre Temas', className="mt-5"),
-            html.Label('Selecione o tema:', style={'fontWeight': 'bold'}),
-            dcc.Dropdown(
-                id='dropdown-apropriacao',
-                options=dropdown_apropriacao_options,
-                value='apropriacao_redes',
-                clearable=False,
-                style={'marginBottom': 20}
-            ),
-            dcc.Graph(id='grafico-apropriacao'),
-        ], style={'marginBottom': 50}),
-        # ==================================
-        
-        html.H2('Análise Qualitativa', className="mt-5"),
+    ]
+
+def secao_geografia(dados):
+    return [
+        grafico_cubo('fluxo_regional', dados),
+        _par('regiao_nascimento', 'regiao_vaga', dados),
+    ]
+
+def secao_apropriacao(_dados):
+    return [
+        html.Label('Selecione o tema:', style={'fontWeight': 'bold'}),
+        dcc.Dropdown(
+            id='dropdown-apropriacao',
+            options=dropdown_apropriacao_options,
+            value='apropriacao_redes',
+            clearable=False,
+            style={'marginBottom': 20}
+        ),
+        dcc.Graph(id='grafico-apropriacao'),
+    ]
+
+dropdown_qualitativo_options = [
+    {'label': 'Expectativas em relação ao PMM-e', 'value': 'aptidoes_rotina'},
+    {'label': 'Considera apto para atuação', 'value': 'competencias_fortalecer'},
+    {'label': 'Impressão sobre o serviço', 'value': 'impressao_servico'},
+    {'label': 'Expectativas para imersão', 'value': 'momento_imersao'},
+]
+
+TAMANHOS_NUVEM = '(max-width: 800px) 100vw, 800px'
+SENTIMENTO_TODOS = 'Todos'
+opcoes_sentimento_termos = [{'label': 'Todos', 'value': SENTIMENTO_TODOS}] + [{'label': s, 'value': s} for s in SENTIMENTOS]
+CORES_SENTIMENTOS = {
+    'Positivo': '#28a745',
+    'Neutro': '#ffc107',
+    'Negativo': '#dc3545'
+}
+
+def secao_qualitativa(_dados):
+    return [
         dcc.Dropdown(
             id='dropdown-qualitativo',
-            options=[
-                {'label': 'Expectativas em relação ao PMM-e', 'value': 'aptidoes_rotina'},
-                {'label': 'Considera apto para atuação', 'value': 'competencias_fortalecer'},
-                {'label': 'Impressão sobre o serviço', 'value': 'impressao_servico'},
-                {'label': 'Expectativas para imersão', 'value': 'momento_imersao'},
-            ],
+            options=dropdown_qualitativo_options,
             value='aptidoes_rotina',
         ),
+        # Com o índice de termos, o gráfico de termos substitui a nuvem (mostrada só sem índice)
+        html.Div([
+            html.H3('Termos mais Frequentes', className="mt-4 text-center"),
+            dcc.RadioItems(
+                id='filtro-sentimento-termos',
+                options=opcoes_sentimento_termos,
+                value=SENTIMENTO_TODOS,
+                inline=True,
+                labelStyle={'marginRight': 15},
+                style={'textAlign': 'center'},
+            ),
+            dcc.Graph(id='grafico-termos'),
+        ], id='bloco-termos', className="mt-4", style={'display': 'none'}),
         html.Div([
             html.H3('Nuvem de Palavras', className="mt-4 text-center"),
-            html.Img(id='nuvem-palavras', style={'maxWidth': '800px', 'width': '100%', 'margin': 'auto', 'display': 'block'}),
-        ], className="mt-4"),
+            # O navegador escolhe a variante (WebP/PNG, largura) de acordo com a tela
+            html.Picture([
+                html.Source(id='nuvem-palavras-webp', type='image/webp', sizes=TAMANHOS_NUVEM),
+                html.Img(id='nuvem-palavras', sizes=TAMANHOS_NUVEM, alt='Nuvem de palavras',
+                         style={'maxWidth': '800px', 'width': '100%', 'margin': 'auto', 'display': 'block'}),
+            ]),
+        ], id='bloco-nuvem', className="mt-4"),
         html.Div([
             html.H3('Análise de Sentimentos', className="mt-4 text-center"),
             dcc.Graph(id='grafico-sentimentos'),
         ], className="mt-4"),
         html.H3('Resumo dos Textos', className="mt-4"),
         html.Div(id='resumo-textos', style={'padding': 20, 'backgroundColor': '#f8f9fa', 'borderRadius': 5, 'border': '1px solid #dee2e6'}),
-    ])
+    ]
+
+# Seções do dashboard: (id, título, função que monta o conteúdo a partir dos dados da rede)
+SECOES_DASHBOARD = [
+    ('dados-pessoais', 'Dados Pessoais', secao_dados_pessoais),
+    ('formacao', 'Formação Acadêmica', secao_formacao),
+    ('especialidades', 'Especialidades e Títulos', secao_especialidades),
+    ('geografia', 'Distribuição Geográfica', secao_geografia),
+    ('apropriacao', 'Apropriação sobre Temas', secao_apropriacao),
+    ('qualitativa', 'Análise Qualitativa', secao_qualitativa),
+]
+CONSTRUTORES_SECOES = {secao_id: construtor for secao_id, _, construtor in SECOES_DASHBOARD}
+
+# Com seções sob demanda, a página chega só com os títulos e cada seção busca suas
+# figuras ao ser expandida (a primeira já vem aberta). Cada seção tem seu próprio
+# callback, então as figuras chegam progressivamente em vez de num único payload.
+SECOES_SOB_DEMANDA = True
+SECOES_ABERTAS_INICIALMENTE = ['dados-pessoais']
+
+def criar_secoes(dados):
+    """Acordeão com as seções do dashboard, vazias (sob demanda) ou já preenchidas."""
+    itens = []
+    for secao_id, titulo, construtor in SECOES_DASHBOARD:
+        conteudo = (html.P('Carregando...', className="text-muted") if SECOES_SOB_DEMANDA
+                    else construtor(dados))
+        itens.append(dbc.AccordionItem([
+            dcc.Store(id={'type': 'secao-carregada', 'secao': secao_id}, data=not SECOES_SOB_DEMANDA),
+            dcc.Loading(html.Div(conteudo, id={'type': 'secao-dashboard', 'secao': secao_id})),
+        ], title=titulo, item_id=secao_id))
+    abertas = SECOES_ABERTAS_INICIALMENTE if SECOES_SOB_DEMANDA else [secao_id for secao_id, _, _ in SECOES_DASHBOARD]
+    return dbc.Accordion(itens, id='acordeao-secoes', always_open=True, active_item=abertas)
+
+def montar_layout(versao):
+    """Cria o layout do dashboard a partir de uma versão dos dados."""
+    layout = html.Div([
+        html.H1('Dashboard PMM-e - Visão Geral', style={'textAlign': 'center', 'marginBottom': '30px'}),
+
+        html.Div([
+            html.Label('Rede Formadora:', style={'fontWeight': 'bold'}),
+            dcc.Dropdown(
+                id='dropdown-rede',
+                options=[{'label': rede, 'value': rede} for rede in versao['redes']],
+                value=REDE_TODAS,
+                clearable=False,
+            ),
+        ], style={'maxWidth': 320, 'marginBottom': 20}),
+
+        # Filtros ativos ({coluna: [valores]}), alterados ao clicar nas barras dos gráficos
+        dcc.Store(id='filtros-cubo', data={}),
+        html.Div([
+            html.Span('Sem filtros ativos', id='resumo-filtros', style={'marginRight': 15}),
+            html.Button('Limpar filtros', id='botao-limpar-filtros', n_clicks=0, className="btn btn-outline-secondary btn-sm"),
+        ], style={'display': 'block' if versao['cubo'] is not None else 'none', 'marginBottom': 20}),
+
+        criar_secoes(versao['dados_publicos']),
+    ], style={'marginBottom': 50})
     return layout
 
+# ============================================================================
+# VERSÃO DOS DADOS, LAYOUT E FIGURAS EM CACHE
+# ============================================================================
+# Cada versão dos dados traz o layout, as seções e as figuras sem filtros de cada
+# rede já convertidos para estruturas JSON puras, que o Dash serializa sem refazer
+# nenhum gráfico. Uma nova versão é montada em segundo plano (recarga_dados) e
+# publicada trocando '_VERSAO' inteira: cada requisição lê '_VERSAO' uma única vez
+# e termina com a versão que pegou, mesmo que outra seja publicada no meio.
+
+def _para_json(objeto):
+    return enxugar(json.loads(to_json_plotly(objeto)))
+
+def publicar_versao(versao):
+    global _VERSAO
+    _VERSAO = versao
+
+_VERSAO = carregar_dados_publicos()
+
+def create_layout():
+    """Retorna o layout do dashboard, montado uma vez por versão dos dados."""
+    return _VERSAO['layout']
+
+def validar_entradas(versao, rede, colunas=(), filtros=None):
+    """Interrompe o callback (PreventUpdate) se a rede, as colunas ou os filtros não existirem nos dados.
+
+    Os valores vêm da requisição do navegador e viram chaves dos caches da versão:
+    só valores conhecidos chegam a eles.
+    """
+    if rede not in versao['por_rede'] or any(coluna not in GRAFICOS_QUANTITATIVOS for coluna in colunas):
+        raise PreventUpdate
+    if filtros is not None and not (isinstance(filtros, dict) and all(
+            coluna in GRAFICOS_QUANTITATIVOS and isinstance(valores, list) for coluna, valores in filtros.items())):
+        raise PreventUpdate
+
+def figuras_sem_filtro(versao, rede, colunas):
+    """Figuras de uma rede sem filtros ativos, calculadas uma vez por versão dos dados."""
+    validar_entradas(versao, rede, colunas)
+    figuras = versao['figuras']
+    for coluna in colunas:
+        chave = (rede, coluna)
+        metricas.contar_cache('figuras_dashboard', 'acerto' if chave in figuras else 'falta')
+        if chave not in figuras:
+            figuras[chave] = _para_json(criar_figura(coluna, versao['por_rede'][rede]))
+    return [figuras[(rede, coluna)] for coluna in colunas]
+
+def trocar_valores(coluna, figura, figura_base, dados):
+    """Troca em `figura` (cópia de `figura_base` ou dash.Patch) os valores da coluna pelos de `dados`.
+
+    Retorna None quando a figura precisa ser montada de novo: figura base sem dados,
+    histograma filtrado vazio ou regiões diferentes das linhas da figura base.
+    """
+    titulo, tipo = GRAFICOS_QUANTITATIVOS[coluna]
+    if not figura_base['data']:
+        return None
+    if tipo == 'barras':
+        return trocar_barras(figura, dados[coluna], titulo)
+    if tipo == 'histograma':
+        return trocar_histograma(figura, dados[coluna], titulo) if dados[coluna].get('total') else None
+    return trocar_regioes(figura, figura_base, dados[coluna])
+
+def figura_filtrada(coluna, figura_base, dados):
+    """Figura da coluna com os dados filtrados: os valores são trocados numa cópia da figura sem filtro."""
+    figura = trocar_valores(coluna, copy.deepcopy(figura_base), figura_base, dados)
+    return figura if figura is not None else _para_json(criar_figura(coluna, dados))
+
+def _trocar_figuras(arvore, figuras):
+    """Árvore de componentes JSON com a figura de cada gráfico do cubo trocada pela de `figuras`."""
+    if isinstance(arvore, list):
+        return [_trocar_figuras(item, figuras) for item in arvore]
+    if not isinstance(arvore, dict):
+        return arvore
+    props = arvore.get('props', {})
+    id_componente = props.get('id')
+    if isinstance(id_componente, dict) and id_componente.get('coluna') in figuras:
+        return {**arvore, 'props': {**props, 'figure': figuras[id_componente['coluna']]}}
+    if 'children' in props:
+        return {**arvore, 'props': {**props, 'children': _trocar_figuras(props['children'], figuras)}}
+    return arvore
+
+def _colunas_graficos(arvore):
+    """Colunas dos gráficos do cubo presentes numa árvore de componentes JSON."""
+    if isinstance(arvore, list):
+        return [coluna for item in arvore for coluna in _colunas_graficos(item)]
+    if not isinstance(arvore, dict):
+        return []
+    props = arvore.get('props', {})
+    id_componente = props.get('id')
+    if isinstance(id_componente, dict) and id_componente.get('type') == 'grafico-cubo':
+        return [id_componente['coluna']]
+    return _colunas_graficos(props.get('children'))
+
+def resumo_filtros(cubo, filtros):
+    """Texto com os filtros ativos e os gráficos a que eles se aplicam."""
+    if not filtros or cubo is None:
+        return 'Sem filtros ativos'
+    resumo = '; '.join(f"{GRAFICOS_QUANTITATIVOS[col][0]}: {', '.join(map(str, valores))}"
+                       for col, valores in filtros.items())
+    filtraveis = colunas_filtraveis(cubo, GRAFICOS_QUANTITATIVOS)
+    alcance = ('todos os gráficos' if len(filtraveis) == len(GRAFICOS_QUANTITATIVOS)
+               else ', '.join(GRAFICOS_QUANTITATIVOS[col][0] for col in filtraveis))
+    return (f"Filtros: {resumo} (aplicados a: {alcance}; valores com menos de {K_MINIMO} "
+            f"profissionais são somados em '{ROTULO_SUPRIMIDOS}')")
+
+def conteudo_secao(versao, secao_id, rede, filtros):
+    """Conteúdo de uma seção para a rede e filtros atuais; sem filtros, vem do cache.
+
+    Com filtros, parte da seção sem filtros em cache e troca só as figuras das colunas filtráveis da seção.
+    """
+    validar_entradas(versao, rede, filtros=filtros)
+    if filtros and versao['cubo'] is not None:
+        secao = conteudo_secao(versao, secao_id, rede, None)
+        filtraveis = colunas_filtraveis(versao['cubo'], _colunas_graficos(secao))
+        dados = dados_filtrados(versao, filtraveis, filtros, rede)
+        figuras = {coluna: figura_filtrada(coluna, figura, dados)
+                   for coluna, figura in zip(filtraveis, figuras_sem_filtro(versao, rede, filtraveis))}
+        return _trocar_figuras(secao, figuras)
+    secoes = versao['secoes']
+    chave = (secao_id, rede)
+    metricas.contar_cache('secoes_dashboard', 'acerto' if chave in secoes else 'falta')
+    if chave not in secoes:
+        secoes[chave] = _para_json(CONSTRUTORES_SECOES[secao_id](versao['por_rede'][rede]))
+    return secoes[chave]
+
+def figura_apropriacao(versao, tema_selecionado, rede, filtros):
+    """Gráfico do tema de apropriação escolhido, para a rede e filtros atuais."""
+    validar_entradas(versao, rede, filtros=filtros)
+    if tema_selecionado not in {opcao['value'] for opcao in dropdown_apropriacao_options}:
+        raise PreventUpdate
+    dados_tema = dados_filtrados(versao, [tema_selecionado], filtros, rede)[tema_selecionado]
+
+    # Mapeia as chaves (ex: 'A') para rótulos mais descritivos (ex: 'Maior (A)')
+    mapeamento = {'A': 'Maior (A)', 'E': 'Menor (E)', ROTULO_SUPRIMIDOS: ROTULO_SUPRIMIDOS}
+    dados_mapeados = {mapeamento.get(k, 'Não Avaliado'): v for k, v in dados_tema.items()}
+
+    # Cria um mapa de valor para rótulo para obter o título completo
+    options_map = {opt['value']: opt['label'] for opt in dropdown_apropriacao_options}
+    titulo_grafico = options_map[tema_selecionado]
+
+    return _para_json(criar_grafico_barras(dados_mapeados, titulo_grafico))
+
+def conteudo_qualitativo(versao, coluna, rede):
+    """(src da nuvem, srcset PNG, srcset WebP, gráfico de sentimentos, resumo) de um campo de texto da rede."""
+    resultados = versao['resultados_por_rede'].get(rede)
+    if resultados is None or coluna not in resultados.get('campos', {}):
+        fig_vazia = go.Figure().update_layout(title="Dados não disponíveis")
+        return '', '', '', _para_json(fig_vazia), "Dados não disponíveis. Execute o script de pré-processamento de análises."
+
+    dados_campo = resultados['campos'][coluna]
+    # Nuvem de Palavras: só as URLs (versionadas pelo conteúdo) vão na resposta, e só quando
+    # não há índice de termos (com ele, o gráfico de termos ocupa o lugar da nuvem)
+    nuvem = None
+    if dados_campo.get('nuvem_palavras') and coluna not in versao['indices_termos']:
+        nuvem = publicar_nuvem(dados_campo['nuvem_palavras'])
+    nuvem = nuvem or {'src': '', 'srcset_png': '', 'srcset_webp': ''}
+
+    # Gráfico de Sentimentos
+    dist = dados_campo['sentimentos']['distribuicao']
+
+    df_sent = pd.DataFrame(list(dist.items()), columns=['Sentimento', 'Quantidade'])
+
+    fig_sent = px.bar(
+        df_sent,
+        x='Sentimento',
+        y='Quantidade',
+        color='Sentimento',
+        color_discrete_map=CORES_SENTIMENTOS,
+        title='Análise de Sentimentos',
+        labels={'Sentimento': 'Sentimento', 'Quantidade': 'Quantidade'}
+    )
+    fig_sent.update_layout(template='plotly_white', showlegend=False)
+
+    # Resumo
+    resumo = dados_campo.get('resumo', 'Resumo não disponível.')
+
+    return nuvem['src'], nuvem['srcset_png'], nuvem['srcset_webp'], _para_json(fig_sent), resumo
+
+def figura_termos(versao, coluna, rede, sentimento):
+    """Gráfico dos termos mais frequentes do campo na rede e sentimento escolhidos; None sem índice de termos."""
+    indice = versao['indices_termos'].get(coluna)
+    if indice is None:
+        return None
+    # Rede e sentimento vêm da requisição e viram chave do cache: só valores conhecidos
+    if rede not in versao['por_rede'] or sentimento not in SENTIMENTOS + [SENTIMENTO_TODOS]:
+        raise PreventUpdate
+    termos = versao['termos']
+    chave = (coluna, rede, sentimento)
+    metricas.contar_cache('termos_qualitativos', 'acerto' if chave in termos else 'falta')
+    if chave not in termos:
+        contagens = termos_mais_frequentes(indice, None if rede == REDE_TODAS else rede,
+                                           None if sentimento == SENTIMENTO_TODOS else sentimento)
+        titulo = f'{TERMOS_GRAFICO} termos mais frequentes' + ('' if sentimento == SENTIMENTO_TODOS else f' ({sentimento})')
+        fig = go.Figure(go.Bar(
+            x=[qtd for _, qtd in contagens],
+            y=[termo for termo, _ in contagens],
+            orientation='h',
+            marker_color=CORES_SENTIMENTOS.get(sentimento, '#4C78A8'),
+        ))
+        fig.update_layout(title=titulo, template='plotly_white', height=max(300, 28 * len(contagens) + 120),
+                          yaxis={'autorange': 'reversed'}, xaxis_title='Ocorrências', margin={'l': 140})
+        termos[chave] = _para_json(fig)
+    return termos[chave]
+
 def register_callbacks(app):
-    """Registra todos os callbacks do dashboard."""
+    """Registra todos os callbacks do dashboard (e a rota das imagens das nuvens)."""
+    registrar_rota(app.server)
+
+    def registrar_carga_secao(secao_id):
+        @app.callback(
+            [Output({'type': 'secao-dashboard', 'secao': secao_id}, 'children'),
+             Output({'type': 'secao-carregada', 'secao': secao_id}, 'data')],
+            Input('acordeao-secoes', 'active_item'),
+            [State({'type': 'secao-carregada', 'secao': secao_id}, 'data'),
+             State('dropdown-rede', 'value'),
+             State('filtros-cubo', 'data')]
+        )
+        def carregar_secao(abertas, carregada, rede, filtros):
+            if carregada or secao_id not in (abertas or []):
+                return no_update, no_update
+            return conteudo_secao(_VERSAO, secao_id, rede, filtros), True
+
+    for secao_id, _, _ in SECOES_DASHBOARD:
+        registrar_carga_secao(secao_id)
+
+    @app.callback(
+        Output('filtros-cubo', 'data'),
+        [Input({'type': 'grafico-cubo', 'coluna': ALL}, 'clickData'),
+         Input('botao-limpar-filtros', 'n_clicks')],
+        State('filtros-cubo', 'data'),
+        prevent_initial_call=True
+    )
+    def alternar_filtro(_cliques, _n_limpar, filtros):
+        gatilho = ctx.triggered_id
+        if gatilho == 'botao-limpar-filtros':
+            return {}
+        coluna = gatilho['coluna']
+        cubo = _VERSAO['cubo']
+        # Histogramas e o fluxo regional não são dimensões filtráveis por clique
+        if cubo is None or coluna not in cubo['codigos']:
+            return no_update
+        clique = ctx.triggered[0]['value']
+        if not clique:
+            return no_update
+        valor = clique['points'][0]['x']
+        # A barra dos valores suprimidos não corresponde a um valor do cubo
+        if valor == ROTULO_SUPRIMIDOS:
+            return no_update
+        selecionados = filtros.get(coluna, [])
+        selecionados = [v for v in selecionados if v != valor] if valor in selecionados else selecionados + [valor]
+        filtros = {**filtros, coluna: selecionados}
+        return {col: valores for col, valores in filtros.items() if valores}
+
+    @app.callback(
+        [Output({'type': 'grafico-cubo', 'coluna': ALL}, 'figure'),
+         Output('resumo-filtros', 'children')],
+        [Input('filtros-cubo', 'data'),
+         Input('dropdown-rede', 'value')],
+        prevent_initial_call=True
+    )
+    def atualizar_graficos(filtros, rede):
+        versao = _VERSAO
+        colunas = [saida['id']['coluna'] for saida in ctx.outputs_list[0]]
+        validar_entradas(versao, rede, colunas, filtros)
+        base = figuras_sem_filtro(versao, rede, colunas)
+        filtraveis = set(colunas_filtraveis(versao['cubo'], colunas))
+        if not filtraveis:
+            return base, resumo_filtros(versao['cubo'], filtros)
+        dados = dados_filtrados(versao, filtraveis, filtros, rede)
+        if 'dropdown-rede.value' in ctx.triggered_prop_ids:
+            # Outra rede: figuras completas (as sem filtro vêm do cache)
+            figuras = [figura_filtrada(col, fig, dados) if filtros and col in filtraveis else fig
+                       for col, fig in zip(colunas, base)]
+            return figuras, resumo_filtros(versao['cubo'], filtros)
+        # Só os filtros mudaram: os gráficos fora do cubo ficam como estão e os demais
+        # recebem um Patch com os novos valores, em vez da figura inteira
+        figuras = []
+        for col, fig in zip(colunas, base):
+            if col not in filtraveis:
+                figuras.append(no_update)
+                continue
+            patch = trocar_valores(col, Patch(), fig, dados)
+            figuras.append(patch if patch is not None else _para_json(criar_figura(col, dados)))
+        return figuras, resumo_filtros(versao['cubo'], filtros)
 
     # ===== CALLBACK ADICIONADO AQUI =====
     @app.callback(
         Output('grafico-apropriacao', 'figure'),
-        Input('dropdown-apropriacao', 'value')
+        [Input('dropdown-apropriacao', 'value'),
+         Input('dropdown-rede', 'value'),
+         Input('filtros-cubo', 'data')]
     )
-    def atualizar_apropriacao(tema_selecionado):
-        dados_tema = dados_publicos[tema_selecionado]
-        
-        # Mapeia as chaves (ex: 'A') para rótulos mais descritivos (ex: 'Maior (A)')
-        mapeamento = {'A': 'Maior (A)', 'E': 'Menor (E)'}
-        dados_mapeados = {mapeamento.get(k, 'Não Avaliado'): v for k, v in dados_tema.items()}
-
-        # Cria um mapa de valor para rótulo para obter o título completo
-        options_map = {opt['value']: opt['label'] for opt in dropdown_apropriacao_options}
-        titulo_grafico = options_map[tema_selecionado]
-
-        return criar_grafico_barras(dados_mapeados, titulo_grafico)
+    def atualizar_apropriacao(tema_selecionado, rede, filtros):
+        return figura_apropriacao(_VERSAO, tema_selecionado, rede, filtros)
     # ====================================
 
     @app.callback(
         [Output('nuvem-palavras', 'src'),
+         Output('nuvem-palavras', 'srcSet'),
+         Output('nuvem-palavras-webp', 'srcSet'),
          Output('grafico-sentimentos', 'figure'),
          Output('resumo-textos', 'children')],
-        Input('dropdown-qualitativo', 'value')
+        [Input('dropdown-qualitativo', 'value'),
+         Input('dropdown-rede', 'value')]
     )
-    def atualizar_qualitativo(coluna):
-        if RESULTADOS_ANALISES is None or coluna not in RESULTADOS_ANALISES.get('campos', {}):
-            fig_vazia = go.Figure().update_layout(title="Dados não disponíveis")
-            return '', fig_vazia, "Dados não disponíveis. Execute o script de pré-processamento de análises."
-
-        dados_campo = RESULTADOS_ANALISES['campos'][coluna]
-        # Nuvem de Palavras
-        img_src = ''
-        arquivo_nuvem = dados_campo.get('nuvem_palavras')
-        if arquivo_nuvem and os.path.exists(arquivo_nuvem):
-            with open(arquivo_nuvem, 'rb') as img_file:
-                img_src = f'data:image/png;base64,{base64.b64encode(img_file.read()).decode()}'
-        
-        # Gráfico de Sentimentos
-        dist = dados_campo['sentimentos']['distribuicao']
-        
-        color_map = {
-            'Positivo': '#28a745',
-            'Neutro': '#ffc107',
-            'Negativo': '#dc3545'
-        }
-
-        df_sent = pd.DataFrame(list(dist.items()), columns=['Sentimento', 'Quantidade'])
-        
-        fig_sent = px.bar(
-            df_sent,
-            x='Sentimento', 
-            y='Quantidade', 
-            color='Sentimento',
-            color_discrete_map=color_map,
-            title='Análise de Sentimentos', 
-            labels={'Sentimento': 'Sentimento', 'Quantidade': 'Quantidade'}
-        )
-        fig_sent.update_layout(template='plotly_white', showlegend=False)
-        
-        # Resumo
-        resumo = dados_campo.get('resumo', 'Resumo não disponível.')
-        
-        return img_src, fig_sent, resumo
\ No newline at end of file
+    def atualizar_qualitativo(coluna, rede):
+        return conteudo_qualitativo(_VERSAO, coluna, rede)
+
+    @app.callback(
+        [Output('grafico-termos', 'figure'),
+         Output('bloco-termos', 'style'),
+         Output('bloco-nuvem', 'style')],
+        [Input('dropdown-qualitativo', 'value'),
+         Input('dropdown-rede', 'value'),
+         Input('filtro-sentimento-termos', 'value')]
+    )
+    def atualizar_termos(coluna, rede, sentimento):
+        figura = figura_termos(_VERSAO, coluna, rede, sentimento)
+        if figura is None:
+            return no_update, {'display': 'none'}, {'display': 'block'}
+        return figura, {'display': 'block'}, {'display': 'none'}
+
+    # Recarga dos arquivos de dados em segundo plano, sem reiniciar o processo
+    recarga_dados.observar('dashboard', arquivos_observados, carregar_dados_publicos,
+                           publicar_versao, _VERSAO['assinatura'])
+    recarga_dados.iniciar()
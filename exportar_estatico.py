@@ -0,0 +1,471 @@
+# exportar_estatico.py
+"""Exporta o dashboard e os mapas como site estático, para servir de uma CDN.
+
+Todo o conteúdo dos apps Dash vem de arquivos estáticos, então cada estado dos
+callbacks pode ser calculado uma única vez aqui, com as mesmas funções que os
+callbacks usam:
+
+- seções do dashboard de cada rede (figuras sem filtros);
+- cada opção de 'dropdown-apropriacao' e de 'dropdown-qualitativo' (termos mais
+  frequentes por sentimento ou nuvem de palavras, sentimentos e resumo) de cada rede;
+- cada tipo de mapa do Brasil e o mapa de municípios de cada estado, de cada
+  rede, nas resoluções de desktop e de tela compacta.
+
+As figuras vão para '<saida>/dados/' em JSON, junto com um 'manifesto.json'
+com as opções dos seletores, e páginas HTML leves as desenham com o Plotly.js
+no navegador. Cada JSON e HTML também é gravado já comprimido ('.gz' e, com
+o pacote 'brotli', '.br') para CDNs que servem variantes pré-comprimidas.
+
+A filtragem cruzada por clique nas barras depende do cubo de contagens no
+servidor e não é exportada: no site estático os gráficos não filtram.
+
+Uso: python exportar_estatico.py [--saida site_estatico]
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import time
+
+try:
+    import brotli
+except ImportError:  # 'brotli' é opcional: sem ele só as variantes '.gz' são gravadas
+    brotli = None
+
+PASTA_SAIDA = 'site_estatico'
+PASTA_DADOS = 'dados'
+PASTA_NUVENS = 'nuvens'
+EXTENSOES_COMPRIMIVEIS = ('.json', '.html', '.js')
+NIVEL_GZIP = 9
+QUALIDADE_BROTLI = 11
+# Seções cujo conteúdo vem de callbacks próprios (exportados por opção do seletor)
+SECOES_COM_SELETOR = {'apropriacao', 'qualitativa'}
+
+# ============================================================================
+# GRAVAÇÃO
+# ============================================================================
+
+def gravar(pasta, caminho_relativo, conteudo):
+    """Grava `conteudo` (bytes) e, se for texto, as variantes pré-comprimidas; retorna os bytes gravados."""
+    destino = os.path.join(pasta, *caminho_relativo.split('/'))
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    variantes = [(destino, conteudo)]
+    if destino.endswith(EXTENSOES_COMPRIMIVEIS):
+        # mtime=0: o '.gz' só muda quando o conteúdo muda
+        variantes.append((destino + '.gz', gzip.compress(conteudo, compresslevel=NIVEL_GZIP, mtime=0)))
+        if brotli is not None:
+            variantes.append((destino + '.br', brotli.compress(conteudo, quality=QUALIDADE_BROTLI)))
+    for caminho, dados in variantes:
+        with open(caminho, 'wb') as f:
+            f.write(dados)
+    return sum(len(dados) for _, dados in variantes)
+
+
+def gravar_json(pasta, caminho_relativo, objeto):
+    return gravar(pasta, caminho_relativo, json.dumps(objeto, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _url_relativa(url):
+    # As nuvens são publicadas em '/nuvens/...'; no site estático ficam ao lado das páginas
+    return url.replace(f'/{PASTA_NUVENS}/', f'{PASTA_NUVENS}/')
+
+# ============================================================================
+# ESTADOS DOS CALLBACKS
+# ============================================================================
+
+def figuras_da_arvore(componente):
+    """Figuras dos dcc.Graph de uma árvore de componentes em JSON, em ordem: [{'id', 'figure'}]."""
+    if isinstance(componente, list):
+        return [figura for item in componente for figura in figuras_da_arvore(item)]
+    if not isinstance(componente, dict):
+        return []
+    props = componente.get('props', {})
+    if componente.get('type') == 'Graph' and props.get('figure'):
+        return [{'id': props.get('id'), 'figure': props['figure']}]
+    return figuras_da_arvore(props.get('children'))
+
+
+def exportar_dashboard(pasta):
+    """Grava as seções, os temas de apropriação e os campos qualitativos de cada rede; retorna o manifesto."""
+    import dashboard_app
+
+    versao = dashboard_app._VERSAO
+    secoes = [(secao_id, titulo) for secao_id, titulo, _ in dashboard_app.SECOES_DASHBOARD]
+    for rede in versao['redes']:
+        for secao_id, _ in secoes:
+            if secao_id in SECOES_COM_SELETOR:
+                continue
+            # Cada item da seção é uma linha do grid, com um ou dois gráficos
+            conteudo = dashboard_app.conteudo_secao(versao, secao_id, rede, None)
+            linhas = [figuras_da_arvore(item) for item in conteudo]
+            gravar_json(pasta, f'{PASTA_DADOS}/{rede}/secoes/{secao_id}.json', [linha for linha in linhas if linha])
+        for opcao in dashboard_app.dropdown_apropriacao_options:
+            figura = dashboard_app.figura_apropriacao(versao, opcao['value'], rede, {})
+            gravar_json(pasta, f"{PASTA_DADOS}/{rede}/apropriacao/{opcao['value']}.json", figura)
+        for opcao in dashboard_app.dropdown_qualitativo_options:
+            src, srcset_png, srcset_webp, figura, resumo = dashboard_app.conteudo_qualitativo(versao, opcao['value'], rede)
+            # Gráfico de termos de cada opção de sentimento (vazio sem índice de termos)
+            termos = {sentimento['value']: dashboard_app.figura_termos(versao, opcao['value'], rede, sentimento['value'])
+                      for sentimento in dashboard_app.opcoes_sentimento_termos}
+            gravar_json(pasta, f"{PASTA_DADOS}/{rede}/qualitativo/{opcao['value']}.json", {
+                'nuvem': {'src': _url_relativa(src), 'srcset_png': _url_relativa(srcset_png),
+                          'srcset_webp': _url_relativa(srcset_webp)},
+                'termos': {sentimento: figura for sentimento, figura in termos.items() if figura is not None},
+                'figura': figura,
+                'resumo': resumo,
+            })
+        print(f"   Dashboard: rede '{rede}' exportada")
+
+    # Imagens das nuvens (originais e variantes reduzidas), com os mesmos nomes versionados
+    from nuvens_estaticas import arquivos_publicados
+    for nome, caminho in arquivos_publicados().items():
+        destino = os.path.join(pasta, PASTA_NUVENS, nome)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.copyfile(caminho, destino)
+
+    return {
+        'redes': versao['redes'],
+        'secoes': [{'id': secao_id, 'titulo': titulo} for secao_id, titulo in secoes],
+        'secoes_abertas': dashboard_app.SECOES_ABERTAS_INICIALMENTE,
+        'apropriacao': dashboard_app.dropdown_apropriacao_options,
+        'qualitativo': dashboard_app.dropdown_qualitativo_options,
+        'sentimentos_termos': dashboard_app.opcoes_sentimento_termos,
+    }
+
+
+def exportar_mapas(pasta):
+    """Grava os mapas do Brasil e dos estados de cada rede nas duas resoluções; retorna o manifesto."""
+    import mapas_app
+
+    versao = mapas_app._VERSAO
+    resolucoes = {vista: {'padrao': mapas_app.escolher_resolucao(vista),
+                          'compacta': mapas_app.escolher_resolucao(vista, 0)}
+                  for vista in ('brasil', 'estado')}
+    for rede in versao['redes']:
+        for resolucao in set(resolucoes['brasil'].values()):
+            for coluna in mapas_app.TITULOS_MAPAS:
+                figura = mapas_app.figura_mapa_brasil(versao, coluna, rede, resolucao)
+                gravar_json(pasta, f'{PASTA_DADOS}/{rede}/mapas/brasil/{coluna}-{resolucao}.json', figura)
+        for resolucao in set(resolucoes['estado'].values()):
+            for sigla in mapas_app.ESTADOS_SIGLAS.values():
+                figura = mapas_app.figura_mapa_estado(versao, sigla, rede, resolucao)
+                gravar_json(pasta, f'{PASTA_DADOS}/{rede}/mapas/estados/{sigla}-{resolucao}.json', figura)
+        print(f"   Mapas: rede '{rede}' exportada")
+    return {
+        'redes': versao['redes'],
+        'tipos': [{'label': titulo, 'value': coluna} for coluna, titulo in mapas_app.TITULOS_MAPAS.items()],
+        'tipo_inicial': 'vaga_uf',
+        'estados': mapas_app.ESTADOS_SIGLAS,
+        'resolucoes': resolucoes,
+        'largura_compacta': mapas_app.LARGURA_TELA_COMPACTA,
+    }
+
+# ============================================================================
+# PÁGINAS
+# ============================================================================
+
+CABECALHO = '''<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo}</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
+    <script src="site.js" defer></script>
+</head>
+<body>
+    <nav class="navbar navbar-dark bg-primary mb-4 px-3">
+        <a class="navbar-brand" href="index.html">Análise PMM-e</a>
+        <div class="navbar-nav flex-row gap-3">
+            <a class="nav-link" href="dashboard.html">Visão Geral (Dashboard)</a>
+            <a class="nav-link" href="mapas.html">Análise Geográfica (Mapas)</a>
+        </div>
+    </nav>
+    <div class="container-fluid">
+'''
+RODAPE = '''    </div>
+</body>
+</html>
+'''
+
+PAGINAS = {
+    'index.html': ('Análise PMM-e', '''        <div class="p-5 mb-4 bg-light rounded-3 mt-5">
+            <h1 class="display-3">Painel de Análise do PMM-e</h1>
+            <p class="lead">Utilize o menu de navegação acima para explorar as visualizações.</p>
+            <hr class="my-2">
+            <p>Selecione 'Visão Geral' para um dashboard descritivo ou 'Análise Geográfica' para os mapas interativos.</p>
+            <br>
+            <p style="font-size: 14px; text-align: right; color: #555;">Álisson Oliveira dos Santos<br>Universidade Aberta do SUS (UNA-SUS) • 2025</p>
+        </div>
+'''),
+    'dashboard.html': ('Dashboard PMM-e', '''        <h1 class="text-center mb-4">Dashboard PMM-e - Visão Geral</h1>
+        <div class="mb-4" style="max-width: 320px;">
+            <label class="fw-bold" for="rede">Rede Formadora:</label>
+            <select id="rede" class="form-select"></select>
+        </div>
+        <div id="secoes" class="accordion mb-5"></div>
+        <script>document.addEventListener('DOMContentLoaded', iniciarDashboard);</script>
+'''),
+    'mapas.html': ('Análise Geográfica - PMM-e', '''        <h1 class="text-center">Análise Geográfica - PMM-e</h1>
+        <div class="mb-3" style="max-width: 320px;">
+            <label class="fw-bold" for="rede">Rede Formadora:</label>
+            <select id="rede" class="form-select"></select>
+        </div>
+        <select id="tipo-mapa" class="form-select mb-4"></select>
+        <div id="mapa-principal"></div>
+        <div id="container-municipios" class="mt-4">
+            <p class="text-center text-muted mt-3">Dica: Selecione 'Estado da Vaga Principal' e clique em um estado para ver os municípios.</p>
+        </div>
+        <script>document.addEventListener('DOMContentLoaded', iniciarMapas);</script>
+'''),
+}
+
+# Desenha as figuras exportadas; os seletores só trocam o arquivo JSON buscado
+SCRIPT = r'''const DADOS = 'dados/';
+const cacheJSON = {};
+
+function carregarJSON(caminho) {
+    if (!cacheJSON[caminho]) {
+        cacheJSON[caminho] = fetch(DADOS + caminho).then(r => {
+            if (!r.ok) throw new Error(`${caminho}: ${r.status}`);
+            return r.json();
+        });
+    }
+    return cacheJSON[caminho];
+}
+
+function caminhoRede(rede, resto) {
+    return `${encodeURIComponent(rede)}/${resto}`;
+}
+
+function desenhar(elemento, figura) {
+    Plotly.react(elemento, figura.data || [], figura.layout || {}, { responsive: true });
+}
+
+function preencherSelect(select, opcoes, valor) {
+    select.innerHTML = '';
+    for (const opcao of opcoes) {
+        select.add(new Option(opcao.label, opcao.value, false, opcao.value === valor));
+    }
+}
+
+function criarElemento(tag, classe, pai) {
+    const elemento = document.createElement(tag);
+    if (classe) elemento.className = classe;
+    if (pai) pai.appendChild(elemento);
+    return elemento;
+}
+
+// ============================================================================
+// DASHBOARD
+// ============================================================================
+
+async function iniciarDashboard() {
+    const manifesto = (await carregarJSON('manifesto.json')).dashboard;
+    const seletorRede = document.getElementById('rede');
+    preencherSelect(seletorRede, manifesto.redes.map(r => ({ label: r, value: r })), manifesto.redes[0]);
+
+    const abertas = new Set(manifesto.secoes_abertas);
+    const corpos = {};
+    for (const secao of manifesto.secoes) {
+        const item = criarElemento('details', 'accordion-item p-3', document.getElementById('secoes'));
+        item.open = abertas.has(secao.id);
+        criarElemento('summary', 'h4', item).textContent = secao.titulo;
+        corpos[secao.id] = criarElemento('div', 'mt-3', item);
+        // Como no app, cada seção só busca suas figuras ao ser aberta
+        item.addEventListener('toggle', () => item.open && carregarSecao(secao.id));
+    }
+
+    const carregadas = new Set();
+    async function carregarSecao(secaoId) {
+        const rede = seletorRede.value;
+        if (carregadas.has(`${rede}|${secaoId}`)) return;
+        carregadas.add(`${rede}|${secaoId}`);
+        const corpo = corpos[secaoId];
+        if (secaoId === 'apropriacao') return montarSeletor(corpo, 'apropriacao', manifesto.apropriacao, desenharApropriacao);
+        if (secaoId === 'qualitativa') return montarSeletor(corpo, 'qualitativo', manifesto.qualitativo, desenharQualitativo);
+        corpo.innerHTML = '';
+        const linhas = await carregarJSON(caminhoRede(rede, `secoes/${secaoId}.json`));
+        for (const linha of linhas) {
+            const divLinha = criarElemento('div', 'row mt-4', corpo);
+            for (const grafico of linha) {
+                desenhar(criarElemento('div', linha.length > 1 ? 'col-md-6' : 'col-12', divLinha), grafico.figure);
+            }
+        }
+    }
+
+    function montarSeletor(corpo, tipo, opcoes, desenharOpcao) {
+        corpo.innerHTML = '';
+        const seletor = criarElemento('select', 'form-select mb-3', corpo);
+        preencherSelect(seletor, opcoes, opcoes[0].value);
+        const destino = criarElemento('div', '', corpo);
+        const atualizar = async () => desenharOpcao(destino,
+            await carregarJSON(caminhoRede(seletorRede.value, `${tipo}/${seletor.value}.json`)));
+        seletor.addEventListener('change', atualizar);
+        return atualizar();
+    }
+
+    function desenharApropriacao(destino, figura) {
+        desenhar(destino, figura);
+    }
+
+    function desenharQualitativo(destino, conteudo) {
+        destino.innerHTML = '';
+        const sentimentos = manifesto.sentimentos_termos.filter(s => conteudo.termos[s.value]);
+        if (sentimentos.length) {
+            // Com o índice de termos, o gráfico de termos ocupa o lugar da nuvem
+            criarElemento('h3', 'mt-4 text-center', destino).textContent = 'Termos mais Frequentes';
+            const seletor = criarElemento('select', 'form-select mx-auto', destino);
+            seletor.style.maxWidth = '240px';
+            preencherSelect(seletor, sentimentos, sentimentos[0].value);
+            const grafico = criarElemento('div', '', destino);
+            seletor.addEventListener('change', () => desenhar(grafico, conteudo.termos[seletor.value]));
+            desenhar(grafico, conteudo.termos[seletor.value]);
+        } else if (conteudo.nuvem.src) {
+            criarElemento('h3', 'mt-4 text-center', destino).textContent = 'Nuvem de Palavras';
+            const picture = criarElemento('picture', '', destino);
+            const tamanhos = '(max-width: 800px) 100vw, 800px';
+            if (conteudo.nuvem.srcset_webp) {
+                const fonte = criarElemento('source', '', picture);
+                Object.assign(fonte, { type: 'image/webp', srcset: conteudo.nuvem.srcset_webp, sizes: tamanhos });
+            }
+            const img = criarElemento('img', '', picture);
+            Object.assign(img, { src: conteudo.nuvem.src, srcset: conteudo.nuvem.srcset_png, sizes: tamanhos,
+                                 alt: 'Nuvem de palavras' });
+            img.style.cssText = 'max-width: 800px; width: 100%; margin: auto; display: block;';
+        }
+        criarElemento('h3', 'mt-4 text-center', destino).textContent = 'Análise de Sentimentos';
+        desenhar(criarElemento('div', '', destino), conteudo.figura);
+        criarElemento('h3', 'mt-4', destino).textContent = 'Resumo dos Textos';
+        const resumo = criarElemento('div', 'p-3 bg-light border rounded', destino);
+        resumo.style.whiteSpace = 'pre-wrap';
+        resumo.textContent = conteudo.resumo;
+    }
+
+    seletorRede.addEventListener('change', () => {
+        carregadas.clear();
+        for (const [secaoId, corpo] of Object.entries(corpos)) {
+            if (corpo.parentElement.open) carregarSecao(secaoId);
+        }
+    });
+    await Promise.all(manifesto.secoes.filter(s => abertas.has(s.id)).map(s => carregarSecao(s.id)));
+}
+
+// ============================================================================
+// MAPAS
+// ============================================================================
+
+async function iniciarMapas() {
+    const manifesto = (await carregarJSON('manifesto.json')).mapas;
+    const seletorRede = document.getElementById('rede');
+    const seletorTipo = document.getElementById('tipo-mapa');
+    const mapa = document.getElementById('mapa-principal');
+    const municipios = document.getElementById('container-municipios');
+    const dica = municipios.innerHTML;
+    preencherSelect(seletorRede, manifesto.redes.map(r => ({ label: r, value: r })), manifesto.redes[0]);
+    preencherSelect(seletorTipo, manifesto.tipos, manifesto.tipo_inicial);
+
+    function resolucao(vista) {
+        const compacta = window.innerWidth < manifesto.largura_compacta;
+        return manifesto.resolucoes[vista][compacta ? 'compacta' : 'padrao'];
+    }
+
+    async function atualizarMapa() {
+        municipios.innerHTML = dica;
+        const arquivo = `mapas/brasil/${seletorTipo.value}-${resolucao('brasil')}.json`;
+        desenhar(mapa, await carregarJSON(caminhoRede(seletorRede.value, arquivo)));
+    }
+
+    async function mostrarMunicipios(evento) {
+        if (seletorTipo.value !== 'vaga_uf') return;
+        const sigla = manifesto.estados[evento.points[0].location];
+        if (!sigla) {
+            municipios.textContent = 'Estado não reconhecido.';
+            return;
+        }
+        const arquivo = `mapas/estados/${sigla}-${resolucao('estado')}.json`;
+        municipios.innerHTML = '';
+        desenhar(criarElemento('div', '', municipios), await carregarJSON(caminhoRede(seletorRede.value, arquivo)));
+    }
+
+    seletorRede.addEventListener('change', atualizarMapa);
+    seletorTipo.addEventListener('change', atualizarMapa);
+    await atualizarMapa();
+    // O div do gráfico só ganha o método 'on' depois do primeiro desenho
+    mapa.on('plotly_click', mostrarMunicipios);
+}
+'''
+
+
+def exportar_paginas(pasta):
+    for nome, (titulo, corpo) in PAGINAS.items():
+        gravar(pasta, nome, (CABECALHO.format(titulo=titulo) + corpo + RODAPE).encode('utf-8'))
+    gravar(pasta, 'site.js', SCRIPT.encode('utf-8'))
+
+# ============================================================================
+# SCRIPT PRINCIPAL
+# ============================================================================
+
+def limpar_saida(pasta):
+    """Apaga de `pasta` só o que uma exportação anterior gravou.
+
+    Uma pasta não vazia sem o manifesto não foi gerada por este script (um '--saida .'
+    apontaria para o próprio repositório) e não é tocada: ValueError.
+    """
+    if not os.path.isdir(pasta) or not os.listdir(pasta):
+        return
+    if not os.path.isfile(os.path.join(pasta, PASTA_DADOS, 'manifesto.json')):
+        raise ValueError(f"'{pasta}' não está vazia e não é um site exportado (sem '{PASTA_DADOS}/manifesto.json'); "
+                         "escolha outra pasta com --saida")
+    for subpasta in (PASTA_DADOS, PASTA_NUVENS):
+        shutil.rmtree(os.path.join(pasta, subpasta), ignore_errors=True)
+    for nome in [*PAGINAS, 'site.js']:
+        for variante in ('', '.gz', '.br'):
+            caminho = os.path.join(pasta, nome + variante)
+            if os.path.isfile(caminho):
+                os.remove(caminho)
+
+
+def verificar_geojson():
+    """Sem os GeoJSON locais os mapas sairiam vazios ('data': []): ValueError antes de tocar na saída."""
+    from geojson_local import PASTA_GEOJSON, arquivos_esperados
+
+    faltando = [nome for nome, _ in arquivos_esperados() if not os.path.isfile(os.path.join(PASTA_GEOJSON, nome))]
+    if faltando:
+        raise ValueError(f"{len(faltando)} GeoJSON ausentes em '{PASTA_GEOJSON}/' (ex.: '{faltando[0]}'); "
+                         "execute 'python geojson_local.py' antes de exportar")
+
+
+def exportar(pasta=PASTA_SAIDA):
+    """Exporta páginas, figuras e manifesto para `pasta` (substituindo a exportação anterior)."""
+    inicio = time.perf_counter()
+    verificar_geojson()
+    limpar_saida(pasta)
+    manifesto = {'dashboard': exportar_dashboard(pasta), 'mapas': exportar_mapas(pasta)}
+    gravar_json(pasta, f'{PASTA_DADOS}/manifesto.json', manifesto)
+    exportar_paginas(pasta)
+    return time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta o dashboard e os mapas como site estático para CDN.")
+    parser.add_argument('--saida', default=PASTA_SAIDA, help=f"Pasta do site gerado (padrão: {PASTA_SAIDA}).")
+    args = parser.parse_args(argv)
+
+    print("🔄 Exportando páginas e figuras dos apps...")
+    if brotli is None:
+        print("⚠️  Pacote 'brotli' não instalado: só as variantes '.gz' serão gravadas.")
+    try:
+        duracao = exportar(args.saida)
+    except ValueError as erro:
+        parser.error(str(erro))
+    arquivos = [os.path.join(raiz, nome) for raiz, _, nomes in os.walk(args.saida) for nome in nomes]
+    tamanho = sum(os.path.getsize(caminho) for caminho in arquivos)
+    print(f"✅ Site estático gravado em '{args.saida}' ({len(arquivos)} arquivos, {tamanho / 1e6:.1f} MB) em {duracao:.1f} s")
+    print(f"   Publique a pasta '{args.saida}' em qualquer CDN ou hospedagem estática.")
+
+
+if __name__ == '__main__':
+    main()
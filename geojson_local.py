@@ -0,0 +1,363 @@
+# geojson_local.py
+"""Repositório local dos GeoJSON usados em mapas_app.
+
+Os arquivos são baixados uma única vez por uma etapa de build
+(`python geojson_local.py`) para a pasta 'geojson/'. Em tempo de execução os
+mapas só leem o disco: nenhum callback acessa a rede.
+
+A mesma etapa gera versões simplificadas (Douglas-Peucker sobre as fronteiras
+compartilhadas, preservando a topologia) e com coordenadas arredondadas em
+'geojson/<resolucao>/', para que cada mapa envie ao navegador só o detalhe que
+a tela consegue mostrar.
+"""
+import argparse
+import json
+import os
+import sys
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+import metricas
+
+PASTA_GEOJSON = 'geojson'
+URL_ESTADOS = 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson'
+URL_MUNICIPIOS = 'https://raw.githubusercontent.com/tbrugz/geodata-br/master/geojson/geojs-{codigo}-mun.json'
+ARQUIVO_ESTADOS = 'brasil-estados.json'
+ARQUIVO_MUNICIPIOS = 'municipios-{codigo}.json'
+
+SIGLAS_IBGE = {'AC': '12', 'AM': '13', 'AP': '16', 'PA': '15', 'RO': '11', 'RR': '14', 'TO': '17', 'AL': '27', 'BA': '29', 'CE': '23', 'MA': '21', 'PB': '25', 'PE': '26', 'PI': '22', 'RN': '24', 'SE': '28', 'ES': '32', 'MG': '31', 'RJ': '33', 'SP': '35', 'PR': '41', 'RS': '43', 'SC': '42', 'DF': '53', 'GO': '52', 'MT': '51', 'MS': '50'}
+
+# Resoluções geradas: tolerância da simplificação (graus) e casas decimais mantidas
+RESOLUCOES = {
+    'alta': {'tolerancia': 0.002, 'casas_decimais': 4},
+    'media': {'tolerancia': 0.01, 'casas_decimais': 3},
+    'baixa': {'tolerancia': 0.03, 'casas_decimais': 2},
+}
+RESOLUCAO_ORIGINAL = 'original'
+# Casas decimais para reconhecer o mesmo vértice em feições vizinhas (~1 cm)
+CASAS_TOPOLOGIA = 7
+
+# Mapa do Brasil + 27 estados nas três resoluções cabem após o pré-aquecimento;
+# o limite impede que o cache cresça sem controle.
+TAMANHO_CACHE = 96
+
+
+def arquivos_esperados():
+    """Lista (nome do arquivo, URL de origem) de todos os GeoJSON usados pelos mapas."""
+    arquivos = [(ARQUIVO_ESTADOS, URL_ESTADOS)]
+    arquivos += [(ARQUIVO_MUNICIPIOS.format(codigo=codigo), URL_MUNICIPIOS.format(codigo=codigo))
+                 for codigo in sorted(SIGLAS_IBGE.values())]
+    return arquivos
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _ler_geojson(caminho):
+    pasta = os.path.basename(os.path.dirname(caminho))
+    with metricas.cronometrar(metricas.CARGA_GEOJSON, resolucao=pasta if pasta in RESOLUCOES else RESOLUCAO_ORIGINAL):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def _metricas_cache():
+    info = _ler_geojson.cache_info()
+    return [('pmme_geojson_cache_total', 'counter', 'Consultas ao cache de GeoJSON em memória.',
+             [({'resultado': 'acerto'}, info.hits), ({'resultado': 'falta'}, info.misses)]),
+            ('pmme_geojson_cache_entradas', 'gauge', 'GeoJSON mantidos em memória.', [({}, info.currsize)])]
+
+
+metricas.registrar_coletor(_metricas_cache)
+
+
+def _caminho(nome_arquivo, pasta, resolucao):
+    if resolucao in (None, RESOLUCAO_ORIGINAL):
+        return os.path.join(pasta, nome_arquivo)
+    return os.path.join(pasta, resolucao, nome_arquivo)
+
+
+def carregar_geojson(nome_arquivo, pasta=PASTA_GEOJSON, resolucao=None):
+    """Lê um GeoJSON do repositório local (com cache em memória); None se ausente.
+
+    Se a resolução pedida não foi gerada, usa o arquivo original.
+    """
+    caminho = _caminho(nome_arquivo, pasta, resolucao)
+    if not os.path.exists(caminho):
+        caminho = _caminho(nome_arquivo, pasta, None)
+    try:
+        return _ler_geojson(caminho)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao carregar GeoJSON '{nome_arquivo}' (execute 'python geojson_local.py'): {e}")
+        return None
+
+
+def geojson_estados(pasta=PASTA_GEOJSON, resolucao=None):
+    return carregar_geojson(ARQUIVO_ESTADOS, pasta, resolucao)
+
+
+def geojson_municipios(codigo_ibge, pasta=PASTA_GEOJSON, resolucao=None):
+    return carregar_geojson(ARQUIVO_MUNICIPIOS.format(codigo=codigo_ibge), pasta, resolucao)
+
+
+def pre_aquecer(pasta=PASTA_GEOJSON, resolucoes=(None,)):
+    """Carrega em memória todos os GeoJSON disponíveis; retorna os nomes que faltam no disco."""
+    faltando = []
+    for nome, _ in arquivos_esperados():
+        if os.path.exists(os.path.join(pasta, nome)):
+            for resolucao in resolucoes:
+                carregar_geojson(nome, pasta, resolucao)
+        else:
+            faltando.append(nome)
+    if faltando:
+        print(f"AVISO: {len(faltando)} GeoJSON ausentes em '{pasta}/'. Execute 'python geojson_local.py'.")
+    return faltando
+
+
+# ============================================================================
+# CÓDIGOS IBGE DOS MUNICÍPIOS
+# ============================================================================
+
+def normalizar_nome(nome):
+    """Nome sem acentos, caixa ou variações de espaço/hífen/apóstrofo, para casar grafias diferentes."""
+    sem_acentos = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    for caractere in "-'`´’":
+        sem_acentos = sem_acentos.replace(caractere, ' ')
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def indice_codigos_municipios(pasta=PASTA_GEOJSON):
+    """{sigla da UF: {nome normalizado: código IBGE do município}} a partir dos GeoJSON locais."""
+    indice = {}
+    for sigla, codigo_uf in SIGLAS_IBGE.items():
+        nome_arquivo = ARQUIVO_MUNICIPIOS.format(codigo=codigo_uf)
+        # As propriedades são as mesmas em todas as resoluções: lê a menor, sem passar pelo cache
+        caminho = next((c for c in (_caminho(nome_arquivo, pasta, r) for r in ('baixa', None)) if os.path.exists(c)), None)
+        if caminho is None:
+            continue
+        with open(caminho, 'r', encoding='utf-8') as f:
+            geojson = json.load(f)
+        indice[sigla] = {normalizar_nome(f['properties']['name']): str(f['properties']['id'])
+                         for f in geojson['features']}
+    return indice
+
+
+# ============================================================================
+# SIMPLIFICAÇÃO E QUANTIZAÇÃO DAS GEOMETRIAS
+# ============================================================================
+
+def _douglas_peucker(pontos, tolerancia):
+    """Índices dos pontos mantidos pela simplificação de Douglas-Peucker."""
+    manter = np.zeros(len(pontos), dtype=bool)
+    manter[0] = manter[-1] = True
+    pilha = [(0, len(pontos) - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        a, b = pontos[inicio], pontos[fim]
+        trecho = pontos[inicio + 1:fim]
+        segmento = b - a
+        comprimento = np.hypot(*segmento)
+        if comprimento == 0:
+            distancias = np.hypot(*(trecho - a).T)
+        else:
+            distancias = np.abs(segmento[0] * (trecho[:, 1] - a[1]) - segmento[1] * (trecho[:, 0] - a[0])) / comprimento
+        i = int(np.argmax(distancias))
+        if distancias[i] > tolerancia:
+            meio = inicio + 1 + i
+            manter[meio] = True
+            pilha.extend([(inicio, meio), (meio, fim)])
+    return manter
+
+
+def _manter_arco(pontos, tolerancia):
+    """Pontos mantidos de um arco; o arco é dividido no ponto mais distante do início,
+    para que um arco fechado (ilha) não colapse."""
+    distante = int(np.argmax(np.hypot(*(pontos - pontos[0]).T)))
+    if distante in (0, len(pontos) - 1):
+        return _douglas_peucker(pontos, tolerancia)
+    return np.concatenate([_douglas_peucker(pontos[:distante + 1], tolerancia)[:-1],
+                           _douglas_peucker(pontos[distante:], tolerancia)])
+
+
+def _pontos_anel(anel):
+    """Vértices do anel sem o ponto de fechamento, como tuplas comparáveis entre feições."""
+    pontos = [tuple(p) for p in np.round(np.asarray(anel, dtype=float)[:, :2], CASAS_TOPOLOGIA).tolist()]
+    if len(pontos) > 1 and pontos[0] == pontos[-1]:
+        pontos.pop()
+    return pontos
+
+
+def _juncoes(aneis):
+    """Vértices onde uma fronteira compartilhada começa ou termina.
+
+    Um vértice é junção quando aparece com pares de vizinhos diferentes em anéis
+    diferentes (ou duas vezes no mesmo anel); entre duas junções, o trecho é o mesmo
+    em todos os anéis que o compartilham, só que às vezes percorrido ao contrário.
+    """
+    vizinhos, juncoes = {}, set()
+    for anel in aneis:
+        for i, ponto in enumerate(anel):
+            par = frozenset((anel[i - 1], anel[(i + 1) % len(anel)]))
+            if vizinhos.setdefault(ponto, par) != par:
+                juncoes.add(ponto)
+    return juncoes
+
+
+def _arcos(anel, juncoes):
+    """Divide o anel em arcos entre junções.
+
+    Um anel com menos de duas junções (ilha, enclave) ganha o menor vértice e o mais
+    distante dele: pontos que dependem só do traçado, e não de onde o anel começa.
+    """
+    fixos = {i for i, ponto in enumerate(anel) if ponto in juncoes}
+    if len(fixos) < 2:
+        inicio = min(range(len(anel)), key=anel.__getitem__)
+        pontos = np.asarray(anel)
+        fixos |= {inicio, int(np.argmax(np.hypot(*(pontos - pontos[inicio]).T)))}
+    fixos = sorted(fixos)
+    if len(fixos) < 2:
+        return [anel + anel[:1]]
+    return [[anel[i % len(anel)] for i in range(a, b + 1)] for a, b in zip(fixos, fixos[1:] + [fixos[0] + len(anel)])]
+
+
+def _simplificar_arco(arco, tolerancia, cache_arcos):
+    """Arco simplificado, calculado uma só vez para todos os anéis que o compartilham."""
+    chave = min(tuple(arco), tuple(reversed(arco)))
+    if chave not in cache_arcos:
+        pontos = np.asarray(chave)
+        cache_arcos[chave] = pontos[_manter_arco(pontos, tolerancia)] if len(pontos) > 2 else pontos
+    return cache_arcos[chave] if chave == tuple(arco) else cache_arcos[chave][::-1]
+
+
+def _simplificar_anel(anel, tolerancia, casas_decimais, juncoes, cache_arcos):
+    """Simplifica e arredonda um anel fechado; None se ele desaparecer na tolerância."""
+    pontos = _pontos_anel(anel)
+    if len(pontos) < 3:
+        return None
+    arcos = [_simplificar_arco(arco, tolerancia, cache_arcos) for arco in _arcos(pontos, juncoes)]
+    # Arcos consecutivos compartilham a junção: entra só uma vez
+    simplificado = np.round(np.concatenate([arcos[0]] + [arco[1:] for arco in arcos[1:]]), casas_decimais)
+    # Remove pontos repetidos criados pelo arredondamento
+    repetido = np.r_[False, np.all(simplificado[1:] == simplificado[:-1], axis=1)]
+    simplificado = simplificado[~repetido]
+    if len(simplificado) < 4:
+        return None
+    return simplificado.tolist()
+
+
+def _simplificar_poligono(poligono, tolerancia, casas_decimais, juncoes, cache_arcos):
+    exterior = _simplificar_anel(poligono[0], tolerancia, casas_decimais, juncoes, cache_arcos)
+    if exterior is None:
+        return None
+    buracos = [anel for anel in (_simplificar_anel(a, tolerancia, casas_decimais, juncoes, cache_arcos)
+                                 for a in poligono[1:]) if anel]
+    return [exterior] + buracos
+
+
+def _poligonos(geometria):
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    return []
+
+
+def simplificar_geometria(geometria, tolerancia, casas_decimais, juncoes=None, cache_arcos=None):
+    """Versão simplificada de um Polygon/MultiPolygon.
+
+    Partes menores que a tolerância (ilhas, buracos) são descartadas, mas a
+    feição nunca some: se tudo colapsar, mantém-se a geometria só arredondada.
+    `juncoes` e `cache_arcos` vêm de simplificar_geojson, para que as fronteiras
+    compartilhadas com outras feições saiam iguais dos dois lados.
+    """
+    poligonos = _poligonos(geometria)
+    if not poligonos:
+        return geometria
+    if juncoes is None:
+        juncoes = _juncoes([_pontos_anel(anel) for poligono in poligonos for anel in poligono])
+    cache_arcos = {} if cache_arcos is None else cache_arcos
+    simplificados = [p for p in (_simplificar_poligono(p, tolerancia, casas_decimais, juncoes, cache_arcos)
+                                 for p in poligonos) if p]
+    if not simplificados:
+        simplificados = [[np.round(np.asarray(anel, dtype=float)[:, :2], casas_decimais).tolist()
+                          for anel in p] for p in poligonos]
+    if len(simplificados) == 1:
+        return {'type': 'Polygon', 'coordinates': simplificados[0]}
+    return {'type': 'MultiPolygon', 'coordinates': simplificados}
+
+
+def simplificar_geojson(geojson, tolerancia, casas_decimais):
+    """Simplifica todas as feições preservando a topologia, como no TopoJSON.
+
+    Os anéis são divididos em arcos nas junções, e cada arco compartilhado é
+    simplificado uma única vez: vizinhos continuam com a mesma fronteira, sem
+    frestas nem sobreposições entre eles.
+    """
+    juncoes = _juncoes([_pontos_anel(anel) for feature in geojson['features']
+                        for poligono in _poligonos(feature['geometry']) for anel in poligono])
+    cache_arcos = {}
+    features = [{**feature, 'geometry': simplificar_geometria(feature['geometry'], tolerancia, casas_decimais,
+                                                              juncoes, cache_arcos)}
+                for feature in geojson['features']]
+    return {**geojson, 'features': features}
+
+
+def gerar_resolucoes(pasta=PASTA_GEOJSON):
+    """Etapa de build: grava as versões simplificadas de cada GeoJSON baixado."""
+    for resolucao in RESOLUCOES:
+        os.makedirs(os.path.join(pasta, resolucao), exist_ok=True)
+    for nome, _ in arquivos_esperados():
+        origem = os.path.join(pasta, nome)
+        if not os.path.exists(origem):
+            continue
+        with open(origem, 'r', encoding='utf-8') as f:
+            geojson = json.load(f)
+        tamanhos = [os.path.getsize(origem)]
+        for resolucao, parametros in RESOLUCOES.items():
+            destino = _caminho(nome, pasta, resolucao)
+            temporario = destino + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(simplificar_geojson(geojson, **parametros), f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporario, destino)
+            tamanhos.append(os.path.getsize(destino))
+        print(f"🗺️  {nome}: " + ' | '.join(f'{r} {t / 1024:.0f} KB' for r, t in zip(['original'] + list(RESOLUCOES), tamanhos)))
+
+
+def baixar_geojsons(pasta=PASTA_GEOJSON, forcar=False):
+    """Etapa de build: baixa os GeoJSON que ainda não estão na pasta."""
+    import requests  # usado apenas no build, nunca pelo app
+
+    os.makedirs(pasta, exist_ok=True)
+    for nome, url in arquivos_esperados():
+        destino = os.path.join(pasta, nome)
+        if os.path.exists(destino) and not forcar:
+            continue
+        print(f"⬇️  {nome} <- {url}")
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        geojson = response.json()
+        temporario = destino + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporario, destino)
+    print(f"✅ GeoJSON disponíveis em '{pasta}/'")
+    gerar_resolucoes(pasta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Baixa os GeoJSON dos mapas para uso offline.')
+    parser.add_argument('--pasta', default=PASTA_GEOJSON, help='Pasta de destino dos arquivos.')
+    parser.add_argument('--forcar', action='store_true', help='Baixa novamente mesmo os arquivos já presentes.')
+    parser.add_argument('--somente-simplificar', action='store_true',
+                        help='Não acessa a rede; apenas regenera as resoluções a partir dos arquivos já baixados.')
+    args = parser.parse_args(argv)
+    if args.somente_simplificar:
+        gerar_resolucoes(args.pasta)
+    else:
+        baixar_geojsons(args.pasta, args.forcar)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
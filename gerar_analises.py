@@ -0,0 +1,418 @@
+# gerar_analises.py
+"""Gera as análises qualitativas ('resultados_analises.json' e 'analises/<rede>/') localmente.
+
+Tudo roda offline: o sentimento vem de um léxico (embutido ou informado com
+--lexico), o resumo é extrativo (termos mais frequentes e, com --trechos,
+frases repetidas por várias respostas) e a nuvem de palavras é desenhada com
+o pacote opcional 'wordcloud'. O trabalho é distribuído num pool de processos:
+
+1. cada texto novo é analisado uma única vez, mesmo que apareça em várias redes;
+   o resultado fica em cache pelo hash do conteúdo, então uma nova execução só
+   processa respostas novas ou alteradas;
+2. cada par (rede, campo) monta sua distribuição, resumo e nuvem em paralelo;
+   pares cujo conjunto de textos não mudou são reaproveitados do cache.
+
+Para a rede 'Todas', cada campo também ganha as contagens de termos por rede
+e sentimento (indice_termos.py), de onde o dashboard conta os termos de
+qualquer recorte sem precisar de outra nuvem. Elas são publicadas em
+'analises/' e não trazem nada por resposta.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from gerar_dados_publicos import (ARQUIVO_JSON, COLUNA_REDE, PASTA_BUNDLES, REDE_NAO_INFORMADA, REDE_TODAS, iterar_registros,
+                                  nome_rede_seguro)
+from indice_termos import montar_indice
+
+try:
+    from wordcloud import WordCloud
+except ImportError:  # 'wordcloud' é opcional: sem ele as análises são geradas sem as nuvens
+    WordCloud = None
+
+ARQUIVO_ANALISES = 'resultados_analises.json'
+ARQUIVO_CACHE = 'cache_analises.pkl'  # contém resultados por texto: NÃO versionar
+PASTA_NUVENS = 'nuvens_palavras'
+PASTA_INDICES = 'indices_termos'
+BACKEND = 'lexico'
+
+# Campos de texto livre do export (chave do registro -> descrição exibida no dashboard)
+CAMPOS_TEXTO = {
+    'aptidoes_rotina': 'Expectativas em relação ao PMM-e',
+    'competencias_fortalecer': 'Aptidão para atuação',
+    'impressao_servico': 'Impressão sobre o serviço',
+    'momento_imersao': 'Expectativas para imersão',
+}
+TEXTOS_POR_LOTE = 500
+TERMOS_NUVEM = 150
+TERMOS_RESUMO = 15
+TRECHOS_RESUMO = 5
+K_MINIMO_TRECHO = 5  # respostas com a mesma frase para ela poder ser citada no resumo
+TAMANHO_TRECHO = (30, 300)
+
+# ============================================================================
+# LÉXICO E NORMALIZAÇÃO
+# ============================================================================
+# Termos sem acentos e em minúsculas; --lexico acrescenta ou substitui entradas
+LEXICO_PADRAO = {
+    **dict.fromkeys([
+        'bom', 'boa', 'otimo', 'otima', 'excelente', 'positivo', 'positiva', 'satisfeito', 'satisfeita',
+        'feliz', 'gratificante', 'motivado', 'motivada', 'animado', 'animada', 'entusiasmado', 'entusiasmada',
+        'oportunidade', 'aprendizado', 'aprender', 'crescimento', 'aprimoramento', 'aperfeicoamento',
+        'qualificacao', 'qualificado', 'qualificada', 'capacitacao', 'melhoria', 'melhorar', 'melhor',
+        'fortalecer', 'fortalecimento', 'ampliar', 'ampliacao', 'contribuir', 'contribuicao', 'valorizacao',
+        'acolhimento', 'acolhedor', 'acolhedora', 'apoio', 'suporte', 'confianca', 'seguranca', 'seguro',
+        'adequado', 'adequada', 'eficiente', 'resolutividade', 'resolutivo', 'humanizado', 'humanizacao',
+        'interessante', 'importante', 'enriquecedor', 'enriquecedora', 'agradavel', 'tranquilo', 'tranquila',
+        'sucesso', 'expectativa', 'esperanca', 'gosto', 'gostei', 'adoro', 'recomendo', 'parabens',
+    ], 1),
+    **dict.fromkeys([
+        'ruim', 'pessimo', 'pessima', 'negativo', 'negativa', 'insatisfeito', 'insatisfeita', 'dificil',
+        'dificuldade', 'dificuldades', 'problema', 'problemas', 'falta', 'faltam', 'ausencia', 'precario',
+        'precaria', 'precarizacao', 'inadequado', 'inadequada', 'insuficiente', 'deficiente', 'deficit',
+        'atraso', 'atrasos', 'demora', 'burocracia', 'burocratico', 'sobrecarga', 'sobrecarregado',
+        'cansativo', 'cansaco', 'estresse', 'estressante', 'frustrado', 'frustrada', 'frustracao',
+        'preocupacao', 'preocupado', 'preocupada', 'medo', 'receio', 'inseguranca', 'inseguro', 'insegura',
+        'desorganizacao', 'desorganizado', 'confuso', 'confusa', 'longe', 'distante', 'isolamento',
+        'desvalorizacao', 'desrespeito', 'descaso', 'abandono', 'pior', 'piorar', 'limitado', 'limitada',
+    ], -1),
+}
+NEGACOES = {'nao', 'nem', 'nunca', 'jamais', 'sem', 'nenhum', 'nenhuma'}
+JANELA_NEGACAO = 3
+STOPWORDS = set('''
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela dele deles depois do dos e ela
+elas ele eles em entre era eram essa essas esse esses esta estao estas estava este estes eu foi for foram
+ha isso isto ja la lhe mais mas me mesmo meu minha muito muita muitos muitas na nas no nos nossa nosso num
+numa o os ou para pela pelas pelo pelos per por qual quando que quem se ser sera seu seus sua suas so
+tambem te tem ter tinha um uma umas uns voce voces vou sao sobre assim bem pois onde cada todo toda todos
+todas outro outra outros outras ainda apenas alem forma ser estar sendo sido poder pode podem possa
+nao sim estou estamos tenho temos tive acho seria fazer faz vai vao havera quero
+'''.split())
+TAMANHO_MINIMO_TERMO = 3
+
+
+def sem_acentos(texto):
+    """Minúsculas e sem acentos, para comparar termos com o léxico e as stopwords."""
+    decomposto = unicodedata.normalize('NFKD', texto.casefold())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def carregar_lexico(caminho=None):
+    """Léxico padrão, acrescido das entradas do arquivo (se houver).
+
+    O arquivo tem uma entrada por linha: o termo e sua polaridade (-1, 0 ou 1),
+    separados por vírgula ou tabulação; colunas extras (como no OpLexicon) são ignoradas.
+    """
+    lexico = dict(LEXICO_PADRAO)
+    if caminho:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                partes = [p.strip() for p in re.split(r'[,\t]', linha)]
+                polaridade = next((int(p) for p in partes[1:] if re.fullmatch(r'[-+]?[01]', p)), None)
+                if partes[0] and polaridade is not None:
+                    lexico[sem_acentos(partes[0])] = polaridade
+    return lexico
+
+
+def hash_texto(texto):
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+# ============================================================================
+# ANÁLISE DE CADA TEXTO (ETAPA 1)
+# ============================================================================
+_LEXICO = None
+
+def _iniciar_processo(lexico):
+    """Inicializador do pool: o léxico é enviado uma vez por processo, não por tarefa."""
+    global _LEXICO
+    _LEXICO = lexico
+
+
+def analisar_texto(texto, lexico):
+    """{'sentimento', 'pontuacao', 'termos'} de um texto.
+
+    A pontuação soma a polaridade dos termos do léxico, invertida quando há uma
+    negação nas palavras imediatamente anteriores.
+    """
+    palavras = re.findall(r'[^\W\d_]+', texto.casefold())
+    normalizadas = [sem_acentos(p) for p in palavras]
+    pontuacao = 0
+    for i, termo in enumerate(normalizadas):
+        polaridade = lexico.get(termo)
+        if polaridade is None and termo.endswith('s'):
+            polaridade = lexico.get(termo[:-1])
+        if polaridade:
+            negado = any(anterior in NEGACOES for anterior in normalizadas[max(0, i - JANELA_NEGACAO):i])
+            pontuacao += -polaridade if negado else polaridade
+    sentimento = 'Positivo' if pontuacao > 0 else 'Negativo' if pontuacao < 0 else 'Neutro'
+    termos = [palavra for palavra, termo in zip(palavras, normalizadas)
+              if len(termo) >= TAMANHO_MINIMO_TERMO and termo not in STOPWORDS]
+    return {'sentimento': sentimento, 'pontuacao': pontuacao, 'termos': termos}
+
+
+def analisar_lote(lote):
+    """[(hash, análise)] de um lote de (hash, texto); roda nos processos do pool."""
+    return [(h, analisar_texto(texto, _LEXICO)) for h, texto in lote]
+
+# ============================================================================
+# RESUMO E NUVEM DE CADA (REDE, CAMPO) (ETAPA 2)
+# ============================================================================
+
+def _trechos(texto):
+    for frase in re.split(r'(?<=[.!?;])\s+|\n+', texto):
+        frase = frase.strip()
+        if TAMANHO_TRECHO[0] <= len(frase) <= TAMANHO_TRECHO[1]:
+            yield frase
+
+
+def resumir(descricao, textos, analises, frequencias, trechos=False):
+    """Resumo extrativo em markdown: distribuição, termos principais e, com `trechos`, trechos representativos.
+
+    Trechos são citados literalmente e o resumo é publicado: uma frase escrita por uma só
+    pessoa pode identificá-la. Por isso só são citados com `trechos` e se a mesma frase
+    aparecer em pelo menos K_MINIMO_TRECHO respostas. Cada trecho recebe a média das
+    frequências (no campo) dos seus termos, e os de maior pontuação, sem repetir,
+    representam os temas mais recorrentes das respostas.
+    """
+    total = len(analises)
+    distribuicao = Counter(a['sentimento'] for a in analises)
+    percentuais = {s: round(100 * distribuicao[s] / total) if total else 0 for s in ('Positivo', 'Neutro', 'Negativo')}
+    linhas = [f'# Resumo: {descricao}', '',
+              f"{total} respostas analisadas: {percentuais['Positivo']}% positivas, "
+              f"{percentuais['Neutro']}% neutras e {percentuais['Negativo']}% negativas.", '']
+    if frequencias:
+        linhas += ['## Principais termos', '',
+                   ', '.join(f'**{termo}** ({qtd})' for termo, qtd in frequencias.most_common(TERMOS_RESUMO)), '']
+    if not trechos:
+        return '\n'.join(linhas).rstrip() + '\n'
+
+    respostas_por_trecho = Counter(chave for texto in textos for chave in {sem_acentos(t) for t in _trechos(texto)})
+    pontuados = []
+    vistos = set()
+    for texto in textos:
+        for trecho in _trechos(texto):
+            chave = sem_acentos(trecho)
+            termos = [t for t in re.findall(r'[^\W\d_]+', trecho.casefold())
+                      if len(t) >= TAMANHO_MINIMO_TERMO and sem_acentos(t) not in STOPWORDS]
+            if chave in vistos or not termos or respostas_por_trecho[chave] < K_MINIMO_TRECHO:
+                continue
+            vistos.add(chave)
+            pontuados.append((sum(frequencias[t] for t in termos) / len(termos), trecho))
+    if pontuados:
+        linhas += ['## Trechos representativos', '']
+        for _, trecho in sorted(pontuados, key=lambda p: -p[0])[:TRECHOS_RESUMO]:
+            linhas += [f'> {trecho}', '']
+    return '\n'.join(linhas).rstrip() + '\n'
+
+
+def desenhar_nuvem(frequencias, destino):
+    """Grava a nuvem de palavras em PNG (escrita atômica); False se 'wordcloud' não estiver instalado."""
+    if WordCloud is None or not frequencias:
+        return False
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    nuvem = WordCloud(width=1200, height=600, background_color='white', max_words=TERMOS_NUVEM,
+                      collocations=False).generate_from_frequencies(dict(frequencias.most_common(TERMOS_NUVEM)))
+    temporario = destino + '.tmp.png'
+    nuvem.to_file(temporario)
+    os.replace(temporario, destino)
+    return True
+
+
+def processar_campo(campo, textos, analises, destino_nuvem, hash_nuvem_anterior, redes=None, destino_indice=None,
+                    trechos=False):
+    """Sentimentos, resumo, nuvem e (com `redes`, a rede de cada resposta) contagens de termos de um campo de uma rede.
+
+    Roda nos processos do pool.
+    """
+    frequencias = Counter(termo for analise in analises for termo in analise['termos'])
+    hash_nuvem = hash_texto(repr(sorted(frequencias.most_common(TERMOS_NUVEM))))
+    # A nuvem só é redesenhada se os termos mudaram ou o arquivo sumiu
+    if hash_nuvem != hash_nuvem_anterior or not os.path.exists(destino_nuvem):
+        if not desenhar_nuvem(frequencias, destino_nuvem):
+            hash_nuvem = None
+    lista = [a['sentimento'] for a in analises]
+    resultado = {
+        'descricao': CAMPOS_TEXTO[campo],
+        'total_textos': len(textos),
+        'nuvem_palavras': os.path.join(PASTA_NUVENS, campo + '.png').replace(os.sep, '/')
+                          if os.path.exists(destino_nuvem) else None,
+        'sentimentos': {'lista': lista, 'distribuicao': dict(Counter(lista))},
+        'resumo': resumir(CAMPOS_TEXTO[campo], textos, analises, frequencias, trechos),
+    }
+    if redes is not None:
+        os.makedirs(os.path.dirname(destino_indice), exist_ok=True)
+        indice = montar_indice(analises, redes, sem_acentos)
+        _gravar_atomico(destino_indice, lambda f: json.dump(indice, f, ensure_ascii=False, separators=(',', ':')))
+        resultado['indice_termos'] = os.path.join(PASTA_INDICES, campo + '.json').replace(os.sep, '/')
+    return resultado, hash_nuvem
+
+# ============================================================================
+# CACHE E ORQUESTRAÇÃO
+# ============================================================================
+
+def assinatura_analise(lexico):
+    """Hash do código e das tabelas da análise; se mudar, o cache deixa de valer."""
+    partes = [inspect.getsource(f) for f in (sem_acentos, analisar_texto, _trechos, resumir, processar_campo,
+                                              montar_indice)]
+    partes += [repr(c) for c in (sorted(lexico.items()), sorted(NEGACOES), sorted(STOPWORDS), CAMPOS_TEXTO,
+                                 JANELA_NEGACAO, TAMANHO_MINIMO_TERMO, TERMOS_NUVEM, TERMOS_RESUMO,
+                                 TRECHOS_RESUMO, K_MINIMO_TRECHO, TAMANHO_TRECHO)]
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
+
+
+def carregar_cache(caminho, assinatura):
+    """Cache {'textos': {hash: análise}, 'campos': {(rede, campo): (hash dos textos, resultado, hash da nuvem)}}."""
+    if os.path.exists(caminho):
+        with open(caminho, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('assinatura') == assinatura:
+            return cache
+        print("   Léxico ou regras de análise mudaram: cache descartado.")
+    return {'assinatura': assinatura, 'textos': {}, 'campos': {}}
+
+
+def _gravar_atomico(caminho, gravar, modo='w'):
+    temporario = caminho + '.tmp'
+    with open(temporario, modo, **({} if 'b' in modo else {'encoding': 'utf-8'})) as f:
+        gravar(f)
+    os.replace(temporario, caminho)
+
+
+def ler_textos(caminho=ARQUIVO_JSON):
+    """Lê o export em streaming.
+
+    Retorna ({hash: texto}, {(rede, campo): [hashes]}, {rede: total de registros},
+    {campo: [rede de cada resposta de 'Todas']}).
+    """
+    textos = {}
+    grupos = {}
+    totais = Counter()
+    redes_respostas = {}
+    for registro in iterar_registros(caminho):
+        rede = registro.get(COLUNA_REDE) or REDE_NAO_INFORMADA
+        # Registros sem rede (ou com nome de rede que não pode ser pasta) entram apenas em 'Todas'
+        redes = [REDE_TODAS] + ([rede] if rede != REDE_NAO_INFORMADA and nome_rede_seguro(rede) else [])
+        totais.update(redes)
+        for campo in CAMPOS_TEXTO:
+            texto = (registro.get(campo) or '').strip()
+            if not texto:
+                continue
+            h = hash_texto(texto)
+            textos.setdefault(h, texto)
+            for r in redes:
+                grupos.setdefault((r, campo), []).append(h)
+            redes_respostas.setdefault(campo, []).append(rede)
+    return textos, grupos, totais, redes_respostas
+
+
+def gerar_analises(caminho=ARQUIVO_JSON, pasta=PASTA_BUNDLES, caminho_cache=ARQUIVO_CACHE,
+                   lexico=None, processos=None, trechos=False):
+    """Analisa os textos do export e retorna {rede: resultados_analises}, gravando as nuvens em 'pasta/<rede>/'.
+
+    Com `trechos`, os resumos citam frases repetidas por várias respostas (ver `resumir`).
+    """
+    lexico = lexico or carregar_lexico()
+    cache = carregar_cache(caminho_cache, assinatura_analise(lexico))
+    textos, grupos, totais, redes_respostas = ler_textos(caminho)
+
+    novos = [(h, texto) for h, texto in textos.items() if h not in cache['textos']]
+    print(f"   {len(textos)} textos distintos, {len(novos)} novos para analisar")
+    resultados = {rede: {} for rede in totais}
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=(lexico,)) as pool:
+        lotes = [novos[i:i + TEXTOS_POR_LOTE] for i in range(0, len(novos), TEXTOS_POR_LOTE)]
+        for lote in pool.map(analisar_lote, lotes):
+            cache['textos'].update(lote)
+
+        tarefas = {}
+        for (rede, campo), hashes in grupos.items():
+            # Em 'Todas', as contagens de termos também dependem da rede de cada resposta
+            redes = redes_respostas[campo] if rede == REDE_TODAS else None
+            hash_grupo = hash_texto(' '.join(hashes) + (repr(redes) if redes else '') + ('+trechos' if trechos else ''))
+            anterior = cache['campos'].get((rede, campo))
+            destino = os.path.join(pasta, rede, PASTA_NUVENS, campo + '.png')
+            destino_indice = os.path.join(pasta, rede, PASTA_INDICES, campo + '.json')
+            nuvem_ok = WordCloud is None or os.path.exists(destino)
+            indice_ok = redes is None or os.path.exists(destino_indice)
+            if anterior and anterior[0] == hash_grupo and nuvem_ok and indice_ok:
+                resultados[rede][campo] = anterior[1]
+                continue
+            tarefas[(rede, campo)] = (hash_grupo, pool.submit(
+                processar_campo, campo, [textos[h] for h in hashes], [cache['textos'][h] for h in hashes],
+                destino, anterior[2] if anterior else None, redes, destino_indice, trechos))
+        print(f"   {len(tarefas)} de {len(grupos)} pares (rede, campo) recalculados")
+        for (rede, campo), (hash_grupo, futuro) in tarefas.items():
+            resultado, hash_nuvem = futuro.result()
+            resultados[rede][campo] = resultado
+            cache['campos'][(rede, campo)] = (hash_grupo, resultado, hash_nuvem)
+
+    # Textos que não aparecem mais no export saem do cache
+    cache['textos'] = {h: a for h, a in cache['textos'].items() if h in textos}
+    cache['campos'] = {chave: valor for chave, valor in cache['campos'].items() if chave in grupos}
+    _gravar_atomico(caminho_cache, lambda f: pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL), 'wb')
+
+    data_processamento = datetime.now().isoformat()
+    return {rede: {
+        'data_processamento': data_processamento,
+        'rede_formadora': rede,
+        'total_registros': totais[rede],
+        'usando_claude_api': False,
+        'backend': BACKEND,
+        'campos': {campo: campos[campo] for campo in CAMPOS_TEXTO if campo in campos},
+    } for rede, campos in resultados.items()}
+
+
+def salvar_analises(analises, pasta=PASTA_BUNDLES, arquivo_raiz=ARQUIVO_ANALISES):
+    """Grava 'pasta/<rede>/resultados_analises.json' e, para 'Todas', também o arquivo da raiz."""
+    for rede, dados in analises.items():
+        os.makedirs(os.path.join(pasta, rede), exist_ok=True)
+        _gravar_atomico(os.path.join(pasta, rede, ARQUIVO_ANALISES),
+                        lambda f, dados=dados: json.dump(dados, f, ensure_ascii=False, indent=2))
+    if REDE_TODAS in analises:
+        # Na raiz, nuvens e índices apontam para a pasta de 'Todas' (caminhos relativos ao app)
+        raiz = json.loads(json.dumps(analises[REDE_TODAS]))
+        raiz.pop('rede_formadora')
+        for campo in raiz['campos'].values():
+            for chave in ('nuvem_palavras', 'indice_termos'):
+                if campo.get(chave):
+                    campo[chave] = '/'.join([pasta, REDE_TODAS, campo[chave]])
+        _gravar_atomico(arquivo_raiz, lambda f: json.dump(raiz, f, ensure_ascii=False, indent=2))
+
+# ============================================================================
+# SCRIPT PRINCIPAL
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera as análises qualitativas (sentimentos, resumos e nuvens) localmente.")
+    parser.add_argument('--entrada', default=ARQUIVO_JSON, help="Export bruto com a chave 'RECORDS'.")
+    parser.add_argument('--pasta', default=PASTA_BUNDLES,
+                        help=f"Pasta onde são gravados '<rede>/{ARQUIVO_ANALISES}' e as nuvens (padrão: {PASTA_BUNDLES}).")
+    parser.add_argument('--saida', default=ARQUIVO_ANALISES, help="Arquivo de análises de todas as redes, lido pelo dashboard.")
+    parser.add_argument('--cache', default=ARQUIVO_CACHE, help=f"Cache dos resultados por texto (padrão: {ARQUIVO_CACHE}).")
+    parser.add_argument('--lexico', default=None,
+                        help="Arquivo de léxico (termo e polaridade por linha) somado ao léxico embutido.")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="Processos do pool (padrão: número de CPUs).")
+    parser.add_argument('--trechos', action='store_true',
+                        help=f"Cita nos resumos frases que aparecem em pelo menos {K_MINIMO_TRECHO} respostas "
+                             "(por padrão nenhum texto de resposta é citado).")
+    args = parser.parse_args(argv)
+
+    print("🔄 Analisando textos livres localmente (sem API externa)...")
+    if WordCloud is None:
+        print("⚠️  Pacote 'wordcloud' não instalado: as nuvens de palavras não serão geradas.")
+    analises = gerar_analises(args.entrada, args.pasta, args.cache, carregar_lexico(args.lexico), args.processos,
+                              args.trechos)
+    salvar_analises(analises, args.pasta, args.saida)
+    print(f"✅ Análises de {', '.join(analises)} gravadas em '{args.pasta}/<rede>/{ARQUIVO_ANALISES}' e '{args.saida}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,28 @@
 # gerar_dados_publicos.py
+import argparse
+import hashlib
+import inspect
 import json
-import pandas as pd
+import os
+import pickle
 import re
-from datetime import datetime
+import sys
+import numpy as np
+import pandas as pd
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+
+from cubo_contagens import ARQUIVO_CUBO, salvar_cubo
+from histogramas import resumir_contagens
+from snapshot_dados import ARQUIVO_SNAPSHOT, escrever_snapshot
+from geojson_local import indice_codigos_municipios, normalizar_nome
+
+try:
+    import resource
+except ImportError:  # Windows não possui o módulo 'resource'
+    resource = None
 
 # ============================================================================
 # COPIE AS FUNÇÕES DE CARREGAMENTO E PROCESSAMENTO DO SEU SCRIPT ORIGINAL
@@ -10,6 +30,14 @@ from datetime import datetime
 # ============================================================================
 
 ARQUIVO_JSON = 'dados_anonimizados.json'
+ARQUIVO_SAIDA = 'dados_publicos.json'
+ARQUIVO_ESTADO = 'estado_incremental.pkl'  # contém dados por registro: NÃO versionar
+ARQUIVO_CACHE_ACHATADO = 'cache_achatado.pkl'  # contém dados por registro: NÃO versionar
+PASTA_BUNDLES = 'analises'
+COLUNA_REDE = 'rede_formadora'
+REDE_TODAS = 'Todas'
+REDE_NAO_INFORMADA = ''  # entra apenas no total de 'Todas'
+TAMANHO_CHUNK_PADRAO = 5000
 SIGLAS_ESTADOS = {
     'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
     'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal', 'ES': 'Espírito Santo',
@@ -32,133 +60,756 @@ REGIOES_BRASIL = {
     'Mato Grosso': 'Centro-Oeste', 'Mato Grosso do Sul': 'Centro-Oeste'
 }
 
+# Campos extraídos de cada registro bruto (na ordem em que aparecem no DataFrame)
+CAMPOS_INFO_PESSOAIS = ['raca_ds', 'data_nascimento', 'sexo_ds', 'estado_civil_ds', 'ident_genero_ds', 'orientacao_sexual_ds', 'nome_social', 'rg_uf_ds', 'municipio']
+CAMPOS_FORMACAO = ['data_formacao', 'pais_formacao_ds', 'municipio_formacao', 'uf_crm_ds']
+CAMPOS_LISTAS = ['aa_tipo_ds', 'rm_rec_cnrm_ds', 'rm_1_esp_medica_ds', 'rm_2_esp_medica_ds', 'tit_esp_amb_ds', 'amb_1_esp_medica_ds', 'amb_2_esp_medica_ds']
+CAMPOS_VAGA = ['curso_nome', 'vaga_uf', 'vaga_municipio']
+CAMPOS_APROPRIACAO = ['apropriacao_redes', 'apropriacao_coordenacao', 'apropriacao_gestao', 'apropriacao_evidencias']
+COLUNAS_ACHATADAS = (['id'] + CAMPOS_INFO_PESSOAIS + CAMPOS_FORMACAO + CAMPOS_LISTAS + CAMPOS_VAGA
+                     + CAMPOS_APROPRIACAO + ['experiencia_digital', COLUNA_REDE])
+
+# Colunas agregadas no arquivo público
+bar_cols = ['raca_ds', 'sexo_ds', 'estado_civil_ds', 'ident_genero_ds',
+            'orientacao_sexual_ds', 'tem_nome_social', 'aa_tipo_ds',
+            'pais_formacao_ds', 'rm_rec_cnrm_ds', 'tit_esp_amb_ds',
+            'rm_1_esp_medica_ds', 'rm_2_esp_medica_ds', 'amb_1_esp_medica_ds',
+            'amb_2_esp_medica_ds', 'curso_nome_limpo', 'regiao_nascimento', 'regiao_vaga']
+hist_cols = ['idade', 'tempo_graduado']
+aprop_cols = ['apropriacao_redes', 'apropriacao_coordenacao', 'apropriacao_gestao', 'apropriacao_evidencias', 'experiencia_digital']
+momentos = {'Nascimento': 'regiao_nascimento', 'Graduação': 'regiao_graduacao', 'CRM': 'regiao_crm', 'Vaga': 'regiao_vaga'}
+map_cols = ['rg_uf_ds', 'estado_graduacao', 'uf_crm_ds', 'vaga_uf']
+COLUNAS_CONTAGEM = list(dict.fromkeys(bar_cols + aprop_cols + list(momentos.values()) + map_cols))
+# Dimensões do cubo de contagens usado para filtragem cruzada no dashboard. O cubo fica
+# em ARQUIVO_CUBO, só no servidor: o arquivo público e os bundles não o incluem.
+COLUNAS_CUBO = list(dict.fromkeys([COLUNA_REDE] + bar_cols + aprop_cols + list(momentos.values()) + hist_cols))
+
 
-def carregar_dados_completos():
-    with open(ARQUIVO_JSON, 'r', encoding='utf-8') as f:
+def achatar_registro(record):
+    """Extrai os campos de interesse de um registro bruto, decodificando os JSONs aninhados."""
+    flat_record = {'id': record['id']}
+    if record.get('info_pessoais'):
+        info = json.loads(record['info_pessoais'])
+        flat_record.update({k: info.get(k) for k in CAMPOS_INFO_PESSOAIS})
+    if record.get('formacao_academica'):
+        formacao = json.loads(record['formacao_academica'])
+        flat_record.update({k: formacao.get(k) for k in CAMPOS_FORMACAO})
+    if record.get('listas_selecao'):
+        listas = json.loads(record['listas_selecao'])
+        flat_record.update({k: listas.get(k) for k in CAMPOS_LISTAS})
+        if listas.get('vaga_principal_jdata'):
+            vaga = listas['vaga_principal_jdata']
+            flat_record['curso_nome'] = vaga.get('curso.nome')
+            flat_record['vaga_uf'] = vaga.get('ibge.no_uf')
+            flat_record['vaga_municipio'] = vaga.get('ibge.no_municipio')
+    flat_record.update({k: record.get(k) for k in CAMPOS_APROPRIACAO})
+    flat_record['experiencia_digital'] = record.get('apropriacao_economia')
+    flat_record[COLUNA_REDE] = record.get(COLUNA_REDE)
+    return flat_record
+
+
+def carregar_dados_completos(caminho=ARQUIVO_JSON):
+    with open(caminho, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    records = []
-    for record in data['RECORDS']:
-        flat_record = {'id': record['id']}
-        if record.get('info_pessoais'):
-            info = json.loads(record['info_pessoais'])
-            flat_record.update({k: info.get(k) for k in ['raca_ds', 'data_nascimento', 'sexo_ds', 'estado_civil_ds', 'ident_genero_ds', 'orientacao_sexual_ds', 'nome_social', 'rg_uf_ds', 'municipio']})
-        if record.get('formacao_academica'):
-            formacao = json.loads(record['formacao_academica'])
-            flat_record.update({k: formacao.get(k) for k in ['data_formacao', 'pais_formacao_ds', 'municipio_formacao', 'uf_crm_ds']})
-        if record.get('listas_selecao'):
-            listas = json.loads(record['listas_selecao'])
-            flat_record.update({k: listas.get(k) for k in ['aa_tipo_ds', 'rm_rec_cnrm_ds', 'rm_1_esp_medica_ds', 'rm_2_esp_medica_ds', 'tit_esp_amb_ds', 'amb_1_esp_medica_ds', 'amb_2_esp_medica_ds']})
-            if listas.get('vaga_principal_jdata'):
-                vaga = listas['vaga_principal_jdata']
-                flat_record['curso_nome'] = vaga.get('curso.nome')
-                flat_record['vaga_uf'] = vaga.get('ibge.no_uf')
-                flat_record['vaga_municipio'] = vaga.get('ibge.no_municipio')
-        flat_record.update({k: record.get(k) for k in ['apropriacao_redes', 'apropriacao_coordenacao', 'apropriacao_gestao', 'apropriacao_evidencias']})
-        flat_record['experiencia_digital'] = record.get('apropriacao_economia')
-        records.append(flat_record)
-    return pd.DataFrame(records)
-
-def calcular_idade(data_nascimento):
-    if pd.isna(data_nascimento): return None
-    try:
-        nascimento = datetime.strptime(data_nascimento, '%Y-%m-%d')
-        hoje = datetime.now()
-        return hoje.year - nascimento.year - ((hoje.month, hoje.day) < (nascimento.month, nascimento.day))
-    except: return None
-
-def calcular_tempo_graduado(data_formacao):
-    if pd.isna(data_formacao): return None
-    try:
-        formacao = datetime.strptime(data_formacao, '%Y-%m-%d')
-        hoje = datetime.now()
-        return hoje.year - formacao.year - ((hoje.month, hoje.day) < (formacao.month, formacao.day))
-    except: return None
-
-def extrair_estado_municipio(municipio_formacao):
-    if pd.isna(municipio_formacao): return None
-    try:
-        sigla = municipio_formacao.split(' - ')[1].strip()
-        return SIGLAS_ESTADOS.get(sigla)
-    except: return None
-
-def limpar_nome_curso(nome):
-    if pd.isna(nome): return nome
-    return re.sub(r'^\d+\.\s*Aprimoramento em\s+', '', str(nome))
+    records = [achatar_registro(record) for record in data['RECORDS']]
+    return pd.DataFrame(records, columns=COLUNAS_ACHATADAS)
+
+
+def iterar_registros(caminho=ARQUIVO_JSON, tamanho_bloco=1 << 20):
+    """Percorre a lista 'RECORDS' do export sem carregar o arquivo inteiro.
+
+    O texto é lido em blocos de `tamanho_bloco` caracteres e cada registro é
+    decodificado com `raw_decode` assim que estiver completo no buffer, de modo
+    que a memória usada depende do tamanho do bloco, não do arquivo.
+    """
+    decoder = json.JSONDecoder()
+    with open(caminho, 'r', encoding='utf-8') as f:
+        buffer = ''
+        while True:
+            pos = buffer.find('"RECORDS"')
+            inicio = buffer.find('[', pos) if pos != -1 else -1
+            if inicio != -1:
+                buffer = buffer[inicio + 1:]
+                break
+            bloco = f.read(tamanho_bloco)
+            if not bloco:
+                raise ValueError(f"Chave 'RECORDS' não encontrada em '{caminho}'")
+            # Mantém só o final do buffer enquanto a chave não aparece
+            buffer = (buffer[-32:] if pos == -1 else buffer) + bloco
+
+        idx = 0
+        while True:
+            while idx < len(buffer) and buffer[idx] in ' \t\r\n,':
+                idx += 1
+            if idx < len(buffer) and buffer[idx] == ']':
+                return
+            try:
+                registro, fim = decoder.raw_decode(buffer, idx)
+            except json.JSONDecodeError:
+                bloco = f.read(tamanho_bloco)
+                if not bloco:
+                    raise
+                buffer = buffer[idx:] + bloco
+                idx = 0
+                continue
+            yield registro
+            idx = fim
+
+
+def _blocos(registros, tamanho_bloco):
+    """Agrupa os registros em listas de no máximo `tamanho_bloco` itens."""
+    bloco = []
+    for registro in registros:
+        bloco.append(registro)
+        if len(bloco) >= tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def carregar_dados_em_chunks(caminho=ARQUIVO_JSON, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+    """Gera DataFrames achatados com no máximo `tamanho_chunk` registros cada."""
+    for bloco in _blocos(iterar_registros(caminho), tamanho_chunk):
+        yield pd.DataFrame([achatar_registro(record) for record in bloco], columns=COLUNAS_ACHATADAS)
 
 # ============================================================================
-# SCRIPT PRINCIPAL DE GERAÇÃO DE DADOS
+# CACHE DO ACHATAMENTO
+# O export achatado é gravado com as colunas de texto codificadas por dicionário
+# (categorias do pandas: tabela de valores distintos + códigos inteiros) e
+# identificado pelo hash do export e do código de achatamento. Enquanto o export
+# não mudar, as execuções seguintes leem esse arquivo em vez de decodificar o
+# JSON bruto e os JSONs aninhados de cada registro.
 # ============================================================================
 
-print("🔄 Carregando e processando dados sensíveis localmente...")
-df = carregar_dados_completos()
-
-# Aplicar transformações
-df['idade'] = df['data_nascimento'].apply(calcular_idade)
-df['tempo_graduado'] = df['data_formacao'].apply(calcular_tempo_graduado)
-df['tem_nome_social'] = df['nome_social'].apply(lambda x: 'Sim' if pd.notna(x) and str(x).strip() else 'Não')
-df['estado_graduacao'] = df['municipio_formacao'].apply(extrair_estado_municipio)
-df['sexo_ds'] = df['sexo_ds'].replace({'Macho': 'Masculino'})
-df['rm_rec_cnrm_ds'] = df['rm_rec_cnrm_ds'].str.replace('Tenho', 'Possuo', regex=False)
-df['curso_nome_limpo'] = df['curso_nome'].apply(limpar_nome_curso)
-df['regiao_nascimento'] = df['rg_uf_ds'].map(REGIOES_BRASIL)
-df['regiao_graduacao'] = df['estado_graduacao'].map(REGIOES_BRASIL)
-df['regiao_crm'] = df['uf_crm_ds'].map(REGIOES_BRASIL)
-df['regiao_vaga'] = df['vaga_uf'].map(REGIOES_BRASIL)
-
-print("📊 Gerando agregações públicas...")
-dados_publicos = {
-    'dashboard': {},
-    'mapas': {}
-}
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Hash do conteúdo do arquivo, lido em blocos."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
 
-# --- DADOS PARA O DASHBOARD ---
-# Contagens para gráficos de barras
-bar_cols = ['raca_ds', 'sexo_ds', 'estado_civil_ds', 'ident_genero_ds',
-            'orientacao_sexual_ds', 'tem_nome_social', 'aa_tipo_ds',
-            'pais_formacao_ds', 'rm_rec_cnrm_ds', 'tit_esp_amb_ds',
-            'rm_1_esp_medica_ds', 'rm_2_esp_medica_ds', 'amb_1_esp_medica_ds',
-            'amb_2_esp_medica_ds', 'curso_nome_limpo', 'regiao_nascimento', 'regiao_vaga']
-for col in bar_cols:
-    dados_publicos['dashboard'][col] = df[col].value_counts().to_dict()
 
-# Dados para histogramas (apenas a série de dados)
-hist_cols = ['idade', 'tempo_graduado']
-for col in hist_cols:
-    # ===== CORREÇÃO APLICADA AQUI =====
-    # Usamos .tolist() para converter os tipos de dados do NumPy para tipos nativos do Python
-    dados_publicos['dashboard'][col] = df[col].dropna().tolist()
+def assinatura_achatamento():
+    partes = [inspect.getsource(achatar_registro), repr(COLUNAS_ACHATADAS)]
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
 
-# Dados de apropriação
-aprop_cols = ['apropriacao_redes', 'apropriacao_coordenacao', 'apropriacao_gestao', 'apropriacao_evidencias', 'experiencia_digital']
-for col in aprop_cols:
-    dados_publicos['dashboard'][col] = df[col].value_counts().to_dict()
 
-# Dados de fluxo entre regiões
-momentos = {'Nascimento': 'regiao_nascimento', 'Graduação': 'regiao_graduacao', 'CRM': 'regiao_crm', 'Vaga': 'regiao_vaga'}
-dados_regioes = []
-for momento, coluna in momentos.items():
-    if coluna in df.columns:
-        contagem = df[coluna].value_counts()
-        for regiao, qtd in contagem.items():
+def carregar_achatado(caminho=ARQUIVO_JSON, caminho_cache=ARQUIVO_CACHE_ACHATADO):
+    """Export achatado com colunas categóricas, lido do cache quando ele corresponde ao export.
+
+    Sem cache válido, achata o export e grava o cache. Útil também para análises
+    ad hoc: as colunas de texto ocupam um código inteiro por registro.
+    """
+    chave = (hash_arquivo(caminho), assinatura_achatamento())
+    if os.path.exists(caminho_cache):
+        with open(caminho_cache, 'rb') as f:
+            # A chave vem num pickle separado: um cache desatualizado não é lido inteiro
+            if pickle.load(f) == chave:
+                return pickle.load(f)
+        print("   Cache do achatamento desatualizado: relendo o export")
+    df = carregar_dados_completos(caminho)
+    df = df.astype({c: 'category' for c, tipo in df.dtypes.items() if tipo == object})
+    temporario = caminho_cache + '.tmp'
+    with open(temporario, 'wb') as f:
+        pickle.dump(chave, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, caminho_cache)
+    return df
+
+# ============================================================================
+# TRANSFORMAÇÕES VETORIZADAS
+# Operam sobre colunas inteiras; reproduzem exatamente o resultado das antigas
+# funções linha a linha (strptime '%Y-%m-%d', split(' - '), re.sub).
+# ============================================================================
+
+# Mesmos padrões que datetime.strptime usa para %Y, %m e %d
+PADRAO_DATA = r'^(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])$'
+PADRAO_CURSO = r'^\d+\.\s*Aprimoramento em\s+'
+TABELA_SIGLAS = pd.Series(SIGLAS_ESTADOS)
+TABELA_REGIOES = pd.Series(REGIOES_BRASIL)
+DIAS_NO_MES = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _como_texto(serie):
+    """Garante dtype object para usar o acessor .str mesmo em colunas totalmente vazias."""
+    return serie if serie.dtype == object else serie.astype(object)
+
+
+def _por_valores_unicos(serie, funcao, somente_texto=False):
+    """Aplica `funcao` só aos valores distintos de `serie` e espalha o resultado pelos códigos.
+
+    As colunas do export têm poucos valores distintos (UFs, cursos, datas), então
+    calcular sobre os únicos e indexar pelos códigos do factorize é bem mais barato.
+    Com `somente_texto`, valores que não são str viram NaN sem passar por `funcao`.
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Series(unicos, dtype=object)
+    valores = np.full(len(unicos) + 1, np.nan, dtype=object)
+    if somente_texto:
+        unicos = unicos[[isinstance(v, str) for v in unicos]]
+    if len(unicos):
+        valores[unicos.index] = funcao(unicos).to_numpy(dtype=object)
+    return pd.Series(valores[codigos], index=serie.index)
+
+
+def calcular_anos_completos(datas, referencia):
+    """Anos completos entre cada data 'AAAA-MM-DD' e a data de referência.
+
+    Datas ausentes, mal formatadas ou inexistentes (ex.: 2023-02-30) resultam em NaN.
+    """
+    return _por_valores_unicos(datas, lambda unicas: _anos_completos(unicas, referencia), somente_texto=True).astype(float)
+
+
+def _anos_completos(datas, referencia):
+    partes = datas.str.extract(PADRAO_DATA)
+    ano = pd.to_numeric(partes[0]).to_numpy(dtype=float)
+    mes = pd.to_numeric(partes[1]).to_numpy(dtype=float)
+    dia = pd.to_numeric(partes[2].str.strip()).to_numpy(dtype=float)
+
+    valido = ~np.isnan(ano) & (ano >= 1)
+    mes_idx = np.where(valido, mes, 0).astype(int)
+    ano_int = np.where(valido, ano, 1).astype(int)
+    bissexto = (ano_int % 4 == 0) & ((ano_int % 100 != 0) | (ano_int % 400 == 0))
+    limite = DIAS_NO_MES[mes_idx] + ((mes_idx == 2) & bissexto)
+    valido &= dia <= limite
+
+    ainda_nao_fez = (mes > referencia.month) | ((mes == referencia.month) & (dia > referencia.day))
+    anos = referencia.year - ano - ainda_nao_fez
+    return pd.Series(np.where(valido, anos, np.nan), index=datas.index)
+
+
+def extrair_estado_municipio(municipios):
+    """Converte 'Município - UF' no nome do estado (NaN se não houver sigla válida)."""
+    def _extrair(unicos):
+        siglas = _como_texto(unicos.str.split(' - ', n=2).str[1].dropna()).str.strip()
+        return siglas.map(TABELA_SIGLAS).reindex(unicos.index)
+    return _por_valores_unicos(municipios, _extrair, somente_texto=True)
+
+
+def limpar_nome_curso(nomes):
+    return _por_valores_unicos(nomes, lambda unicos: unicos.astype(str).str.replace(PADRAO_CURSO, '', regex=True))
+
+
+def aplicar_transformacoes(df, data_referencia=None):
+    """Deriva as colunas calculadas usadas nas agregações.
+
+    `data_referencia` fixa o "hoje" das idades; use o mesmo valor em toda a execução
+    (ex.: entre chunks) para que os resultados sejam consistentes.
+    """
+    referencia = data_referencia or date.today()
+    df['idade'] = calcular_anos_completos(df['data_nascimento'], referencia)
+    df['tempo_graduado'] = calcular_anos_completos(df['data_formacao'], referencia)
+    df['tem_nome_social'] = _por_valores_unicos(
+        df['nome_social'], lambda unicos: pd.Series(np.where(unicos.astype(str).str.strip() != '', 'Sim', 'Não'))
+    ).fillna('Não')
+    df['estado_graduacao'] = extrair_estado_municipio(df['municipio_formacao'])
+    df['sexo_ds'] = df['sexo_ds'].replace({'Macho': 'Masculino'})
+    df['rm_rec_cnrm_ds'] = _como_texto(df['rm_rec_cnrm_ds']).str.replace('Tenho', 'Possuo', regex=False)
+    df['curso_nome_limpo'] = limpar_nome_curso(df['curso_nome'])
+    df['regiao_nascimento'] = df['rg_uf_ds'].map(TABELA_REGIOES)
+    df['regiao_graduacao'] = df['estado_graduacao'].map(TABELA_REGIOES)
+    df['regiao_crm'] = df['uf_crm_ds'].map(TABELA_REGIOES)
+    df['regiao_vaga'] = df['vaga_uf'].map(TABELA_REGIOES)
+    return df
+
+# ============================================================================
+# AGREGAÇÕES PARCIAIS
+# Cada lote de registros gera contadores que podem ser somados entre si, o que
+# permite processar o export em partes sem manter todos os registros em memória.
+# Todas as chaves começam pela rede formadora, de modo que um único agrupamento
+# produz os agregados de cada rede; "Todas" é a soma das redes.
+# ============================================================================
+
+def redes_formadoras(df):
+    """Rede formadora de cada registro, com REDE_NAO_INFORMADA no lugar dos vazios."""
+    return _como_texto(df[COLUNA_REDE]).fillna(REDE_NAO_INFORMADA)
+
+
+def series_por_rede(df):
+    """Contagem de cada valor dos histogramas por rede: {coluna: Counter({(rede, valor): qtd})}."""
+    redes = redes_formadoras(df)
+    return {col: Counter(df[col].groupby([redes, df[col]], sort=False).size().to_dict()) for col in hist_cols}
+
+
+def celulas_cubo(df):
+    """Contagem de cada combinação de valores de COLUNAS_CUBO: {(valor, ...): qtd}, com None para ausentes."""
+    if df.empty:
+        return Counter()
+    codigos, categorias = [], []
+    for col in COLUNAS_CUBO:
+        c, unicos = pd.factorize(df[col])
+        codigos.append(c)
+        categorias.append(list(unicos) + [None])  # código -1 aponta para o último item
+    combinacoes, qtds = np.unique(np.column_stack(codigos), axis=0, return_counts=True)
+    return Counter({
+        tuple(categorias[d][c] for d, c in enumerate(combinacao)): int(qtd)
+        for combinacao, qtd in zip(combinacoes, qtds)
+    })
+
+
+def contagens_por_rede(df):
+    """Contagens de cada coluna por rede: {coluna: Counter({(rede, valor): qtd})}."""
+    contagens = {col: Counter(df.groupby([COLUNA_REDE, col], sort=False).size().to_dict()) for col in COLUNAS_CONTAGEM}
+    contagens[COLUNA_REDE] = Counter({(rede, rede): qtd for rede, qtd in df[COLUNA_REDE].value_counts(sort=False).items()})
+    return contagens
+
+
+def vagas_por_rede(df):
+    """Cursos de cada município de vaga: {(rede, uf, município): [cursos]}."""
+    vagas = {}
+    vagas_municipios = df.dropna(subset=['vaga_uf', 'vaga_municipio', 'curso_nome_limpo'])
+    for chave, cursos in vagas_municipios.groupby([COLUNA_REDE, 'vaga_uf', 'vaga_municipio'], sort=False)['curso_nome_limpo']:
+        vagas.setdefault(chave, []).extend(cursos.tolist())
+    return vagas
+
+
+def agregar_parcial(df):
+    """Calcula os agregados mescláveis (contagens, séries e vagas) de um DataFrame transformado."""
+    df = df.assign(**{COLUNA_REDE: redes_formadoras(df)})
+    return {
+        'contagens': contagens_por_rede(df),
+        'series': series_por_rede(df),
+        'vagas': vagas_por_rede(df),
+        'cubo': celulas_cubo(df),
+    }
+
+
+def mesclar_parciais(destino, parcial):
+    """Soma `parcial` em `destino` (in-place) e retorna `destino`."""
+    for col, contagem in parcial['contagens'].items():
+        destino['contagens'].setdefault(col, Counter()).update(contagem)
+    for col, contagem in parcial['series'].items():
+        destino['series'].setdefault(col, Counter()).update(contagem)
+    for chave, cursos in parcial['vagas'].items():
+        destino['vagas'].setdefault(chave, []).extend(cursos)
+    destino.setdefault('cubo', Counter()).update(parcial.get('cubo', {}))
+    return destino
+
+
+def subtrair_parciais(destino, parcial):
+    """Remove de `destino` (in-place) as contagens e vagas de `parcial`.
+
+    As séries dos histogramas não são subtraídas: no modo incremental elas são
+    reconstruídas a partir do estado por registro.
+    """
+    for col, contagem in parcial['contagens'].items():
+        atual = destino['contagens'].setdefault(col, Counter())
+        atual.subtract(contagem)
+        for valor in [v for v, qtd in atual.items() if qtd <= 0]:
+            del atual[valor]
+    for chave, cursos in parcial['vagas'].items():
+        lista = destino['vagas'].get(chave, [])
+        for curso in cursos:
+            lista.remove(curso)
+        if not lista:
+            destino['vagas'].pop(chave, None)
+    cubo = destino.setdefault('cubo', Counter())
+    cubo.subtract(parcial.get('cubo', {}))
+    for chave in [c for c, qtd in cubo.items() if qtd <= 0]:
+        del cubo[chave]
+    return destino
+
+
+def _ordenar_contagem(contagem):
+    """Converte um Counter no formato de `value_counts().to_dict()` (ordem decrescente)."""
+    return {valor: qtd for valor, qtd in contagem.most_common() if qtd > 0}
+
+
+def _filtrar_rede(contagem, rede):
+    """Contagem de uma rede (ou de todas, se `rede` for None) a partir das chaves (rede, valor)."""
+    resultado = Counter()
+    for (rede_chave, valor), qtd in contagem.items():
+        if rede is None or rede_chave == rede:
+            resultado[valor] += qtd
+    return resultado
+
+
+def redes_presentes(parcial):
+    """Redes formadoras encontradas nos dados, em ordem alfabética."""
+    contagem = parcial['contagens'].get(COLUNA_REDE, Counter())
+    return sorted({rede for rede, _ in contagem if rede != REDE_NAO_INFORMADA})
+
+
+def montar_dados_publicos(parcial, rede=None):
+    """Gera o dicionário público de uma rede (ou de todas, com `rede=None`) a partir dos agregados mesclados."""
+    contagens = defaultdict(Counter, {col: _filtrar_rede(c, rede) for col, c in parcial['contagens'].items()})
+    dados_publicos = {
+        'total_registros': sum(contagens[COLUNA_REDE].values()),
+        'dashboard': {},
+        'mapas': {}
+    }
+
+    # --- DADOS PARA O DASHBOARD ---
+    # Contagens para gráficos de barras
+    for col in bar_cols:
+        dados_publicos['dashboard'][col] = _ordenar_contagem(contagens[col])
+
+    # Histogramas: contagens por classe e resumo (média, quantis), de tamanho fixo
+    for col in hist_cols:
+        dados_publicos['dashboard'][col] = resumir_contagens(_filtrar_rede(parcial['series'].get(col, Counter()), rede))
+
+    # Dados de apropriação
+    for col in aprop_cols:
+        dados_publicos['dashboard'][col] = _ordenar_contagem(contagens[col])
+
+    # Dados de fluxo entre regiões
+    dados_regioes = []
+    for momento, coluna in momentos.items():
+        for regiao, qtd in _ordenar_contagem(contagens[coluna]).items():
             dados_regioes.append({'Momento': momento, 'Região': regiao, 'Quantidade': qtd})
-dados_publicos['dashboard']['fluxo_regional'] = dados_regioes
+    dados_publicos['dashboard']['fluxo_regional'] = dados_regioes
 
+    # --- DADOS PARA OS MAPAS ---
+    for col in map_cols:
+        dados_publicos['mapas'][col] = _ordenar_contagem(contagens[col])
 
-# --- DADOS PARA OS MAPAS ---
-map_cols = ['rg_uf_ds', 'estado_graduacao', 'uf_crm_ds', 'vaga_uf']
-for col in map_cols:
-    dados_publicos['mapas'][col] = df[col].value_counts().to_dict()
+    # Agregação de vagas por município (mesma ordem do groupby original)
+    vagas = {}
+    for (rede_chave, uf, municipio), cursos in parcial['vagas'].items():
+        if rede is None or rede_chave == rede:
+            vagas.setdefault((uf, municipio), []).extend(cursos)
+    dados_publicos['mapas']['vagas_por_municipio'] = [
+        {'vaga_uf': uf, 'vaga_municipio': municipio, 'codigo_ibge': codigo_municipio_ibge(uf, municipio),
+         'curso_nome_limpo': vagas[(uf, municipio)]}
+        for uf, municipio in sorted(vagas)
+    ]
+    return dados_publicos
+
+
+# UF (nome ou sigla, normalizados) -> sigla
+SIGLA_POR_UF = {normalizar_nome(nome): sigla for sigla, nome in SIGLAS_ESTADOS.items()}
+SIGLA_POR_UF.update({normalizar_nome(sigla): sigla for sigla in SIGLAS_ESTADOS})
+
+
+@lru_cache(maxsize=1)
+def _indice_ibge():
+    indice = indice_codigos_municipios()
+    if not indice:
+        print("⚠️  GeoJSON de municípios não encontrados: 'codigo_ibge' ficará vazio (execute 'python geojson_local.py').")
+    return indice
+
+
+def codigo_municipio_ibge(uf, municipio):
+    """Código IBGE do município da vaga, casando o nome sem acentos/caixa com os GeoJSON locais."""
+    sigla = SIGLA_POR_UF.get(normalizar_nome(uf))
+    return _indice_ibge().get(sigla, {}).get(normalizar_nome(municipio))
+
+
+def montar_bundles(parcial):
+    """Agregados de cada rede formadora, incluindo 'Todas': {rede: dados_publicos}."""
+    bundles = {REDE_TODAS: montar_dados_publicos(parcial)}
+    for rede in redes_presentes(parcial):
+        bundles[rede] = montar_dados_publicos(parcial, rede)
+    return bundles
+
+
+def montar_arquivo_publico(bundles):
+    """Estrutura de 'dados_publicos.json': 'Todas' no topo e as demais redes em 'redes'."""
+    arquivo = dict(bundles[REDE_TODAS])
+    arquivo['redes'] = {rede: bundle for rede, bundle in bundles.items() if rede != REDE_TODAS}
+    return arquivo
+
+
+# Nomes de rede que podem virar pasta (e URL) em 'analises/<rede>/': letras, dígitos, '_', espaço e '-',
+# sem '/', '.' ou '..'; as páginas estáticas (dashboard.html e mapas.html) aplicam a mesma regra
+PADRAO_NOME_REDE = re.compile(r'\w[\w -]*')
+
+
+def nome_rede_seguro(rede):
+    return isinstance(rede, str) and PADRAO_NOME_REDE.fullmatch(rede) is not None
+
+
+def salvar_bundles(bundles, pasta=PASTA_BUNDLES):
+    """Grava um JSON compacto por rede em '<pasta>/<rede>/dados_publicos.json' (servido como estático).
+
+    Redes com nomes que não podem ser pasta ficam só em 'redes' de 'dados_publicos.json'.
+    """
+    for rede, bundle in bundles.items():
+        if not nome_rede_seguro(rede):
+            print(f"⚠️  Rede {rede!r}: nome inválido para pasta; agregados só em '{ARQUIVO_SAIDA}'.")
+            continue
+        os.makedirs(os.path.join(pasta, rede), exist_ok=True)
+        with open(os.path.join(pasta, rede, ARQUIVO_SAIDA), 'w', encoding='utf-8') as f:
+            json.dump(dict(bundle, rede_formadora=rede), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def novo_parcial():
+    return {'contagens': {}, 'series': {}, 'vagas': {}, 'cubo': Counter()}
+
+
+def gerar_dados_publicos(caminho=ARQUIVO_JSON, data_referencia=None, caminho_cache=None):
+    """Modo tradicional: carrega o export inteiro em um único DataFrame e retorna os agregados.
+
+    Com `caminho_cache`, o export achatado vem do cache do achatamento (ver `carregar_achatado`).
+    """
+    if caminho_cache:
+        df = carregar_achatado(caminho, caminho_cache)
+        # As transformações esperam colunas de objetos; os textos continuam compartilhados pelas categorias
+        df = df.astype({c: object for c, tipo in df.dtypes.items() if tipo == 'category'})
+    else:
+        df = carregar_dados_completos(caminho)
+    df = aplicar_transformacoes(df, data_referencia)
+    print("📊 Gerando agregações públicas...")
+    return agregar_parcial(df)
+
+
+def gerar_dados_publicos_streaming(caminho=ARQUIVO_JSON, tamanho_chunk=TAMANHO_CHUNK_PADRAO, data_referencia=None):
+    """Modo streaming: processa o export em chunks, mantendo só os agregados em memória."""
+    referencia = data_referencia or date.today()
+    acumulado = novo_parcial()
+    total = 0
+    for df_chunk in carregar_dados_em_chunks(caminho, tamanho_chunk):
+        total += len(df_chunk)
+        mesclar_parciais(acumulado, agregar_parcial(aplicar_transformacoes(df_chunk, referencia)))
+        print(f"   ... {total} registros processados", end='\r')
+    print()
+    return acumulado
+
+# ============================================================================
+# MODO PARALELO
+# Map-reduce sobre os chunks do modo streaming: cada processo do pool achata,
+# transforma e agrega um chunk, e o processo principal mescla os agregados
+# parciais na ordem do export. Como as contagens empatadas e as listas de
+# cursos seguem a ordem de mescla, a saída é idêntica à dos outros modos.
+# ============================================================================
+
+def _agregar_bloco(registros, referencia):
+    """Agregados parciais de um bloco de registros brutos; roda nos processos do pool."""
+    df = pd.DataFrame([achatar_registro(record) for record in registros], columns=COLUNAS_ACHATADAS)
+    return agregar_parcial(aplicar_transformacoes(df, referencia))
+
+
+def gerar_dados_publicos_paralelo(caminho=ARQUIVO_JSON, tamanho_chunk=TAMANHO_CHUNK_PADRAO, data_referencia=None,
+                                  processos=None):
+    """Modo paralelo: agrega os chunks num pool de `processos` processos (padrão: número de CPUs)."""
+    referencia = data_referencia or date.today()
+    processos = processos or os.cpu_count() or 1
+    acumulado = novo_parcial()
+    pendentes = deque()
+    total = 0
+
+    def mesclar_proximo():
+        nonlocal total
+        tamanho, futuro = pendentes.popleft()
+        mesclar_parciais(acumulado, futuro.result())
+        total += tamanho
+        print(f"   ... {total} registros processados", end='\r')
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        for bloco in _blocos(iterar_registros(caminho), tamanho_chunk):
+            pendentes.append((len(bloco), pool.submit(_agregar_bloco, bloco, referencia)))
+            # Poucos chunks em andamento por processo: a memória continua limitada pelo tamanho do chunk
+            while len(pendentes) > 2 * processos:
+                mesclar_proximo()
+        while pendentes:
+            mesclar_proximo()
+    print()
+    return acumulado
+
+# ============================================================================
+# MODO INCREMENTAL
+# Guarda, por id de registro, o hash do JSON original e as colunas já
+# transformadas. A cada execução só registros novos, alterados ou removidos
+# são achatados, e suas contribuições entram como deltas nos contadores.
+# ============================================================================
+
+# Colunas mantidas por registro no estado incremental
+COLUNAS_ESTADO = list(dict.fromkeys(['hash', 'data_nascimento', 'data_formacao', COLUNA_REDE] + COLUNAS_CONTAGEM
+                                    + hist_cols + ['vaga_municipio', 'curso_nome_limpo']))
+
+
+def assinatura_transformacao():
+    """Hash do código e das tabelas que definem o achatamento e as transformações.
+
+    Se mudar, o estado salvo deixa de ser válido e é feita uma reconstrução completa.
+    """
+    funcoes = [achatar_registro, aplicar_transformacoes, _por_valores_unicos, calcular_anos_completos,
+               _anos_completos, extrair_estado_municipio, limpar_nome_curso, agregar_parcial]
+    partes = [inspect.getsource(f) for f in funcoes + [contagens_por_rede, vagas_por_rede, series_por_rede, redes_formadoras, celulas_cubo, hash_registro]]
+    partes += [repr(c) for c in (COLUNAS_ACHATADAS, COLUNAS_ESTADO, COLUNAS_CUBO, SIGLAS_ESTADOS, REGIOES_BRASIL, PADRAO_DATA, PADRAO_CURSO)]
+    return hashlib.sha256('\n'.join(partes).encode('utf-8')).hexdigest()
+
+
+def hash_registro(registro):
+    """Hash do registro em forma canônica: reserializar o export (espaços, ordem das chaves) não o altera."""
+    texto = json.dumps(registro, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def carregar_estado(caminho_estado):
+    if not os.path.exists(caminho_estado):
+        return None
+    with open(caminho_estado, 'rb') as f:
+        estado = pickle.load(f)
+    estado['registros'] = estado['registros'].astype(
+        {c: object for c, tipo in estado['registros'].dtypes.items() if tipo == 'category'})
+    return estado
+
+
+def salvar_estado(estado, caminho_estado):
+    """Grava o estado de forma atômica, com colunas categóricas para reduzir o tamanho."""
+    registros = estado['registros']
+    compacto = dict(estado, registros=registros.astype(
+        {c: 'category' for c, tipo in registros.dtypes.items() if tipo == object and c != 'hash'}))
+    temporario = caminho_estado + '.tmp'
+    with open(temporario, 'wb') as f:
+        pickle.dump(compacto, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, caminho_estado)
+
+
+def _aplicar_lote_incremental(estado, lote, referencia, novas_linhas):
+    """Substitui as contribuições dos registros do lote pelas de suas versões atuais."""
+    registros = estado['registros']
+    df = pd.DataFrame([achatar_registro(r) for r, _ in lote], columns=COLUNAS_ACHATADAS)
+    df = aplicar_transformacoes(df, referencia).set_index('id')
+    df['hash'] = [h for _, h in lote]
+    df = df[COLUNAS_ESTADO]
+
+    existentes = df.index[df.index.isin(registros.index)]
+    if len(existentes):
+        subtrair_parciais(estado['parcial'], agregar_parcial(registros.loc[existentes]))
+        registros.loc[existentes, COLUNAS_ESTADO] = df.loc[existentes, COLUNAS_ESTADO].to_numpy()
+    mesclar_parciais(estado['parcial'], agregar_parcial(df))
+    novas_linhas.append(df[~df.index.isin(registros.index)])
+    return len(existentes)
+
+
+def gerar_dados_publicos_incremental(caminho=ARQUIVO_JSON, caminho_estado=ARQUIVO_ESTADO,
+                                     tamanho_chunk=TAMANHO_CHUNK_PADRAO, data_referencia=None):
+    """Atualiza os agregados aplicando apenas as diferenças desde a última execução."""
+    referencia = data_referencia or date.today()
+    assinatura = assinatura_transformacao()
+    estado = carregar_estado(caminho_estado)
+    if estado is None or estado['assinatura'] != assinatura:
+        motivo = "não encontrado" if estado is None else "código de transformação alterado"
+        print(f"   Estado incremental {motivo}: reconstrução completa")
+        estado = {
+            'assinatura': assinatura,
+            'data_referencia': referencia,
+            'registros': pd.DataFrame(columns=COLUNAS_ESTADO, index=pd.Index([], name='id')),
+            'parcial': novo_parcial(),
+        }
+
+    hashes = estado['registros']['hash'].to_dict()
+    vistos = set()
+    lote, novas_linhas = [], []
+    alterados = 0
+    for registro in iterar_registros(caminho):
+        h = hash_registro(registro)
+        vistos.add(registro['id'])
+        if hashes.get(registro['id']) == h:
+            continue
+        lote.append((registro, h))
+        if len(lote) >= tamanho_chunk:
+            alterados += _aplicar_lote_incremental(estado, lote, referencia, novas_linhas)
+            lote = []
+    if lote:
+        alterados += _aplicar_lote_incremental(estado, lote, referencia, novas_linhas)
+
+    removidos = [rid for rid in hashes if rid not in vistos]
+    if removidos:
+        subtrair_parciais(estado['parcial'], agregar_parcial(estado['registros'].loc[removidos]))
+        estado['registros'] = estado['registros'].drop(index=removidos)
+    novos = sum(len(df) for df in novas_linhas)
+    if novos:
+        partes = [df for df in [estado['registros']] + novas_linhas if len(df)]
+        estado['registros'] = pd.concat(partes)
+    print(f"   Registros novos: {novos} | alterados: {alterados} | removidos: {len(removidos)}")
+
+    registros = estado['registros']
+    if estado['data_referencia'] != referencia:
+        # Idades dependem só da data: recalcula a partir das datas guardadas, sem reler o export
+        registros['idade'] = calcular_anos_completos(registros['data_nascimento'], referencia)
+        registros['tempo_graduado'] = calcular_anos_completos(registros['data_formacao'], referencia)
+        # As células do cubo foram somadas com as idades antigas: refeitas a partir dos registros
+        estado['parcial']['cubo'] = celulas_cubo(registros.assign(**{COLUNA_REDE: redes_formadoras(registros)}))
+        estado['data_referencia'] = referencia
+    estado['parcial']['series'] = series_por_rede(registros)
+
+    salvar_estado(estado, caminho_estado)
+    return estado['parcial']
+
+
+def pico_memoria_mb():
+    """Pico de memória residente (RSS) do processo em MB, ou None se indisponível."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em kilobytes no Linux
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+# ============================================================================
+# SCRIPT PRINCIPAL DE GERAÇÃO DE DADOS
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o arquivo público agregado a partir do export anonimizado.")
+    parser.add_argument('--entrada', default=ARQUIVO_JSON, help="Export bruto com a chave 'RECORDS'.")
+    parser.add_argument('--saida', default=ARQUIVO_SAIDA, help="Arquivo público gerado.")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Lê e agrega o export em chunks; o pico de memória passa a depender do tamanho do chunk.")
+    parser.add_argument('--chunk', type=int, default=TAMANHO_CHUNK_PADRAO,
+                        help=f"Registros por chunk no modo streaming (padrão: {TAMANHO_CHUNK_PADRAO}).")
+    parser.add_argument('--paralelo', action='store_true',
+                        help="Agrega os chunks num pool de processos e mescla os resultados (saída idêntica à do modo serial).")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="Processos do modo paralelo (padrão: número de CPUs).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Processa só registros novos, alterados ou removidos desde a última execução.")
+    parser.add_argument('--estado', default=ARQUIVO_ESTADO,
+                        help=f"Arquivo de estado do modo incremental (padrão: {ARQUIVO_ESTADO}).")
+    parser.add_argument('--pasta-bundles', default=PASTA_BUNDLES,
+                        help=f"Pasta onde é gravado um '{ARQUIVO_SAIDA}' compacto por rede formadora (padrão: {PASTA_BUNDLES}).")
+    parser.add_argument('--data-referencia', type=date.fromisoformat, default=None,
+                        help="Data (AAAA-MM-DD) usada como 'hoje' no cálculo de idade e tempo de graduado (padrão: data atual).")
+    parser.add_argument('--cache-achatado', nargs='?', const=ARQUIVO_CACHE_ACHATADO, default=None,
+                        help=f"No modo tradicional, reaproveita o export achatado em cache enquanto o export não mudar "
+                             f"(padrão: {ARQUIVO_CACHE_ACHATADO}; contém dados por registro, não versionar).")
+    parser.add_argument('--cubo', default=ARQUIVO_CUBO,
+                        help=f"Cubo de contagens da filtragem cruzada, lido só pelo servidor do dashboard "
+                             f"(padrão: {ARQUIVO_CUBO}; contém dados quase por registro, não versionar nem publicar).")
+    parser.add_argument('--snapshot', nargs='?', const=ARQUIVO_SNAPSHOT, default=None,
+                        help=f"Também grava o snapshot binário lido via mmap pelos apps (padrão: {ARQUIVO_SNAPSHOT}).")
+    args = parser.parse_args(argv)
+
+    data_referencia = args.data_referencia or date.today()
+
+    print("🔄 Carregando e processando dados sensíveis localmente...")
+    if args.incremental:
+        print(f"   Modo incremental (estado em '{args.estado}')")
+        parcial = gerar_dados_publicos_incremental(args.entrada, args.estado, args.chunk, data_referencia)
+    elif args.paralelo:
+        print(f"   Modo paralelo ativado ({args.processos or os.cpu_count()} processos, chunks de {args.chunk} registros)")
+        parcial = gerar_dados_publicos_paralelo(args.entrada, args.chunk, data_referencia, args.processos)
+    elif args.streaming:
+        print(f"   Modo streaming ativado (chunks de {args.chunk} registros)")
+        parcial = gerar_dados_publicos_streaming(args.entrada, args.chunk, data_referencia)
+    else:
+        parcial = gerar_dados_publicos(args.entrada, data_referencia, args.cache_achatado)
+    bundles = montar_bundles(parcial)
 
-# Agregação de vagas por município
-vagas_municipios = df.dropna(subset=['vaga_uf', 'vaga_municipio', 'curso_nome_limpo'])
-vagas_agg = vagas_municipios.groupby(['vaga_uf', 'vaga_municipio'])['curso_nome_limpo'].apply(list).reset_index()
-dados_publicos['mapas']['vagas_por_municipio'] = vagas_agg.to_dict(orient='records')
+    # --- SALVAR ARQUIVO PÚBLICO ---
+    arquivo_publico = montar_arquivo_publico(bundles)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(arquivo_publico, f, ensure_ascii=False, indent=2)
+    salvar_bundles(bundles, args.pasta_bundles)
+    salvar_cubo(parcial['cubo'], COLUNAS_CUBO, args.cubo)
+    # Gravado depois do JSON: os apps só usam o snapshot se ele não for mais antigo
+    if args.snapshot:
+        escrever_snapshot(arquivo_publico, args.snapshot)
 
+    print(f"✅ Arquivo '{args.saida}' gerado com sucesso!")
+    if args.snapshot:
+        print(f"   Snapshot binário gravado em '{args.snapshot}'")
+    print(f"   Agregados por rede ({', '.join(bundles)}) gravados em '{args.pasta_bundles}/<rede>/{ARQUIVO_SAIDA}'")
+    print(f"   Cubo da filtragem cruzada gravado em '{args.cubo}' (só para o servidor: não publicar)")
+    pico = pico_memoria_mb()
+    print(f"📈 Pico de memória (RSS): {pico:.1f} MB" if pico is not None else "📈 Pico de memória (RSS): indisponível nesta plataforma")
+    print("   Você já pode executar 'python app_principal.py' e enviar seu projeto para o GitHub.")
 
-# --- SALVAR ARQUIVO PÚBLICO ---
-with open('dados_publicos.json', 'w', encoding='utf-8') as f:
-    json.dump(dados_publicos, f, ensure_ascii=False, indent=2)
 
-print("✅ Arquivo 'dados_publicos.json' gerado com sucesso!")
-print("   Você já pode executar 'python app_principal.py' e enviar seu projeto para o GitHub.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# histogramas.py
+"""Histogramas pré-agregados das colunas numéricas (idade e tempo de graduado).
+
+Em vez da lista com o valor de cada profissional, o arquivo público guarda as
+contagens em classes de largura fixa e um resumo (total, média, mínimo, máximo
+e quantis). O tamanho não depende do número de registros, e o dashboard
+desenha o gráfico e as linhas de média e mediana sem percorrer valores.
+
+Os resumos saem das contagens de cada valor ({valor: qtd}), que são somadas
+entre lotes. Como idade e tempo de graduado são anos
+completos (inteiros), média e quantis são exatos: os mesmos do pandas sobre
+a lista de valores (quantis com interpolação linear).
+"""
+from collections import Counter
+
+import numpy as np
+
+LARGURA_CLASSE = 1
+QUANTIS = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _nome_quantil(p):
+    return f'p{round(p * 100)}'
+
+
+def resumir_contagens(contagem, largura=LARGURA_CLASSE):
+    """Histograma público a partir de {valor: qtd}.
+
+    Retorna {'inicio', 'largura', 'contagens', 'total', 'media', 'minimo', 'maximo',
+    'quantis': {'p5', 'p25', 'p50', 'p75', 'p95'}}; sem valores, só 'largura',
+    'contagens' (vazia) e 'total' (zero).
+    """
+    itens = sorted((float(valor), int(qtd)) for valor, qtd in contagem.items() if qtd > 0)
+    if not itens:
+        return {'largura': largura, 'contagens': [], 'total': 0}
+    valores = np.array([valor for valor, _ in itens])
+    qtds = np.array([qtd for _, qtd in itens])
+    total = int(qtds.sum())
+    acumulado = np.cumsum(qtds)
+
+    def quantil(p):
+        # Interpolação linear entre as posições vizinhas, como em pandas.Series.quantile
+        posicao = p * (total - 1)
+        abaixo, acima = (valores[np.searchsorted(acumulado, i, side='right')]
+                         for i in (int(np.floor(posicao)), int(np.ceil(posicao))))
+        return float(abaixo + (acima - abaixo) * (posicao - np.floor(posicao)))
+
+    classes = np.floor(valores / largura).astype(np.int64)
+    return {
+        'inicio': float(classes[0] * largura),
+        'largura': largura,
+        'contagens': np.bincount(classes - classes[0], weights=qtds).astype(np.int64).tolist(),
+        'total': total,
+        'media': float((valores * qtds).sum() / total),
+        'minimo': float(valores[0]),
+        'maximo': float(valores[-1]),
+        'quantis': {_nome_quantil(p): quantil(p) for p in QUANTIS},
+    }
+
+
+def resumir_valores(valores, largura=LARGURA_CLASSE):
+    """Histograma público a partir da lista de valores (formato dos arquivos antigos)."""
+    return resumir_contagens(Counter(float(v) for v in valores), largura)
+
+
+def classes(histograma):
+    """(início de cada classe, contagem de cada classe) de um histograma público."""
+    contagens = np.asarray(histograma['contagens'])
+    if not len(contagens):
+        return np.array([]), contagens
+    return histograma['inicio'] + histograma['largura'] * np.arange(len(contagens)), contagens
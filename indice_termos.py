@@ -0,0 +1,109 @@
+# indice_termos.py
+"""Contagens de termos por rede e sentimento dos textos livres de um campo.
+
+Gerado por gerar_analises.py para a rede 'Todas', permite ao dashboard contar
+os termos mais frequentes de qualquer recorte rede x sentimento sob demanda,
+em vez de depender de uma nuvem de palavras desenhada offline para cada recorte.
+
+O arquivo fica na pasta pública 'analises/' e por isso só traz agregados:
+
+- uma célula por par (rede, sentimento), na ordem rede x SENTIMENTOS, com a
+  contagem de cada termo em formato CSR ('ponteiros', 'indices', 'contagens');
+  'Todas' e 'Todos' são somas dessas células;
+- só entram termos usados por pelo menos `k_minimo` respostas, para que
+  palavras raras (nomes, lugares) não apontem para quem respondeu;
+- termos são normalizados (minúsculas, sem acentos, sem stopwords); o rótulo
+  exibido é a grafia mais comum do termo.
+
+Os arrays são gravados como no cubo de contagens: inteiros do menor tipo que
+comporta os valores, em base64.
+"""
+import base64
+import json
+from collections import Counter
+
+import numpy as np
+
+SENTIMENTOS = ['Positivo', 'Neutro', 'Negativo']
+TERMOS_GRAFICO = 20
+K_MINIMO_RESPOSTAS = 5
+ARRAYS = ('ponteiros', 'indices', 'contagens')
+
+
+def _codificar(valores):
+    maximo = max(valores, default=0)
+    tipo = next(t for t in (np.uint8, np.uint16, np.uint32) if maximo <= np.iinfo(t).max)
+    return {'tipo': np.dtype(tipo).name,
+            'dados': base64.b64encode(np.asarray(valores, dtype=tipo).tobytes()).decode('ascii')}
+
+
+def _decodificar(array):
+    return np.frombuffer(base64.b64decode(array['dados']), dtype=array['tipo'])
+
+
+def montar_indice(analises, redes, normalizar, k_minimo=K_MINIMO_RESPOSTAS):
+    """Contagens serializáveis de um campo.
+
+    `analises` (com 'sentimento' e 'termos') e `redes` têm um item por resposta;
+    `normalizar` converte a grafia de um termo na chave das contagens.
+    """
+    grafias = Counter((normalizar(termo), termo) for analise in analises for termo in analise['termos'])
+    respostas_por_chave = Counter(chave for analise in analises for chave in {normalizar(t) for t in analise['termos']})
+    chaves = sorted(chave for chave, qtd in respostas_por_chave.items() if qtd >= k_minimo)
+    codigo_termo = {chave: i for i, chave in enumerate(chaves)}
+    rotulos = {}
+    # Grafia mais comum de cada chave (empates pela ordem alfabética)
+    for (chave, termo), qtd in sorted(grafias.items(), key=lambda item: (-item[1], item[0][1])):
+        if chave in codigo_termo:
+            rotulos.setdefault(chave, termo)
+
+    categorias_redes = sorted(set(redes))
+    celulas = {(rede, sentimento): Counter() for rede in categorias_redes for sentimento in SENTIMENTOS}
+    for analise, rede in zip(analises, redes):
+        celulas[(rede, analise['sentimento'])].update(
+            codigo_termo[chave] for chave in map(normalizar, analise['termos']) if chave in codigo_termo)
+
+    ponteiros, indices, contagens = [0], [], []
+    for rede in categorias_redes:
+        for sentimento in SENTIMENTOS:
+            termos = sorted(celulas[(rede, sentimento)].items())
+            indices += [codigo for codigo, _ in termos]
+            contagens += [qtd for _, qtd in termos]
+            ponteiros.append(len(indices))
+    return {
+        'termos': [rotulos[chave] for chave in chaves],
+        'redes': categorias_redes,
+        'sentimentos': SENTIMENTOS,
+        'k_minimo': k_minimo,
+        **{nome: _codificar(valores) for nome, valores in
+           (('ponteiros', ponteiros), ('indices', indices), ('contagens', contagens))},
+    }
+
+
+def carregar_indice(caminho):
+    """Lê as contagens gravadas por gerar_analises.py numa matriz rede x sentimento x termo; None se não existir."""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+    except FileNotFoundError:
+        return None
+    ponteiros, indices, contagens = (_decodificar(indice.pop(nome)) for nome in ARRAYS)
+    celulas = np.repeat(np.arange(len(ponteiros) - 1), np.diff(ponteiros))
+    matriz = np.zeros((len(indice['redes']) * len(indice['sentimentos']), len(indice['termos'])), dtype=np.int64)
+    matriz[celulas, indices] = contagens
+    indice['matriz'] = matriz.reshape(len(indice['redes']), len(indice['sentimentos']), len(indice['termos']))
+    return indice
+
+
+def termos_mais_frequentes(indice, rede=None, sentimento=None, n=TERMOS_GRAFICO):
+    """[(termo, qtd)] dos `n` termos mais frequentes nas respostas da rede e do sentimento (None = todos)."""
+    matriz = indice['matriz']
+    if rede is not None:
+        if rede not in indice['redes']:
+            return []
+        matriz = matriz[[indice['redes'].index(rede)]]
+    if sentimento is not None:
+        matriz = matriz[:, [indice['sentimentos'].index(sentimento)]]
+    totais = matriz.sum(axis=(0, 1))
+    ordem = np.argsort(-totais, kind='stable')[:n]
+    return [(indice['termos'][i], int(totais[i])) for i in ordem if totais[i] > 0]
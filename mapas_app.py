@@ -1,42 +1,109 @@
 # mapas_app.py
 import json
-import pandas as pd
+import threading
+from collections import OrderedDict
 import plotly.graph_objects as go
-from dash import dcc, html, Input, Output, callback_context
-import requests
+from plotly.io.json import to_json_plotly
+from dash import dcc, html, Input, Output, State, callback_context
+from dash.exceptions import PreventUpdate
+
+from geojson_local import (ARQUIVO_ESTADOS, ARQUIVO_MUNICIPIOS, RESOLUCOES, SIGLAS_IBGE, geojson_estados, geojson_municipios, indice_codigos_municipios,
+                           normalizar_nome, pre_aquecer)
+from compactacao import enxugar
+import metricas
+import recarga_dados
+from recarga_dados import assinatura_arquivos
+from snapshot_dados import ARQUIVO_SNAPSHOT, caminho_dados_publicos, carregar_arquivo_publico
 
 # ============================================================================
 # CONFIG E CARREGAMENTO DE DADOS
 # ============================================================================
 
-with open('dados_publicos.json', 'r', encoding='utf-8') as f:
-    dados_mapas = json.load(f)['mapas']
+REDE_TODAS = 'Todas'
+ARQUIVO_DADOS = 'dados_publicos.json'
+ARQUIVOS_OBSERVADOS = [ARQUIVO_DADOS, ARQUIVO_SNAPSHOT]
+
+TITULOS_MAPAS = {
+    'rg_uf_ds': 'Estado de Nascimento dos Profissionais',
+    'estado_graduacao': 'Estado de Graduação dos Profissionais',
+    'uf_crm_ds': 'Estado do CRM dos Profissionais',
+    'vaga_uf': 'Estado da Vaga Principal'
+}
 
-GEOJSON_CACHE = {}
 ESTADOS_SIGLAS = {'Acre': 'AC', 'Alagoas': 'AL', 'Amapá': 'AP', 'Amazonas': 'AM', 'Bahia': 'BA', 'Ceará': 'CE', 'Distrito Federal': 'DF', 'Espírito Santo': 'ES', 'Goiás': 'GO', 'Maranhão': 'MA', 'Mato Grosso': 'MT', 'Mato Grosso do Sul': 'MS', 'Minas Gerais': 'MG', 'Pará': 'PA', 'Paraíba': 'PB', 'Paraná': 'PR', 'Pernambuco': 'PE', 'Piauí': 'PI', 'Rio de Janeiro': 'RJ', 'Rio Grande do Norte': 'RN', 'Rio Grande do Sul': 'RS', 'Rondônia': 'RO', 'Roraima': 'RR', 'Santa Catarina': 'SC', 'São Paulo': 'SP', 'Sergipe': 'SE', 'Tocantins': 'TO'}
-SIGLAS_IBGE = {'AC': '12', 'AM': '13', 'AP': '16', 'PA': '15', 'RO': '11', 'RR': '14', 'TO': '17', 'AL': '27', 'BA': '29', 'CE': '23', 'MA': '21', 'PB': '25', 'PE': '26', 'PI': '22', 'RN': '24', 'SE': '28', 'ES': '32', 'MG': '31', 'RJ': '33', 'SP': '35', 'PR': '41', 'RS': '43', 'SC': '42', 'DF': '53', 'GO': '52', 'MT': '51', 'MS': '50'}
+# GeoJSON simplificados lidos do disco e mantidos em memória desde o início do processo;
+# os ausentes (já avisados uma vez por pre_aquecer) ficam fora do pré-aquecimento das figuras
+GEOJSON_AUSENTES = set(pre_aquecer(resolucoes=list(RESOLUCOES)))
 
-def carregar_geojson(url):
-    if url in GEOJSON_CACHE:
-        return GEOJSON_CACHE[url]
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        geojson = response.json()
-        GEOJSON_CACHE[url] = geojson
-        return geojson
-    except Exception as e:
-        print(f"Erro ao carregar GeoJSON de {url}: {e}")
-        return None
+# ============================================================================
+# ÍNDICE DE VAGAS POR UF E MUNICÍPIO
+# ============================================================================
+SIGLA_POR_UF = {normalizar_nome(nome): sigla for nome, sigla in ESTADOS_SIGLAS.items()}
+
+def _texto_municipio(nome_municipio, cursos):
+    cursos_html = "<br>".join([f"• {c}" for c in cursos])
+    return f"<b>{nome_municipio}</b><br>--- Áreas ---<br>{cursos_html}"
+
+def indexar_vagas(mapas, codigos_por_nome=None):
+    """{sigla da UF: {código IBGE: (cursos, texto do hover, valor z)}} das vagas de uma rede.
+
+    Entradas sem 'codigo_ibge' (arquivos antigos) são resolvidas pelo nome normalizado.
+    """
+    indice = {}
+    for vaga in mapas['vagas_por_municipio']:
+        sigla = SIGLA_POR_UF.get(normalizar_nome(vaga['vaga_uf']))
+        codigo = vaga.get('codigo_ibge')
+        if codigo is None:
+            if codigos_por_nome is None:
+                codigos_por_nome = indice_codigos_municipios()
+            codigo = codigos_por_nome.get(sigla, {}).get(normalizar_nome(vaga['vaga_municipio']))
+        if sigla is None or codigo is None:
+            continue
+        cursos = vaga['curso_nome_limpo']
+        indice.setdefault(sigla, {})[str(codigo)] = (cursos, _texto_municipio(vaga['vaga_municipio'], cursos), 1)
+    return indice
+
+def carregar_dados_mapas():
+    """Lê os dados públicos e monta uma versão dos dados dos mapas, sem tocar na versão em uso.
+
+    Usa o snapshot binário (mapeado via mmap) se estiver atualizado; senão o JSON.
+    """
+    # Assinatura lida antes do arquivo: uma mudança durante a carga gera outra recarga
+    assinatura = assinatura_arquivos(ARQUIVOS_OBSERVADOS)
+    arquivo_publico = carregar_arquivo_publico(caminho_dados_publicos(ARQUIVO_DADOS))
+    faltando = [coluna for coluna in TITULOS_MAPAS if coluna not in arquivo_publico['mapas']]
+    if faltando:
+        raise ValueError(f"Dados dos mapas sem as colunas: {', '.join(faltando)}")
+
+    # Agregados pré-calculados por rede formadora ('Todas' + redes presentes no arquivo)
+    mapas_por_rede = {REDE_TODAS: arquivo_publico['mapas']}
+    mapas_por_rede.update({rede: bundle['mapas'] for rede, bundle in arquivo_publico.get('redes', {}).items()})
+    return {
+        # A assinatura identifica a versão e faz parte da chave do cache de figuras
+        'assinatura': assinatura,
+        'mapas_por_rede': mapas_por_rede,
+        'redes': list(mapas_por_rede),
+        'vagas_por_rede': {rede: indexar_vagas(mapas) for rede, mapas in mapas_por_rede.items()},
+    }
+
+# Telas estreitas (celulares) recebem uma resolução abaixo da usada no desktop
+LARGURA_TELA_COMPACTA = 768
+
+def escolher_resolucao(vista, largura_tela=None):
+    """Resolução da geometria para a vista ('brasil' ou 'estado') e a largura da tela do cliente."""
+    # A largura vem do navegador: o que não for número conta como tela de desktop
+    compacta = isinstance(largura_tela, (int, float)) and largura_tela < LARGURA_TELA_COMPACTA
+    if vista == 'brasil':
+        return 'baixa' if compacta else 'media'
+    return 'media' if compacta else 'alta'
 
 # ============================================================================
 # FUNÇÕES DE CRIAÇÃO DE MAPAS
 # ============================================================================
 
 # ===== CORREÇÃO DEFINITIVA APLICADA AQUI =====
-def criar_mapa_calor_estados(dados_dict, titulo):
-    url_brasil = 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson'
-    geojson_br = carregar_geojson(url_brasil)
+def criar_mapa_calor_estados(dados_dict, titulo, resolucao=None):
+    geojson_br = geojson_estados(resolucao=resolucao or escolher_resolucao('brasil'))
     if not geojson_br:
         return go.Figure().update_layout(title="Erro ao carregar GeoJSON do Brasil")
 
@@ -82,46 +149,42 @@ def criar_mapa_calor_estados(dados_dict, titulo):
     return fig
 
 
-def criar_mapa_municipios_estado(sigla_estado):
+def criar_mapa_municipios_estado(sigla_estado, vagas=None, resolucao=None):
+    """Mapa dos municípios da UF; `vagas` é o índice de uma rede (padrão: 'Todas')."""
     nome_estado_map = {v: k for k, v in ESTADOS_SIGLAS.items()}
     estado_nome = nome_estado_map.get(sigla_estado)
     codigo_ibge = SIGLAS_IBGE.get(sigla_estado)
     if not estado_nome or not codigo_ibge:
         return go.Figure().update_layout(title=f"Sigla de estado inválida: {sigla_estado}")
 
-    url = f'https://raw.githubusercontent.com/tbrugz/geodata-br/master/geojson/geojs-{codigo_ibge}-mun.json'
-    geojson_estado = carregar_geojson(url)
+    geojson_estado = geojson_municipios(codigo_ibge, resolucao=resolucao or escolher_resolucao('estado'))
 
     if not geojson_estado:
         return go.Figure().update_layout(title=f"Não foi possível carregar o mapa de {estado_nome}")
 
-    df_vagas_municipio = pd.DataFrame(dados_mapas['vagas_por_municipio'])
-    df_estado_vagas = df_vagas_municipio[df_vagas_municipio['vaga_uf'] == estado_nome]
-    
-    vagas_por_municipio = {row['vaga_municipio']: row['curso_nome_limpo'] for index, row in df_estado_vagas.iterrows()}
+    vagas_estado = (vagas if vagas is not None else _VERSAO['vagas_por_rede'][REDE_TODAS]).get(sigla_estado, {})
 
     locations = []
     z_values = []
     hover_text = []
 
+    # Busca direta pelo código IBGE de cada feição
     for feature in geojson_estado['features']:
-        nome_municipio = feature['properties']['name']
-        locations.append(nome_municipio)
-
-        if nome_municipio in vagas_por_municipio:
-            z_values.append(1)
-            cursos = vagas_por_municipio[nome_municipio]
-            cursos_html = "<br>".join([f"• {c}" for c in cursos])
-            hover_text.append(f"<b>{nome_municipio}</b><br>--- Áreas ---<br>{cursos_html}")
+        codigo = str(feature['properties']['id'])
+        locations.append(codigo)
+        vaga = vagas_estado.get(codigo)
+        if vaga:
+            z_values.append(vaga[2])
+            hover_text.append(vaga[1])
         else:
             z_values.append(0)
-            hover_text.append(f"<b>{nome_municipio}</b><br>Sem vagas")
+            hover_text.append(f"<b>{feature['properties']['name']}</b><br>Sem vagas")
             
     fig = go.Figure(go.Choropleth(
         geojson=geojson_estado,
         locations=locations,
         z=z_values,
-        featureidkey="properties.name",
+        featureidkey="properties.id",
         colorscale=[[0, '#e0e0e0'], [1, '#28a745']],
         showscale=False,
         text=hover_text,
@@ -136,6 +199,103 @@ def criar_mapa_municipios_estado(sigla_estado):
     )
     return fig
 
+# ============================================================================
+# CACHE DE FIGURAS
+# ============================================================================
+# Há poucas figuras possíveis (4 mapas do Brasil e 27 estados por rede e resolução).
+# Elas ficam serializadas num LRU limitado, e requisições simultâneas pela mesma
+# figura esperam uma única construção (single-flight) em vez de repeti-la.
+TAMANHO_CACHE_FIGURAS = 96
+_FIGURAS = OrderedDict()
+_EM_CONSTRUCAO = {}
+_TRAVA_FIGURAS = threading.Lock()
+
+def _para_json(figura):
+    return enxugar(json.loads(to_json_plotly(figura)))
+
+def figura_em_cache(chave, construir):
+    """Figura serializada da chave, construída por `construir()` só se ainda não estiver no cache."""
+    with _TRAVA_FIGURAS:
+        if chave in _FIGURAS:
+            _FIGURAS.move_to_end(chave)
+            metricas.contar_cache('figuras_mapas', 'acerto')
+            return _FIGURAS[chave]
+        evento = _EM_CONSTRUCAO.get(chave)
+        responsavel = evento is None
+        metricas.contar_cache('figuras_mapas', 'falta' if responsavel else 'espera')
+        if responsavel:
+            evento = _EM_CONSTRUCAO[chave] = threading.Event()
+
+    if not responsavel:
+        evento.wait()
+        with _TRAVA_FIGURAS:
+            if chave in _FIGURAS:
+                return _FIGURAS[chave]
+        # A construção da outra requisição falhou: tenta novamente sem cache
+        return _para_json(construir())
+
+    try:
+        figura = _para_json(construir())
+        with _TRAVA_FIGURAS:
+            _FIGURAS[chave] = figura
+            while len(_FIGURAS) > TAMANHO_CACHE_FIGURAS:
+                _FIGURAS.popitem(last=False)
+        return figura
+    finally:
+        with _TRAVA_FIGURAS:
+            del _EM_CONSTRUCAO[chave]
+        evento.set()
+
+def validar_entradas(colunas=(), siglas_estado=()):
+    """Interrompe o callback (PreventUpdate) se o tipo de mapa ou o estado não existirem.
+
+    Os valores vêm da requisição do navegador e viram chaves do cache de figuras:
+    só valores conhecidos chegam a ele.
+    """
+    if any(not (isinstance(coluna, str) and coluna in TITULOS_MAPAS) for coluna in colunas):
+        raise PreventUpdate
+    if any(sigla not in ESTADOS_SIGLAS.values() for sigla in siglas_estado):
+        raise PreventUpdate
+
+def figura_mapa_brasil(versao, coluna, rede, resolucao):
+    validar_entradas(colunas=[coluna])
+    mapas_por_rede = versao['mapas_por_rede']
+    rede = rede if rede in mapas_por_rede else REDE_TODAS
+    return figura_em_cache(
+        ('brasil', coluna, rede, resolucao, versao['assinatura']),
+        lambda: criar_mapa_calor_estados(mapas_por_rede[rede][coluna], TITULOS_MAPAS[coluna], resolucao))
+
+def figura_mapa_estado(versao, sigla_estado, rede, resolucao):
+    validar_entradas(siglas_estado=[sigla_estado])
+    vagas_por_rede = versao['vagas_por_rede']
+    rede = rede if rede in vagas_por_rede else REDE_TODAS
+    return figura_em_cache(
+        ('estado', sigla_estado, rede, resolucao, versao['assinatura']),
+        lambda: criar_mapa_municipios_estado(sigla_estado, vagas_por_rede[rede], resolucao))
+
+def pre_aquecer_figuras(versao=None):
+    """Constrói as figuras mais acessadas (resolução de desktop): Brasil de todas as redes e estados de 'Todas'.
+
+    Mapas cujo GeoJSON não está no disco são pulados.
+    """
+    versao = versao or _VERSAO
+    if ARQUIVO_ESTADOS not in GEOJSON_AUSENTES:
+        for rede in versao['redes']:
+            for coluna in TITULOS_MAPAS:
+                figura_mapa_brasil(versao, coluna, rede, escolher_resolucao('brasil'))
+    for sigla, codigo in SIGLAS_IBGE.items():
+        if ARQUIVO_MUNICIPIOS.format(codigo=codigo) not in GEOJSON_AUSENTES:
+            figura_mapa_estado(versao, sigla, REDE_TODAS, escolher_resolucao('estado'))
+
+def publicar_versao(versao):
+    """Torna `versao` a versão em uso, com as figuras principais já construídas."""
+    global _VERSAO
+    pre_aquecer_figuras(versao)
+    _VERSAO = versao
+
+# Versão em uso: trocada inteira na recarga; cada requisição a lê uma única vez
+_VERSAO = carregar_dados_mapas()
+
 # ============================================================================
 # LAYOUT E CALLBACKS
 # ============================================================================
@@ -144,6 +304,17 @@ def create_layout():
     """Cria e retorna o layout dos mapas."""
     layout = html.Div([
         html.H1('Análise Geográfica - PMM-e', style={'textAlign': 'center'}),
+        # Largura da janela do navegador, usada para escolher a resolução das geometrias
+        dcc.Store(id='largura-tela-mapas'),
+        html.Div([
+            html.Label('Rede Formadora:', style={'fontWeight': 'bold'}),
+            dcc.Dropdown(
+                id='dropdown-rede-mapas',
+                options=[{'label': rede, 'value': rede} for rede in _VERSAO['redes']],
+                value=REDE_TODAS,
+                clearable=False,
+            ),
+        ], style={'maxWidth': 320, 'marginBottom': 20}),
         dcc.Dropdown(
             id='dropdown-tipo-mapa',
             options=[
@@ -162,25 +333,29 @@ def create_layout():
 
 def register_callbacks(app):
     """Registra todos os callbacks dos mapas."""
+    app.clientside_callback(
+        "function(_) { return window.innerWidth; }",
+        Output('largura-tela-mapas', 'data'),
+        Input('largura-tela-mapas', 'id')
+    )
+
     @app.callback(
         Output('mapa-principal', 'figure'),
-        Input('dropdown-tipo-mapa', 'value')
+        [Input('dropdown-tipo-mapa', 'value'),
+         Input('dropdown-rede-mapas', 'value'),
+         Input('largura-tela-mapas', 'data')]
     )
-    def atualizar_mapa_principal(coluna):
-        titulos = {
-            'rg_uf_ds': 'Estado de Nascimento dos Profissionais',
-            'estado_graduacao': 'Estado de Graduação dos Profissionais',
-            'uf_crm_ds': 'Estado do CRM dos Profissionais',
-            'vaga_uf': 'Estado da Vaga Principal'
-        }
-        return criar_mapa_calor_estados(dados_mapas[coluna], titulos[coluna])
+    def atualizar_mapa_principal(coluna, rede, largura_tela):
+        return figura_mapa_brasil(_VERSAO, coluna, rede, escolher_resolucao('brasil', largura_tela))
 
     @app.callback(
         Output('container-municipios', 'children'),
         [Input('mapa-principal', 'clickData'),
-         Input('dropdown-tipo-mapa', 'value')]
+         Input('dropdown-tipo-mapa', 'value'),
+         Input('dropdown-rede-mapas', 'value')],
+        State('largura-tela-mapas', 'data')
     )
-    def atualizar_mapa_municipios(clickData, tipo_mapa):
+    def atualizar_mapa_municipios(clickData, tipo_mapa, rede, largura_tela):
         ctx = callback_context
         trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else 'initial_load'
 
@@ -195,6 +370,15 @@ def register_callbacks(app):
             if not sigla_estado:
                 return html.P("Estado não reconhecido.")
 
-            return dcc.Loading(dcc.Graph(figure=criar_mapa_municipios_estado(sigla_estado)))
+            return dcc.Loading(dcc.Graph(figure=figura_mapa_estado(_VERSAO, sigla_estado, rede, escolher_resolucao('estado', largura_tela))))
         
-        return hint_text
\ No newline at end of file
+        return hint_text
+
+    # Pré-aquecimento em segundo plano: não atrasa o início do servidor, e
+    # requisições que chegarem antes esperam a mesma construção (single-flight)
+    threading.Thread(target=pre_aquecer_figuras, name='pre-aquecer-mapas', daemon=True).start()
+
+    # Recarga dos dados em segundo plano; a nova versão só é publicada com os mapas prontos
+    recarga_dados.observar('mapas', lambda: ARQUIVOS_OBSERVADOS, carregar_dados_mapas,
+                           publicar_versao, _VERSAO['assinatura'])
+    recarga_dados.iniciar()
@@ -0,0 +1,204 @@
+# metricas.py
+"""Métricas dos apps no formato de exposição do Prometheus, em '/metrics'.
+
+Registra, sem dependências externas:
+
+- latência e tamanho da resposta de cada callback do Dash (incluindo
+  display_page), medidos em volta de '/_dash-update-component';
+- acertos e faltas dos caches de figuras, seções, nuvens e GeoJSON;
+- tempo de leitura dos GeoJSON do disco.
+
+Com a variável de ambiente PMME_TOKEN_PERFIL definida, uma requisição com o
+cabeçalho 'X-Perfil: <token>' é executada sob o cProfile; o perfil é gravado
+em 'perfis/' e o nome do arquivo volta no cabeçalho 'X-Perfil-Arquivo'.
+
+Cada worker do gunicorn mantém suas próprias métricas: o Prometheus vê as do
+worker que atender a coleta.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+ROTA_CALLBACKS = '/_dash-update-component'
+ROTA_METRICAS = '/metrics'
+PASTA_PERFIS = 'perfis'
+CABECALHO_PERFIL = 'X-Perfil'
+VARIAVEL_TOKEN_PERFIL = 'PMME_TOKEN_PERFIL'
+
+# nome -> {'tipo', 'ajuda', 'limites', 'series': {rótulos: valor ou [contagens por limite, soma, total]}}
+_METRICAS = {}
+# Funções chamadas a cada coleta, para métricas lidas de outros módulos (ex.: tamanho de caches)
+_COLETORES = []
+_TRAVA = threading.Lock()
+
+
+def _registrar(nome, tipo, ajuda, limites=None):
+    _METRICAS.setdefault(nome, {'tipo': tipo, 'ajuda': ajuda, 'limites': limites, 'series': {}})
+    return nome
+
+
+LATENCIA_CALLBACK = _registrar('pmme_callback_latencia_segundos', 'histogram',
+                               'Tempo de resposta de cada callback do Dash.', LIMITES_LATENCIA)
+BYTES_CALLBACK = _registrar('pmme_callback_resposta_bytes', 'histogram',
+                            'Tamanho da resposta de cada callback do Dash.', LIMITES_BYTES)
+ERROS_CALLBACK = _registrar('pmme_callback_erros_total', 'counter', 'Callbacks que terminaram com status 5xx.')
+CACHE = _registrar('pmme_cache_total', 'counter', 'Consultas aos caches, por cache e resultado (acerto, falta, espera).')
+CARGA_GEOJSON = _registrar('pmme_geojson_carga_segundos', 'histogram',
+                           'Tempo de leitura de um GeoJSON do disco, por resolução.', LIMITES_LATENCIA)
+
+
+def _chave(rotulos):
+    return tuple(sorted(rotulos.items()))
+
+
+def observar(nome, valor, **rotulos):
+    """Registra uma observação num histograma."""
+    metrica = _METRICAS[nome]
+    limites = metrica['limites']
+    with _TRAVA:
+        serie = metrica['series'].setdefault(_chave(rotulos), [[0] * len(limites), 0.0, 0])
+        for i, limite in enumerate(limites):
+            if valor <= limite:
+                serie[0][i] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+
+def contar(nome, n=1, **rotulos):
+    """Soma `n` a um contador."""
+    series = _METRICAS[nome]['series']
+    chave = _chave(rotulos)
+    with _TRAVA:
+        series[chave] = series.get(chave, 0) + n
+
+
+def contar_cache(cache, resultado):
+    contar(CACHE, cache=cache, resultado=resultado)
+
+
+@contextmanager
+def cronometrar(nome, **rotulos):
+    """Observa no histograma `nome` a duração do bloco, em segundos."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(nome, time.perf_counter() - inicio, **rotulos)
+
+
+def registrar_coletor(coletor):
+    """`coletor()` retorna [(nome, tipo, ajuda, [(rótulos, valor)])], lidos a cada coleta."""
+    _COLETORES.append(coletor)
+
+# ============================================================================
+# EXPOSIÇÃO
+# ============================================================================
+
+def _formatar_rotulos(rotulos, extra=()):
+    pares = list(rotulos) + list(extra)
+    if not pares:
+        return ''
+    escapar = lambda v: str(v).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+    return '{' + ','.join(f'{chave}="{escapar(valor)}"' for chave, valor in pares) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar():
+    """Texto de todas as métricas no formato de exposição do Prometheus (versão 0.0.4)."""
+    linhas = []
+    with _TRAVA:
+        metricas = {nome: dict(m, series={k: (list(v[0]), v[1], v[2]) if isinstance(v, list) else v
+                                          for k, v in m['series'].items()})
+                    for nome, m in _METRICAS.items()}
+    for nome, metrica in metricas.items():
+        linhas += [f"# HELP {nome} {metrica['ajuda']}", f"# TYPE {nome} {metrica['tipo']}"]
+        for rotulos, valor in sorted(metrica['series'].items()):
+            if metrica['tipo'] != 'histogram':
+                linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}')
+                continue
+            contagens, soma, total = valor
+            for limite, contagem in zip(metrica['limites'], contagens):
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, [('le', _numero(float(limite)))])} {contagem}")
+            linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, [('le', '+Inf')])} {total}")
+            linhas.append(f'{nome}_sum{_formatar_rotulos(rotulos)} {_numero(soma)}')
+            linhas.append(f'{nome}_count{_formatar_rotulos(rotulos)} {total}')
+    for coletor in _COLETORES:
+        for nome, tipo, ajuda, series in coletor():
+            linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+            linhas += [f'{nome}{_formatar_rotulos(sorted(rotulos.items()))} {_numero(valor)}' for rotulos, valor in series]
+    return '\n'.join(linhas) + '\n'
+
+# ============================================================================
+# INSTRUMENTAÇÃO DO SERVIDOR
+# ============================================================================
+
+def nomes_callbacks(app):
+    """{chave de saída do Dash: nome do callback}; nomes repetidos ganham o id da primeira saída."""
+    nomes = {}
+    for saida, callback in app.callback_map.items():
+        funcao = callback.get('callback')
+        if funcao is not None:
+            nomes[saida] = getattr(funcao, '__name__', saida)
+    repetidos = {nome for nome in nomes.values() if list(nomes.values()).count(nome) > 1}
+    for saida, nome in nomes.items():
+        if nome in repetidos:
+            id_saida = saida.strip('.').split('...')[0].rsplit('.', 1)[0]
+            if id_saida.startswith('{'):
+                id_saida = ','.join(str(v) for k, v in sorted(json.loads(id_saida).items()) if k != 'type')
+            nomes[saida] = f'{nome}:{id_saida}'
+    return nomes
+
+
+def instrumentar(app):
+    """Mede os callbacks do `app` Dash e expõe '/metrics' no servidor Flask."""
+    from flask import Response, g, request
+
+    server = app.server
+    nomes = {}
+    token_perfil = os.environ.get(VARIAVEL_TOKEN_PERFIL)
+
+    @server.before_request
+    def _iniciar_medicao():
+        g.inicio_medicao = time.perf_counter()
+        g.perfil = None
+        if token_perfil and request.headers.get(CABECALHO_PERFIL) == token_perfil:
+            g.perfil = cProfile.Profile()
+            g.perfil.enable()
+
+    @server.after_request
+    def _registrar_medicao(resposta):
+        inicio = g.pop('inicio_medicao', None)
+        perfil = g.pop('perfil', None)
+        if perfil is not None:
+            perfil.disable()
+            os.makedirs(PASTA_PERFIS, exist_ok=True)
+            arquivo = os.path.join(PASTA_PERFIS, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{id(perfil):x}.prof')
+            perfil.dump_stats(arquivo)
+            resposta.headers['X-Perfil-Arquivo'] = arquivo
+        if inicio is None or request.path != ROTA_CALLBACKS or request.method != 'POST':
+            return resposta
+        if not nomes:
+            nomes.update(nomes_callbacks(app))
+        corpo = request.get_json(silent=True) or {}
+        # Só saídas registradas viram rótulo: o corpo vem do cliente e não pode criar séries à vontade
+        callback = nomes.get(corpo.get('output'), 'desconhecido')
+        duracao = time.perf_counter() - inicio
+        observar(LATENCIA_CALLBACK, duracao, callback=callback)
+        if not resposta.direct_passthrough:
+            observar(BYTES_CALLBACK, len(resposta.get_data()), callback=callback)
+        if resposta.status_code >= 500:
+            contar(ERROS_CALLBACK, callback=callback)
+        resposta.headers['Server-Timing'] = f'callback;dur={duracao * 1000:.1f}'
+        return resposta
+
+    @server.route(ROTA_METRICAS)
+    def metricas():
+        return Response(exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
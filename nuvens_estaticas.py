@@ -0,0 +1,141 @@
+# nuvens_estaticas.py
+"""Imagens das nuvens de palavras servidas como arquivos estáticos com cache.
+
+Cada imagem é publicada em '/nuvens/<hash>.png', onde <hash> vem do conteúdo do
+arquivo: quando a nuvem é regenerada a URL muda, então o navegador (e qualquer CDN)
+pode guardá-la para sempre. Se o Pillow estiver instalado, versões reduzidas em
+PNG e WebP são geradas uma única vez em 'cache_nuvens/' e oferecidas via srcset,
+para o navegador escolher a adequada à largura da tela.
+"""
+import hashlib
+import os
+import struct
+import threading
+
+from flask import abort, send_file
+
+import metricas
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional: sem ele só a imagem original é servida
+    Image = None
+
+PASTA_VARIANTES = 'cache_nuvens'
+PREFIXO_URL = '/nuvens/'
+LARGURAS_VARIANTES = (480, 800)
+MAX_AGE_IMUTAVEL = 365 * 24 * 3600
+
+# nome público ('<hash>-<largura>.<formato>') -> caminho do arquivo no disco
+_ARQUIVOS = {}
+# caminho da imagem original -> ((mtime, tamanho), dados da imagem publicada)
+_PUBLICADAS = {}
+_TRAVA = threading.Lock()
+
+
+def _largura_png(caminho):
+    """Largura lida do cabeçalho IHDR do PNG (None se não for PNG)."""
+    with open(caminho, 'rb') as f:
+        cabecalho = f.read(24)
+    if cabecalho[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    return struct.unpack('>I', cabecalho[16:20])[0]
+
+
+def _hash_conteudo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 16), b''):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+
+def _gerar_variantes(caminho, hash_nuvem, largura_original):
+    """Cria (uma vez) as versões reduzidas em PNG e WebP; retorna [(nome, caminho, largura, formato)]."""
+    if Image is None:
+        return []
+    os.makedirs(PASTA_VARIANTES, exist_ok=True)
+    variantes = []
+    with Image.open(caminho) as original:
+        imagem = original if original.mode in ('RGB', 'RGBA') else original.convert('RGBA')
+        larguras = [l for l in LARGURAS_VARIANTES if l < imagem.width] + [imagem.width]
+        for largura in larguras:
+            altura = round(imagem.height * largura / imagem.width)
+            for formato in ('png', 'webp'):
+                if formato == 'png' and largura == largura_original:
+                    continue  # a original já é servida diretamente
+                nome = f'{hash_nuvem}-{largura}.{formato}'
+                destino = os.path.join(PASTA_VARIANTES, nome)
+                if not os.path.exists(destino):
+                    reduzida = imagem if largura == imagem.width else imagem.resize((largura, altura), Image.LANCZOS)
+                    temporario = destino + '.tmp'
+                    reduzida.save(temporario, format=formato.upper(), optimize=True)
+                    os.replace(temporario, destino)
+                variantes.append((nome, destino, largura, formato))
+    return variantes
+
+
+def publicar_nuvem(caminho):
+    """Registra a imagem e retorna {'src', 'srcset_png', 'srcset_webp'} com URLs versionadas.
+
+    Retorna None se o arquivo não existir.
+    """
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    versao = (info.st_mtime_ns, info.st_size)
+    publicada = _PUBLICADAS.get(caminho)
+    if publicada and publicada[0] == versao:
+        metricas.contar_cache('nuvens', 'acerto')
+        return publicada[1]
+
+    metricas.contar_cache('nuvens', 'falta')
+    with _TRAVA:
+        publicada = _PUBLICADAS.get(caminho)
+        if publicada and publicada[0] == versao:
+            return publicada[1]
+        if publicada:
+            # O conteúdo mudou: as URLs antigas deixam de apontar para este arquivo
+            for nome in publicada[1]['nomes']:
+                _ARQUIVOS.pop(nome, None)
+
+        hash_nuvem = _hash_conteudo(caminho)
+        largura = _largura_png(caminho)
+        nome_original = f'{hash_nuvem}.png'
+        arquivos = [(nome_original, caminho, largura, 'png')]
+        arquivos += _gerar_variantes(caminho, hash_nuvem, largura)
+
+        srcset = {'png': [], 'webp': []}
+        for nome, destino, largura_arquivo, formato in arquivos:
+            _ARQUIVOS[nome] = destino
+            if largura_arquivo:
+                srcset[formato].append((largura_arquivo, f'{PREFIXO_URL}{nome} {largura_arquivo}w'))
+        dados = {
+            'src': f'{PREFIXO_URL}{nome_original}',
+            'srcset_png': ', '.join(url for _, url in sorted(srcset['png'])),
+            'srcset_webp': ', '.join(url for _, url in sorted(srcset['webp'])),
+            'nomes': [nome for nome, *_ in arquivos],
+        }
+        _PUBLICADAS[caminho] = (versao, dados)
+        return dados
+
+
+def arquivos_publicados():
+    """{nome público: caminho no disco} de todas as imagens publicadas (usado na exportação estática)."""
+    with _TRAVA:
+        return dict(_ARQUIVOS)
+
+
+def registrar_rota(server):
+    """Adiciona ao servidor Flask a rota que entrega as imagens publicadas."""
+
+    @server.route(f'{PREFIXO_URL}<nome>')
+    def servir_nuvem(nome):
+        caminho = _ARQUIVOS.get(nome)
+        if caminho is None or not os.path.exists(caminho):
+            abort(404)
+        # ETag/Last-Modified permitem respostas 304; o hash na URL permite cache imutável
+        resposta = send_file(caminho, conditional=True, etag=True, max_age=MAX_AGE_IMUTAVEL)
+        resposta.headers['Cache-Control'] = f'public, max-age={MAX_AGE_IMUTAVEL}, immutable'
+        return resposta
@@ -0,0 +1,106 @@
+# recarga_dados.py
+"""Recarga dos arquivos de dados em segundo plano, sem reiniciar os workers.
+
+Cada app registra os arquivos que observa, uma função que monta uma nova versão
+dos dados (leitura, validação e estruturas derivadas) e outra que a publica.
+Uma thread verifica periodicamente data de modificação e tamanho dos arquivos;
+quando mudam, a nova versão é montada fora do caminho das requisições e só
+então publicada com uma única atribuição. Requisições em andamento continuam
+usando a versão que já tinham em mãos.
+
+Threads não sobrevivem a um fork: com 'gunicorn --preload' os apps são
+importados no master, e cada worker inicia a sua própria thread logo após o fork.
+"""
+import os
+import threading
+import time
+import traceback
+
+INTERVALO_PADRAO = 5.0
+
+# (nome, função que lista os arquivos, construir(), publicar(versao), última assinatura)
+_OBSERVADOS = []
+_TRAVA = threading.Lock()
+_THREAD = None
+_INTERVALO = INTERVALO_PADRAO
+
+
+def assinatura_arquivos(caminhos):
+    """Tupla (caminho, mtime, tamanho) de cada arquivo; arquivos ausentes entram como (caminho, None, None)."""
+    assinatura = []
+    for caminho in caminhos:
+        try:
+            info = os.stat(caminho)
+            assinatura.append((caminho, info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            assinatura.append((caminho, None, None))
+    return tuple(assinatura)
+
+
+def observar(nome, arquivos, construir, publicar, assinatura_inicial):
+    """Registra um conjunto de arquivos a observar.
+
+    `arquivos()` lista os caminhos atuais; `construir()` monta a nova versão
+    (exceções mantêm a versão em uso); `publicar(versao)` a torna visível.
+    """
+    with _TRAVA:
+        _OBSERVADOS.append({'nome': nome, 'arquivos': arquivos, 'construir': construir,
+                            'publicar': publicar, 'assinatura': assinatura_inicial})
+
+
+def verificar_agora():
+    """Faz uma rodada de verificação; retorna os nomes recarregados."""
+    recarregados = []
+    with _TRAVA:
+        observados = list(_OBSERVADOS)
+    for item in observados:
+        assinatura = assinatura_arquivos(item['arquivos']())
+        if assinatura == item['assinatura']:
+            continue
+        # Registra a assinatura antes de construir: uma versão inválida não é
+        # retentada a cada rodada, só quando os arquivos mudarem de novo
+        item['assinatura'] = assinatura
+        try:
+            inicio = time.perf_counter()
+            versao = item['construir']()
+        except Exception:
+            print(f"⚠️  Falha ao recarregar '{item['nome']}'; mantendo a versão atual.")
+            traceback.print_exc()
+            continue
+        item['publicar'](versao)
+        recarregados.append(item['nome'])
+        print(f"🔄 '{item['nome']}' recarregado em {time.perf_counter() - inicio:.2f} s")
+    return recarregados
+
+
+def _laco(intervalo):
+    while True:
+        time.sleep(intervalo)
+        try:
+            verificar_agora()
+        except Exception:
+            traceback.print_exc()
+
+
+def iniciar(intervalo=INTERVALO_PADRAO):
+    """Inicia (uma única vez por processo) a thread que observa os arquivos."""
+    global _THREAD, _INTERVALO
+    with _TRAVA:
+        if _THREAD is None:
+            _INTERVALO = intervalo
+            _THREAD = threading.Thread(target=_laco, args=(intervalo,), name='recarga-dados', daemon=True)
+            _THREAD.start()
+
+
+def _reiniciar_apos_fork():
+    # No processo filho só existe a thread que chamou o fork: a trava pode ter ficado
+    # presa por outra thread e a thread de recarga não existe mais
+    global _TRAVA, _THREAD
+    _TRAVA = threading.Lock()
+    iniciada, _THREAD = _THREAD is not None, None
+    if iniciada:
+        iniciar(_INTERVALO)
+
+
+if hasattr(os, 'register_at_fork'):  # ausente no Windows, onde não há fork
+    os.register_at_fork(after_in_child=_reiniciar_apos_fork)
@@ -0,0 +1,176 @@
+# snapshot_dados.py
+"""Snapshot binário de 'dados_publicos.json' para leitura via mmap.
+
+O arquivo tem um cabeçalho JSON pequeno (a estrutura do dicionário público,
+as contagens e as tabelas de categorias) seguido de arrays NumPy alinhados:
+
+- listas numéricas (como as contagens dos histogramas)
+  viram arrays com o menor tipo que as representa sem perda;
+- listas de textos (como os cursos de cada município) viram trechos de um
+  único array de códigos que aponta para uma tabela de textos compartilhada.
+
+Os apps mapeiam o arquivo somente leitura: os arrays são visões da página do
+sistema operacional, então todos os workers do gunicorn compartilham a mesma
+cópia física e o custo de abrir o arquivo não cresce com o volume de dados.
+"""
+import json
+import mmap
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+ARQUIVO_SNAPSHOT = 'dados_publicos.snap'
+ASSINATURA = b'PMMESNP1'
+ALINHAMENTO = 64
+
+
+class ListaCategorica(Sequence):
+    """Lista de textos somente leitura, guardada como códigos de uma tabela compartilhada."""
+
+    __slots__ = ('_codigos', '_tabela')
+
+    def __init__(self, codigos, tabela):
+        self._codigos = codigos
+        self._tabela = tabela
+
+    def __len__(self):
+        return len(self._codigos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._tabela[c] for c in self._codigos[i]]
+        return self._tabela[self._codigos[i]]
+
+    def __iter__(self):
+        tabela = self._tabela
+        return (tabela[c] for c in self._codigos.tolist())
+
+    def __eq__(self, outra):
+        return isinstance(outra, Sequence) and list(self) == list(outra)
+
+    def __repr__(self):
+        return f'ListaCategorica({list(self)!r})'
+
+
+def _e_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _array_compacto(valores):
+    array = np.asarray(valores)
+    if array.dtype.kind in 'iu':
+        for tipo in (np.uint8, np.uint16, np.uint32, np.int32, np.int64):
+            if np.can_cast(array.min(), tipo) and np.can_cast(array.max(), tipo):
+                return array.astype(tipo)
+        return array
+    array = array.astype(np.float64)
+    reduzido = array.astype(np.float32)
+    return reduzido if np.array_equal(reduzido, array) else array
+
+
+# ============================================================================
+# ESCRITA
+# ============================================================================
+
+def escrever_snapshot(arquivo_publico, caminho=ARQUIVO_SNAPSHOT):
+    """Grava o dicionário de 'dados_publicos.json' no formato binário (escrita atômica)."""
+    arrays = []
+    textos = {}
+    codigos_textos = []
+
+    def converter(valor):
+        if isinstance(valor, dict):
+            return {chave: converter(v) for chave, v in valor.items()}
+        if isinstance(valor, np.ndarray):
+            arrays.append(valor)
+            return {'__array__': len(arrays) - 1}
+        if isinstance(valor, list) and valor:
+            if all(_e_numero(v) for v in valor):
+                arrays.append(_array_compacto(valor))
+                return {'__array__': len(arrays) - 1}
+            if all(isinstance(v, str) for v in valor):
+                inicio = len(codigos_textos)
+                codigos_textos.extend(textos.setdefault(v, len(textos)) for v in valor)
+                return {'__textos__': [inicio, len(codigos_textos)]}
+            return [converter(v) for v in valor]
+        return valor
+
+    estrutura = converter(arquivo_publico)
+    tipo_codigos = np.uint16 if len(textos) <= np.iinfo(np.uint16).max else np.uint32
+    arrays.append(np.array(codigos_textos, dtype=tipo_codigos))
+
+    descritores = []
+    deslocamento = 0
+    for array in arrays:
+        descritores.append({'deslocamento': deslocamento, 'tipo': array.dtype.str, 'tamanho': int(array.size)})
+        deslocamento += -(-array.nbytes // ALINHAMENTO) * ALINHAMENTO
+    cabecalho = json.dumps({'versao': 1, 'estrutura': estrutura, 'arrays': descritores,
+                            'textos': list(textos)}, ensure_ascii=False).encode('utf-8')
+    inicio_dados = -(-(len(ASSINATURA) + 8 + len(cabecalho)) // ALINHAMENTO) * ALINHAMENTO
+
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(ASSINATURA)
+        f.write(len(cabecalho).to_bytes(8, 'little'))
+        f.write(cabecalho)
+        for array, descritor in zip(arrays, descritores):
+            f.seek(inicio_dados + descritor['deslocamento'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(inicio_dados + deslocamento)
+    os.replace(temporario, caminho)
+
+
+# ============================================================================
+# LEITURA
+# ============================================================================
+
+def ler_snapshot(caminho=ARQUIVO_SNAPSHOT):
+    """Mapeia o snapshot somente leitura e devolve o dicionário com arrays como visões do arquivo."""
+    with open(caminho, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapa[:len(ASSINATURA)] != ASSINATURA:
+        raise ValueError(f"'{caminho}' não é um snapshot de dados públicos")
+    tamanho_cabecalho = int.from_bytes(mapa[len(ASSINATURA):len(ASSINATURA) + 8], 'little')
+    fim_cabecalho = len(ASSINATURA) + 8 + tamanho_cabecalho
+    cabecalho = json.loads(mapa[len(ASSINATURA) + 8:fim_cabecalho].decode('utf-8'))
+    inicio_dados = -(-fim_cabecalho // ALINHAMENTO) * ALINHAMENTO
+
+    arrays = [np.frombuffer(mapa, dtype=np.dtype(d['tipo']), count=d['tamanho'],
+                            offset=inicio_dados + d['deslocamento'])
+              for d in cabecalho['arrays']]
+    tabela = cabecalho['textos']
+    codigos_textos = arrays[-1]
+
+    def restaurar(valor):
+        if isinstance(valor, dict):
+            if '__array__' in valor:
+                return arrays[valor['__array__']]
+            if '__textos__' in valor:
+                inicio, fim = valor['__textos__']
+                return ListaCategorica(codigos_textos[inicio:fim], tabela)
+            return {chave: restaurar(v) for chave, v in valor.items()}
+        if isinstance(valor, list):
+            return [restaurar(v) for v in valor]
+        return valor
+
+    return restaurar(cabecalho['estrutura'])
+
+
+def caminho_dados_publicos(arquivo_json='dados_publicos.json', arquivo_snapshot=ARQUIVO_SNAPSHOT):
+    """Snapshot binário, se existir e não for mais antigo que o JSON; senão o próprio JSON."""
+    try:
+        if os.stat(arquivo_snapshot).st_mtime_ns >= os.stat(arquivo_json).st_mtime_ns:
+            return arquivo_snapshot
+    except FileNotFoundError:
+        if os.path.exists(arquivo_snapshot):
+            return arquivo_snapshot
+    return arquivo_json
+
+
+def carregar_arquivo_publico(caminho):
+    """Lê os dados públicos do snapshot binário ou do JSON, conforme o arquivo."""
+    if caminho.endswith('.snap'):
+        return ler_snapshot(caminho)
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,655 @@
+# teste_carga.py
+"""Teste de carga dos apps com usuários simultâneos, para dimensionar o deploy.
+
+Sobe `app_principal:server` no gunicorn, localmente, para cada combinação de
+workers e threads pedida, e simula usuários que repetem sessões como as de um
+navegador, com pausas aleatórias entre as ações:
+
+- abrir a página e navegar entre início, dashboard e mapas (display_page);
+- no dashboard: abrir seções, trocar a rede, clicar nas barras (filtragem
+  cruzada), limpar os filtros e trocar o tema, o campo qualitativo e o
+  sentimento dos termos;
+- nos mapas: trocar o tipo de mapa e a rede e clicar nos estados.
+
+Cada ação envia as mesmas requisições '/_dash-update-component' que o Dash
+envia no navegador, com ids e valores tirados das respostas anteriores (as
+barras e os estados clicados existem nas figuras recebidas). As requisições
+do período de aquecimento são descartadas. O relatório traz, por callback e no
+total, requisições por segundo, erros e latências p50/p95/p99.
+
+Os mapas leem os GeoJSON da pasta 'geojson/' dos dados; se ela não existir,
+é gerado um substituto local com polígonos sintéticos para os estados e os
+municípios dos dados (os tamanhos das respostas dos mapas ficam diferentes
+dos reais, mas nenhuma requisição sai da máquina).
+
+    python teste_carga.py --workers 1 2 4 --threads 1 4 --usuarios 50 --duracao 60
+    python teste_carga.py --url http://127.0.0.1:8051 --usuarios 10   # servidor já em execução
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from benchmark import PASTA_RESULTADOS, commit_atual, corpo_callback
+from geojson_local import (ARQUIVO_ESTADOS, ARQUIVO_MUNICIPIOS, PASTA_GEOJSON, SIGLAS_IBGE, gerar_resolucoes,
+                           normalizar_nome)
+from gerar_dados_publicos import SIGLAS_ESTADOS
+from snapshot_dados import ARQUIVO_SNAPSHOT
+
+PASTA_REPO = os.path.dirname(os.path.abspath(__file__))
+# Arquivos lidos pelos apps, ligados na pasta de trabalho do servidor
+RECURSOS_SERVIDOR = ['dados_publicos.json', ARQUIVO_SNAPSHOT, 'resultados_analises.json', 'analises', 'nuvens_palavras']
+PORTA_PADRAO = 8060
+WORKERS_PADRAO = [1, 2]
+THREADS_PADRAO = [1, 4]
+USUARIOS_PADRAO = 20
+DURACAO_PADRAO = 60
+AQUECIMENTO_PADRAO = 10
+PAUSA_PADRAO = 1.0
+TEMPO_LIMITE_REQUISICAO = 120
+TEMPO_MAXIMO_INICIO = 300
+PERCENTIS = (50, 95, 99)
+# Larguras de janela das sessões: desktop e celular (escolhem a resolução dos mapas)
+LARGURAS_TELA = [1366, 1920, 390]
+PAGINAS = ['/', '/dashboard', '/mapas']
+# Substituto dos GeoJSON: municípios por estado e vértices de cada polígono
+MUNICIPIOS_SUBSTITUTO = 150
+VERTICES_SUBSTITUTO = 48
+
+# ============================================================================
+# GEOJSON SUBSTITUTO
+# ============================================================================
+
+def _poligono(rng, centro_x, centro_y, raio):
+    # Polígono irregular em volta do centro, fechado, no formato MultiPolygon
+    pontos = []
+    for i in range(VERTICES_SUBSTITUTO):
+        angulo = 2 * math.pi * i / VERTICES_SUBSTITUTO
+        r = raio * rng.uniform(0.8, 1.0)
+        pontos.append([round(centro_x + r * math.cos(angulo), 6), round(centro_y + r * math.sin(angulo), 6)])
+    return {'type': 'MultiPolygon', 'coordinates': [[pontos + [pontos[0]]]]}
+
+
+def gerar_geojson_substituto(pasta, arquivo_publico, semente=0):
+    """Grava em `pasta` GeoJSON sintéticos dos estados e dos municípios (com os das vagas) e suas resoluções."""
+    rng = random.Random(semente)
+    os.makedirs(pasta, exist_ok=True)
+    # Municípios com vagas, com o código IBGE do arquivo público quando houver
+    siglas_por_uf = {normalizar_nome(nome): sigla for sigla, nome in SIGLAS_ESTADOS.items()}
+    vagas = {}
+    for vaga in arquivo_publico['mapas'].get('vagas_por_municipio', []):
+        sigla = siglas_por_uf.get(normalizar_nome(vaga['vaga_uf']))
+        if sigla:
+            vagas.setdefault(sigla, {})[vaga['vaga_municipio']] = vaga.get('codigo_ibge')
+
+    colunas = math.ceil(math.sqrt(len(SIGLAS_ESTADOS)))
+    estados = []
+    for i, (sigla, nome_estado) in enumerate(sorted(SIGLAS_ESTADOS.items())):
+        # Estados numa grade sobre a área do Brasil, cada um com seus municípios numa grade interna
+        x0, y0 = -74 + (i % colunas) * 7, -33 + (i // colunas) * 7
+        estados.append({'type': 'Feature', 'properties': {'name': nome_estado},
+                        'geometry': _poligono(rng, x0 + 3, y0 + 3, 3)})
+        codigo_uf = SIGLAS_IBGE[sigla]
+        nomes = dict(vagas.get(sigla, {}))
+        for n in range(1, MUNICIPIOS_SUBSTITUTO - len(nomes) + 1):
+            nomes[f'Município {n} {sigla}'] = None
+        lado = math.ceil(math.sqrt(len(nomes)))
+        municipios = []
+        for j, (nome, codigo) in enumerate(nomes.items()):
+            codigo = str(codigo) if codigo else f'{codigo_uf}{90000 + j:05d}'
+            centro_x, centro_y = x0 + (j % lado + 0.5) * 6 / lado, y0 + (j // lado + 0.5) * 6 / lado
+            municipios.append({'type': 'Feature', 'properties': {'id': codigo, 'name': nome, 'description': nome},
+                               'geometry': _poligono(rng, centro_x, centro_y, 3 / lado)})
+        _gravar_geojson(os.path.join(pasta, ARQUIVO_MUNICIPIOS.format(codigo=codigo_uf)), municipios)
+    _gravar_geojson(os.path.join(pasta, ARQUIVO_ESTADOS), estados)
+    gerar_resolucoes(pasta)
+
+
+def _gravar_geojson(caminho, features):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def preparar_pasta_servidor(pasta, pasta_dados, pasta_geojson=None):
+    """Liga os arquivos dos apps na pasta de trabalho e garante uma pasta 'geojson/' (real ou substituta)."""
+    os.makedirs(pasta, exist_ok=True)
+    for nome in RECURSOS_SERVIDOR:
+        origem, destino = os.path.abspath(os.path.join(pasta_dados, nome)), os.path.join(pasta, nome)
+        if os.path.exists(origem) and not os.path.lexists(destino):
+            os.symlink(origem, destino, target_is_directory=os.path.isdir(origem))
+    destino = os.path.join(pasta, PASTA_GEOJSON)
+    if os.path.lexists(destino):
+        return
+    pasta_geojson = pasta_geojson or os.path.join(pasta_dados, PASTA_GEOJSON)
+    if os.path.isfile(os.path.join(pasta_geojson, ARQUIVO_ESTADOS)):
+        os.symlink(os.path.abspath(pasta_geojson), destino, target_is_directory=True)
+        return
+    print("🗺️  Pasta 'geojson/' não encontrada: gerando GeoJSON substitutos...")
+    with open(os.path.join(pasta_dados, 'dados_publicos.json'), 'r', encoding='utf-8') as f:
+        gerar_geojson_substituto(destino, json.load(f))
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+def iniciar_servidor(pasta, workers, threads, porta, argumentos_extras=()):
+    """Sobe o gunicorn na pasta de trabalho e espera a primeira resposta; retorna (processo, URL)."""
+    url = f'http://127.0.0.1:{porta}'
+    caminho_log = os.path.join(pasta, f'gunicorn-{workers}w{threads}t.log')
+    with open(caminho_log, 'w', encoding='utf-8') as log:
+        processo = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+             '--bind', f'127.0.0.1:{porta}', '--chdir', pasta, '--pythonpath', PASTA_REPO,
+             '--timeout', str(TEMPO_LIMITE_REQUISICAO), *argumentos_extras, 'app_principal:server'],
+            stdout=log, stderr=subprocess.STDOUT)
+    limite = time.monotonic() + TEMPO_MAXIMO_INICIO
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            with open(caminho_log, 'r', encoding='utf-8') as f:
+                print(f.read()[-4000:])
+            raise RuntimeError(f"O gunicorn terminou ao iniciar (código {processo.returncode})")
+        try:
+            if requests.get(f'{url}/_dash-layout', timeout=5).ok:
+                return processo, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    parar_servidor(processo)
+    raise RuntimeError(f"O servidor não respondeu em {TEMPO_MAXIMO_INICIO} s")
+
+
+def parar_servidor(processo):
+    processo.send_signal(signal.SIGTERM)
+    try:
+        processo.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+
+# ============================================================================
+# SESSÕES DOS USUÁRIOS
+# ============================================================================
+
+def _grafico(coluna):
+    return {'type': 'grafico-cubo', 'coluna': coluna}
+
+
+def _componentes(arvore):
+    """{id: (tipo, props)} dos componentes de uma árvore JSON (ids de dicionário viram texto JSON)."""
+    encontrados = {}
+    pilha = [arvore]
+    while pilha:
+        item = pilha.pop()
+        if isinstance(item, list):
+            pilha.extend(reversed(item))
+        elif isinstance(item, dict):
+            props = item.get('props')
+            if isinstance(props, dict) and 'type' in item:
+                if 'id' in props:
+                    chave = props['id'] if isinstance(props['id'], str) else json.dumps(props['id'], sort_keys=True)
+                    encontrados[chave] = (item['type'], props)
+                pilha.extend(reversed([v for v in props.values() if isinstance(v, (list, dict))]))
+            else:
+                pilha.extend(reversed(list(item.values())))
+    return encontrados
+
+
+def _figuras_cubo(arvore):
+    """[(coluna, figura)] dos gráficos da filtragem cruzada, na ordem do layout."""
+    figuras = []
+    for chave, (tipo, props) in _componentes(arvore).items():
+        if tipo == 'Graph' and chave.startswith('{'):
+            id_componente = json.loads(chave)
+            if id_componente.get('type') == 'grafico-cubo':
+                figuras.append((id_componente['coluna'], props.get('figure')))
+    return figuras
+
+
+def _saidas(resposta):
+    """{id: {propriedade: valor}} de uma resposta '/_dash-update-component' ({} se não houve mudança)."""
+    return (resposta or {}).get('response', {})
+
+
+def _figura_atualizada(figura, nova):
+    """Figura depois da resposta: a nova, ou a atual com as atribuições de um dash.Patch aplicadas."""
+    if not isinstance(nova, dict) or '__dash_patch_update' not in nova:
+        return nova
+    if figura is None:
+        return None
+    figura = copy.deepcopy(figura)
+    for operacao in nova['operations']:
+        if operacao['operation'] == 'Assign':
+            *caminho, chave = operacao['location']
+            alvo = figura
+            for parte in caminho:
+                alvo = alvo[parte]
+            alvo[chave] = operacao['params']['value']
+    return figura
+
+
+def _opcoes(componentes, id_componente):
+    return [opcao['value'] for opcao in componentes[id_componente][1].get('options', [])]
+
+
+def requisitar(sessao, nome, caminho, corpo=None):
+    """GET (sem corpo) ou POST JSON, registrado com nome, início, latência, status e bytes; retorna o JSON do POST."""
+    registro = {'nome': nome, 'inicio': time.monotonic()}
+    inicio = time.perf_counter()
+    resposta = None
+    try:
+        if corpo is None:
+            resposta = sessao['http'].get(sessao['url'] + caminho, timeout=TEMPO_LIMITE_REQUISICAO)
+        else:
+            resposta = sessao['http'].post(sessao['url'] + caminho, json=corpo, timeout=TEMPO_LIMITE_REQUISICAO)
+        registro.update(status=resposta.status_code, bytes=len(resposta.content))
+    except requests.RequestException:
+        registro['status'] = None
+    registro['ms'] = (time.perf_counter() - inicio) * 1000
+    sessao['registros'].append(registro)
+    if corpo is None or resposta is None or resposta.status_code != 200:
+        return None
+    return resposta.json()
+
+
+def callback(sessao, nome, saidas, entradas, estados=(), alterado=None):
+    return requisitar(sessao, nome, '/_dash-update-component', corpo_callback(saidas, entradas, estados, alterado))
+
+
+def ativa(sessao):
+    return time.monotonic() < sessao['fim']
+
+
+def pausar(sessao):
+    """Pausa de "leitura" entre ações, exponencial com média `pausa`, sem passar do fim do teste."""
+    pausa = sessao['rng'].expovariate(1 / sessao['pausa']) if sessao['pausa'] else 0.0
+    time.sleep(max(0.0, min(pausa, sessao['fim'] - time.monotonic())))
+
+
+def sortear_acao(sessao, acoes):
+    """Sorteia e executa uma ação entre as disponíveis ([(peso, função)]; peso 0 = indisponível)."""
+    disponiveis = [(peso, acao) for peso, acao in acoes if peso]
+    sessao['rng'].choices([acao for _, acao in disponiveis], weights=[peso for peso, _ in disponiveis])[0]()
+
+
+def executar_usuario(url, rng, fim, pausa, registros):
+    """Repete sessões (abrir o site e navegar entre as páginas) até o fim do teste."""
+    while time.monotonic() < fim:
+        sessao = {'url': url, 'rng': rng, 'fim': fim, 'pausa': pausa, 'registros': registros,
+                  'http': requests.Session(), 'largura': rng.choice(LARGURAS_TELA)}
+        # Carga inicial do Dash no navegador
+        requisitar(sessao, 'GET /', '/')
+        requisitar(sessao, 'GET /_dash-layout', '/_dash-layout')
+        requisitar(sessao, 'GET /_dash-dependencies', '/_dash-dependencies')
+        pagina = rng.choice(PAGINAS)
+        for _ in range(rng.randint(3, 10)):
+            if not ativa(sessao):
+                break
+            resposta = callback(sessao, f'display_page[{pagina}]', [('page-content', 'children')],
+                                [('url', 'pathname', pagina)])
+            componentes = _componentes(_saidas(resposta))
+            pausar(sessao)
+            if pagina == '/dashboard' and 'acordeao-secoes' in componentes:
+                usar_dashboard(sessao, componentes)
+            elif pagina == '/mapas' and 'mapa-principal' in componentes:
+                usar_mapas(sessao, componentes)
+            pagina = rng.choice([p for p in PAGINAS if p != pagina])
+        sessao['http'].close()
+
+# ---- dashboard -------------------------------------------------------------
+
+def usar_dashboard(sessao, componentes):
+    """Abre a página do dashboard e faz de 2 a 8 ações sorteadas."""
+    rng = sessao['rng']
+    acordeao = componentes['acordeao-secoes'][1]
+    pagina = {
+        'componentes': componentes,
+        'secoes': [item['props']['item_id'] for item in acordeao['children']],
+        'abertas': list(acordeao.get('active_item') or []),
+        'carregadas': set(),
+        'graficos': {},  # {seção: [(coluna, figura)]}
+        'rede': componentes['dropdown-rede'][1]['value'],
+        'filtros': {},
+        'cliques_limpar': 0,
+        'tema': None,
+        'campo': None,
+        'sentimento': None,
+    }
+    carregar_secoes(sessao, pagina)
+    for _ in range(rng.randint(2, 8)):
+        if not ativa(sessao):
+            return
+        pausar(sessao)
+        fechadas = [s for s in pagina['secoes'] if s not in pagina['abertas']]
+        sortear_acao(sessao, [
+            (3 if fechadas else 0, lambda: abrir_secao(sessao, pagina, rng.choice(fechadas))),
+            (1, lambda: trocar_rede(sessao, pagina, rng.choice(_opcoes(componentes, 'dropdown-rede')))),
+            (3 if colunas_na_pagina(pagina) else 0, lambda: clicar_barra(sessao, pagina)),
+            (1 if pagina['filtros'] else 0, lambda: limpar_filtros(sessao, pagina)),
+            (1 if pagina['tema'] else 0, lambda: trocar_tema(sessao, pagina)),
+            (1 if pagina['campo'] else 0, lambda: trocar_campo(sessao, pagina)),
+            (1 if pagina['sentimento'] else 0, lambda: trocar_sentimento(sessao, pagina)),
+        ])
+
+
+def colunas_na_pagina(pagina):
+    """Colunas dos gráficos da filtragem cruzada já carregados, na ordem do layout."""
+    return [coluna for secao in pagina['secoes'] for coluna, _ in pagina['graficos'].get(secao, [])]
+
+
+def carregar_secoes(sessao, pagina):
+    # Mudar 'active_item' dispara o callback de cada seção; só as recém-abertas devolvem conteúdo
+    for secao in pagina['secoes']:
+        nova = secao in pagina['abertas'] and secao not in pagina['carregadas']
+        resposta = callback(
+            sessao, f'carregar_secao[{secao}]' if nova else 'carregar_secao[sem_alteracao]',
+            [({'type': 'secao-dashboard', 'secao': secao}, 'children'),
+             ({'type': 'secao-carregada', 'secao': secao}, 'data')],
+            [('acordeao-secoes', 'active_item', pagina['abertas'])],
+            [({'type': 'secao-carregada', 'secao': secao}, 'data', secao in pagina['carregadas']),
+             ('dropdown-rede', 'value', pagina['rede']), ('filtros-cubo', 'data', pagina['filtros'])])
+        if not nova or resposta is None:
+            continue
+        pagina['carregadas'].add(secao)
+        conteudo = _componentes(_saidas(resposta))
+        pagina['componentes'].update(conteudo)
+        pagina['graficos'][secao] = _figuras_cubo(_saidas(resposta))
+        # Componentes novos na página disparam seus callbacks
+        if 'dropdown-apropriacao' in conteudo:
+            pagina['tema'] = conteudo['dropdown-apropriacao'][1]['value']
+            atualizar_apropriacao(sessao, pagina)
+        if 'dropdown-qualitativo' in conteudo:
+            pagina['campo'] = conteudo['dropdown-qualitativo'][1]['value']
+            pagina['sentimento'] = conteudo['filtro-sentimento-termos'][1]['value']
+            atualizar_qualitativo(sessao, pagina)
+
+
+def abrir_secao(sessao, pagina, secao):
+    pagina['abertas'] = pagina['abertas'] + [secao]
+    carregar_secoes(sessao, pagina)
+
+
+def atualizar_graficos(sessao, pagina):
+    colunas = colunas_na_pagina(pagina)
+    if not colunas:
+        return
+    resposta = callback(
+        sessao, 'atualizar_graficos', [[(_grafico(c), 'figure') for c in colunas], ('resumo-filtros', 'children')],
+        [('filtros-cubo', 'data', pagina['filtros']), ('dropdown-rede', 'value', pagina['rede'])])
+    figuras = {json.loads(chave)['coluna']: props['figure']
+               for chave, props in _saidas(resposta).items() if chave.startswith('{') and 'figure' in props}
+    for secao, graficos in pagina['graficos'].items():
+        pagina['graficos'][secao] = [(coluna, _figura_atualizada(figura, figuras[coluna]) if coluna in figuras else figura)
+                                     for coluna, figura in graficos]
+
+
+def atualizar_apropriacao(sessao, pagina):
+    callback(sessao, 'atualizar_apropriacao', [('grafico-apropriacao', 'figure')],
+             [('dropdown-apropriacao', 'value', pagina['tema']), ('dropdown-rede', 'value', pagina['rede']),
+              ('filtros-cubo', 'data', pagina['filtros'])])
+
+
+def atualizar_qualitativo(sessao, pagina):
+    callback(sessao, 'atualizar_qualitativo',
+             [('nuvem-palavras', 'src'), ('nuvem-palavras', 'srcSet'), ('nuvem-palavras-webp', 'srcSet'),
+              ('grafico-sentimentos', 'figure'), ('resumo-textos', 'children')],
+             [('dropdown-qualitativo', 'value', pagina['campo']), ('dropdown-rede', 'value', pagina['rede'])])
+    atualizar_termos(sessao, pagina)
+
+
+def atualizar_termos(sessao, pagina):
+    callback(sessao, 'atualizar_termos',
+             [('grafico-termos', 'figure'), ('bloco-termos', 'style'), ('bloco-nuvem', 'style')],
+             [('dropdown-qualitativo', 'value', pagina['campo']), ('dropdown-rede', 'value', pagina['rede']),
+              ('filtro-sentimento-termos', 'value', pagina['sentimento'])])
+
+
+def trocar_rede(sessao, pagina, rede):
+    pagina['rede'] = rede
+    atualizar_graficos(sessao, pagina)
+    if pagina['tema']:
+        atualizar_apropriacao(sessao, pagina)
+    if pagina['campo']:
+        atualizar_qualitativo(sessao, pagina)
+
+
+def alternar_filtro(sessao, pagina, cliques, alterado):
+    resposta = callback(
+        sessao, 'alternar_filtro', [('filtros-cubo', 'data')],
+        [[(_grafico(c), 'clickData', cliques.get(c)) for c in colunas_na_pagina(pagina)],
+         ('botao-limpar-filtros', 'n_clicks', pagina['cliques_limpar'])],
+        [('filtros-cubo', 'data', pagina['filtros'])], alterado=alterado)
+    filtros = _saidas(resposta).get('filtros-cubo', {}).get('data')
+    if filtros is None:
+        return
+    # Os gráficos e a apropriação dependem dos filtros
+    pagina['filtros'] = filtros
+    atualizar_graficos(sessao, pagina)
+    if pagina['tema']:
+        atualizar_apropriacao(sessao, pagina)
+
+
+def clicar_barra(sessao, pagina):
+    """Clica numa barra sorteada de um gráfico da página (o valor vem da figura recebida)."""
+    rng = sessao['rng']
+    coluna, figura = rng.choice([g for secao in pagina['secoes'] for g in pagina['graficos'].get(secao, [])])
+    valores = ((figura or {}).get('data') or [{}])[0].get('x')
+    if not isinstance(valores, list) or not valores:
+        return
+    alternar_filtro(sessao, pagina, {coluna: {'points': [{'x': rng.choice(valores)}]}},
+                    f"{json.dumps(_grafico(coluna), separators=(',', ':'), sort_keys=True)}.clickData")
+
+
+def limpar_filtros(sessao, pagina):
+    pagina['cliques_limpar'] += 1
+    alternar_filtro(sessao, pagina, {}, 'botao-limpar-filtros.n_clicks')
+
+
+def trocar_tema(sessao, pagina):
+    pagina['tema'] = sessao['rng'].choice(_opcoes(pagina['componentes'], 'dropdown-apropriacao'))
+    atualizar_apropriacao(sessao, pagina)
+
+
+def trocar_campo(sessao, pagina):
+    pagina['campo'] = sessao['rng'].choice(_opcoes(pagina['componentes'], 'dropdown-qualitativo'))
+    atualizar_qualitativo(sessao, pagina)
+
+
+def trocar_sentimento(sessao, pagina):
+    pagina['sentimento'] = sessao['rng'].choice(_opcoes(pagina['componentes'], 'filtro-sentimento-termos'))
+    atualizar_termos(sessao, pagina)
+
+# ---- mapas -----------------------------------------------------------------
+
+def usar_mapas(sessao, componentes):
+    """Abre a página dos mapas e faz de 2 a 8 ações sorteadas."""
+    rng = sessao['rng']
+    pagina = {
+        'tipo': componentes['dropdown-tipo-mapa'][1]['value'],
+        'rede': componentes['dropdown-rede-mapas'][1]['value'],
+        'locais': [],
+    }
+    # O mapa é pedido sem a largura da tela; o callback de cliente a preenche e o mapa é pedido de novo
+    atualizar_mapas(sessao, pagina, None)
+    atualizar_mapa_principal(sessao, pagina, sessao['largura'])
+    for _ in range(rng.randint(2, 8)):
+        if not ativa(sessao):
+            return
+        pausar(sessao)
+        sortear_acao(sessao, [
+            (1, lambda: trocar_mapa(sessao, pagina, 'tipo', rng.choice(_opcoes(componentes, 'dropdown-tipo-mapa')))),
+            (1, lambda: trocar_mapa(sessao, pagina, 'rede', rng.choice(_opcoes(componentes, 'dropdown-rede-mapas')))),
+            (3 if pagina['tipo'] == 'vaga_uf' and pagina['locais'] else 0, lambda: clicar_estado(sessao, pagina)),
+        ])
+
+
+def atualizar_mapa_principal(sessao, pagina, largura):
+    resposta = callback(
+        sessao, 'atualizar_mapa_principal', [('mapa-principal', 'figure')],
+        [('dropdown-tipo-mapa', 'value', pagina['tipo']), ('dropdown-rede-mapas', 'value', pagina['rede']),
+         ('largura-tela-mapas', 'data', largura)])
+    dados = _saidas(resposta).get('mapa-principal', {}).get('figure', {}).get('data') or [{}]
+    pagina['locais'] = dados[0].get('locations') or []
+
+
+def atualizar_municipios(sessao, pagina, clique=None):
+    callback(
+        sessao, 'atualizar_mapa_municipios[estado]' if clique else 'atualizar_mapa_municipios[dica]',
+        [('container-municipios', 'children')],
+        [('mapa-principal', 'clickData', clique), ('dropdown-tipo-mapa', 'value', pagina['tipo']),
+         ('dropdown-rede-mapas', 'value', pagina['rede'])],
+        [('largura-tela-mapas', 'data', sessao['largura'])],
+        alterado='mapa-principal.clickData' if clique else 'dropdown-tipo-mapa.value')
+
+
+def atualizar_mapas(sessao, pagina, largura):
+    atualizar_mapa_principal(sessao, pagina, largura)
+    atualizar_municipios(sessao, pagina)
+
+
+def trocar_mapa(sessao, pagina, campo, valor):
+    pagina[campo] = valor
+    atualizar_mapas(sessao, pagina, sessao['largura'])
+
+
+def clicar_estado(sessao, pagina):
+    atualizar_municipios(sessao, pagina, {'points': [{'location': sessao['rng'].choice(pagina['locais'])}]})
+
+# ============================================================================
+# EXECUÇÃO E RELATÓRIO
+# ============================================================================
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo posto mais próximo (valor observado, sem interpolação)."""
+    if not valores_ordenados:
+        return None
+    return valores_ordenados[max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)]
+
+
+def resumir(registros, duracao):
+    """Estatísticas de uma lista de requisições: vazão, erros e latências (ms)."""
+    tempos = sorted(r['ms'] for r in registros)
+    return {
+        'requisicoes': len(registros),
+        'por_segundo': round(len(registros) / duracao, 2),
+        'erros': sum(1 for r in registros if r['status'] not in (200, 204)),
+        **{f'p{p}_ms': round(percentil(tempos, p), 1) if tempos else None for p in PERCENTIS},
+        'kb_medio': round(sum(r.get('bytes', 0) for r in registros) / len(registros) / 1024, 1) if registros else 0,
+    }
+
+
+def gerar_carga(url, usuarios, duracao, aquecimento, pausa, semente=0):
+    """Roda os usuários contra `url`; retorna as estatísticas do período medido, total e por callback."""
+    inicio = time.monotonic()
+    inicio_medicao, fim = inicio + aquecimento, inicio + aquecimento + duracao
+    registros = []
+
+    def usuario(indice):
+        try:
+            executar_usuario(url, random.Random(semente * 100_003 + indice), fim, pausa, registros)
+        except Exception as erro:  # um usuário com erro inesperado não derruba o teste
+            registros.append({'nome': f'erro[{type(erro).__name__}]', 'inicio': time.monotonic(), 'status': None, 'ms': 0})
+
+    threads = [threading.Thread(target=usuario, args=(i,), daemon=True) for i in range(usuarios)]
+    for i, thread in enumerate(threads):
+        thread.start()
+        # Entrada escalonada ao longo do aquecimento, como usuários chegando
+        time.sleep(min(aquecimento / max(usuarios, 1), 1.0))
+    for thread in threads:
+        thread.join(timeout=max(0.0, fim - time.monotonic()) + TEMPO_LIMITE_REQUISICAO)
+
+    medidos = [r for r in registros if inicio_medicao <= r['inicio'] < fim]
+    por_callback = {}
+    for registro in medidos:
+        por_callback.setdefault(registro['nome'], []).append(registro)
+    return {
+        'total': resumir(medidos, duracao),
+        'callbacks': {nome: resumir(lista, duracao) for nome, lista in sorted(por_callback.items())},
+    }
+
+
+def imprimir_relatorio(titulo, resultado):
+    print(f"\n📊 {titulo}")
+    print(f"   {'callback':<42} {'req':>7} {'req/s':>8} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'KB':>8}")
+    linhas = list(resultado['callbacks'].items()) + [('TOTAL', resultado['total'])]
+    for nome, medida in linhas:
+        latencias = ' '.join(f"{medida[f'p{p}_ms']:>9.1f}" if medida[f'p{p}_ms'] is not None else f"{'-':>9}"
+                             for p in PERCENTIS)
+        print(f"   {nome:<42} {medida['requisicoes']:>7} {medida['por_segundo']:>8.1f} {medida['erros']:>6} "
+              f"{latencias} {medida['kb_medio']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga dos apps Dash com usuários simultâneos.")
+    parser.add_argument('--url', default=None, help="Servidor já em execução (sem ele, o gunicorn é iniciado localmente).")
+    parser.add_argument('--workers', type=int, nargs='+', default=WORKERS_PADRAO,
+                        help=f"Workers do gunicorn a testar (padrão: {' '.join(map(str, WORKERS_PADRAO))}).")
+    parser.add_argument('--threads', type=int, nargs='+', default=THREADS_PADRAO,
+                        help=f"Threads por worker a testar (padrão: {' '.join(map(str, THREADS_PADRAO))}).")
+    parser.add_argument('--usuarios', type=int, default=USUARIOS_PADRAO,
+                        help=f"Usuários simultâneos (padrão: {USUARIOS_PADRAO}).")
+    parser.add_argument('--duracao', type=float, default=DURACAO_PADRAO,
+                        help=f"Segundos medidos em cada configuração (padrão: {DURACAO_PADRAO}).")
+    parser.add_argument('--aquecimento', type=float, default=AQUECIMENTO_PADRAO,
+                        help=f"Segundos iniciais descartados (padrão: {AQUECIMENTO_PADRAO}).")
+    parser.add_argument('--pausa', type=float, default=PAUSA_PADRAO,
+                        help=f"Pausa média entre ações de um usuário, em segundos; 0 = sem pausa (padrão: {PAUSA_PADRAO}).")
+    parser.add_argument('--semente', type=int, default=0, help="Semente das sessões sorteadas.")
+    parser.add_argument('--pasta-dados', default='.', help="Pasta com 'dados_publicos.json' e demais arquivos dos apps (padrão: atual).")
+    parser.add_argument('--geojson', default=None, help="Pasta de GeoJSON (padrão: 'geojson/' da pasta de dados, ou substitutos).")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f"Porta do servidor local (padrão: {PORTA_PADRAO}).")
+    parser.add_argument('--args-gunicorn', default='', help="Argumentos extras do gunicorn (ex.: '--preload').")
+    parser.add_argument('--saida', default=None, help=f"Arquivo de resultados (padrão: {PASTA_RESULTADOS}/carga-<commit>.json).")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        'versao': 1,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'cpus': os.cpu_count(),
+        'usuarios': args.usuarios,
+        'duracao_s': args.duracao,
+        'pausa_s': args.pausa,
+        'configuracoes': [],
+    }
+    if args.url:
+        resultado = gerar_carga(args.url.rstrip('/'), args.usuarios, args.duracao, args.aquecimento, args.pausa, args.semente)
+        imprimir_relatorio(args.url, resultado)
+        resultados['configuracoes'].append({'url': args.url, **resultado})
+    else:
+        pasta = tempfile.mkdtemp(prefix='carga_pmme_')
+        try:
+            preparar_pasta_servidor(pasta, args.pasta_dados, args.geojson)
+            for workers in args.workers:
+                for threads in args.threads:
+                    print(f"🚀 gunicorn com {workers} worker(s) x {threads} thread(s), {args.usuarios} usuários...")
+                    processo, url = iniciar_servidor(pasta, workers, threads, args.porta, args.args_gunicorn.split())
+                    try:
+                        resultado = gerar_carga(url, args.usuarios, args.duracao, args.aquecimento, args.pausa, args.semente)
+                    finally:
+                        parar_servidor(processo)
+                    imprimir_relatorio(f"{workers} worker(s) x {threads} thread(s)", resultado)
+                    resultados['configuracoes'].append({'workers': workers, 'threads': threads, **resultado})
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"carga-{resultados['commit'] or 'sem_commit'}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Resultados gravados em '{saida}'")
+
+
+if __name__ == '__main__':
+    main()